@@ -0,0 +1,163 @@
+"""
+OpenAI API 경로 라우터
+Assistant API / Responses API / Chat Completions 중 어떤 경로로 보낼지 결정
+
+- 기능 메모: (모델, 기능 조합, 경로)별로 "지원하지 않음"이 분명한 응답(오류 코드/메시지로 판별)을 기억해
+  TTL 동안 다시 호출하지 않음. 404(삭제된 Thread/Assistant)나 요청별 400(진행 중인 Run 등)은 일반 실패로 기록
+- EWMA 지연/오류율: 같은 기능을 제공하는 경로들 중 정상이면서 가장 빠른 경로를 먼저 사용
+- 탐색: 일정 확률로 다른 경로를 먼저 시도해 느리거나 오류가 났던 경로의 회복을 확인
+"""
+import random
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import openai
+
+from app_logging import get_logger
+from metrics import OPENAI_ROUTE_ERROR_RATE, OPENAI_ROUTE_LATENCY
+
+logger = get_logger("openai")
+
+# 모델/경로가 해당 기능을 지원하지 않을 때 올 수 있는 오류 (NotFoundError는 삭제된 리소스이므로 제외)
+CAPABILITY_ERRORS = (openai.BadRequestError, openai.PermissionDeniedError, openai.UnprocessableEntityError)
+# 위 오류 중 기능 미지원으로 보는 코드와 메시지 (나머지는 요청별 오류로 보고 오류율에만 반영)
+UNSUPPORTED_CODES = ("unsupported_parameter", "unsupported_value", "unsupported_model", "model_not_supported")
+_NOT_SUPPORTED = r"(?:not supported|unsupported|does not support|cannot be used)"
+_FEATURE = r"\b(?:model|tools?|parameter)\b"
+UNSUPPORTED_MESSAGE = re.compile(
+    rf"{_FEATURE}.{{0,80}}?{_NOT_SUPPORTED}|{_NOT_SUPPORTED}.{{0,80}}?{_FEATURE}", re.IGNORECASE
+)
+
+
+class RouteFeatures(NamedTuple):
+    """경로 선택에 영향을 주는 요청 기능 조합"""
+    web_search: bool
+    tools: bool
+    files: bool = False  # 세션 전용 파일 스토어 (Assistant file_search)
+
+    @property
+    def label(self) -> str:
+        return "+".join(name for name, enabled in zip(self._fields, self) if enabled) or "plain"
+
+
+class APIPathError(Exception):
+    """경로 호출 실패 (message는 사용자에게 보여줄 안내, cause는 원인 예외)"""
+
+    def __init__(self, message: str, cause: Optional[BaseException] = None):
+        super().__init__(message)
+        self.message = message
+        self.cause = cause
+
+
+def is_capability_error(error: Optional[BaseException]) -> bool:
+    """경로가 이 기능 조합을 지원하지 않는다는 오류인지 (코드나 메시지가 기능 미지원을 뜻할 때만)"""
+    if not isinstance(error, CAPABILITY_ERRORS):
+        return False
+    code = getattr(error, "code", None)
+    if code in UNSUPPORTED_CODES:
+        return True
+    # 알 수 없는 도구 종류 (예: tools[0].type에 이 경로가 모르는 web_search_preview)
+    param = getattr(error, "param", None) or ""
+    if code == "invalid_value" and param.startswith("tools") and param.endswith(".type"):
+        return True
+    return UNSUPPORTED_MESSAGE.search(getattr(error, "message", None) or str(error)) is not None
+
+
+@dataclass
+class PathStats:
+    """경로별 지수 가중 이동 평균 (성공 지연, 오류율)"""
+    latency: Optional[float] = None
+    error_rate: float = 0.0
+    samples: int = 0
+
+    def observe(self, seconds: float, failed: bool, alpha: float) -> None:
+        self.samples += 1
+        self.error_rate += alpha * ((1.0 if failed else 0.0) - self.error_rate)
+        if not failed:
+            # 실패 지연은 빠른 오류 응답이 섞이면 경로가 빨라 보이므로 제외
+            self.latency = seconds if self.latency is None else self.latency + alpha * (seconds - self.latency)
+
+
+class APIRouter:
+    """(모델, 기능 조합)별 경로 순서를 정하고 결과를 기록"""
+
+    def __init__(self, alpha: float = 0.2, unhealthy_error_rate: float = 0.5, min_samples: int = 3,
+                 probe_rate: float = 0.05, capability_ttl: float = 3600.0,
+                 clock: Callable[[], float] = time.monotonic, rng: random.Random = None):
+        self.alpha = alpha
+        self.unhealthy_error_rate = unhealthy_error_rate
+        self.min_samples = min_samples
+        self.probe_rate = probe_rate
+        self.capability_ttl = capability_ttl
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self._stats: Dict[Tuple[str, RouteFeatures, str], PathStats] = {}
+        self._unsupported: Dict[Tuple[str, RouteFeatures, str], float] = {}
+        OPENAI_ROUTE_LATENCY.set_function(self._latency_samples)
+        OPENAI_ROUTE_ERROR_RATE.set_function(self._error_rate_samples)
+
+    def supports(self, model: str, features: RouteFeatures, path: str) -> bool:
+        """기능 메모 확인 (TTL이 지나면 다시 시도해 볼 수 있도록 메모 삭제)"""
+        key = (model, features, path)
+        until = self._unsupported.get(key)
+        if until is None:
+            return True
+        if self.clock() >= until:
+            del self._unsupported[key]
+            return True
+        return False
+
+    def healthy(self, stats: Optional[PathStats]) -> bool:
+        return stats is None or stats.samples < self.min_samples or stats.error_rate < self.unhealthy_error_rate
+
+    def plan(self, model: str, features: RouteFeatures, candidates: Iterable[str],
+             fallbacks: Iterable[str] = (), available: Callable[[str], bool] = lambda path: True) -> List[str]:
+        """시도할 경로 순서
+
+        candidates는 같은 기능을 제공하는 경로들(기본 선호 순서)로 정상 > 빠른 순으로 정렬하고,
+        fallbacks는 기능이 줄어드는 경로로 정렬 없이 뒤에 붙임. 측정 전인 경로는 한 번 시도되도록 먼저 둠
+        available(서킷 브레이커)이 거부한 경로는 모두 거부됐을 때만 남김
+        """
+        candidates = [path for path in candidates if self.supports(model, features, path)]
+        fallbacks = [path for path in fallbacks if path not in candidates and self.supports(model, features, path)]
+
+        def rank(indexed):
+            index, path = indexed
+            stats = self._stats.get((model, features, path))
+            if stats is None:
+                latency = 0.0
+            else:
+                latency = stats.latency if stats.latency is not None else float("inf")
+            return (not self.healthy(stats), latency, index)
+
+        ordered = [path for _, path in sorted(enumerate(candidates), key=rank)]
+        if len(ordered) > 1 and self.rng.random() < self.probe_rate:
+            probe = self.rng.choice(ordered[1:])
+            ordered.remove(probe)
+            ordered.insert(0, probe)
+            logger.debug("🧭 Probing %s for %s %s", probe, model, features)
+
+        route = ordered + fallbacks
+        open_paths = [path for path in route if available(path)]
+        return open_paths or route
+
+    def record(self, model: str, features: RouteFeatures, path: str, seconds: float,
+               error: Optional[BaseException] = None, failed: bool = False) -> None:
+        """경로 호출 결과 기록 (지원하지 않는 기능 오류는 오류율 대신 기능 메모에 기록)"""
+        key = (model, features, path)
+        if is_capability_error(error):
+            self._unsupported[key] = self.clock() + self.capability_ttl
+            logger.info("🧭 %s does not support %s on %s, skipping for %.0fs",
+                        path, features, model, self.capability_ttl)
+            return
+        self._stats.setdefault(key, PathStats()).observe(seconds, failed or error is not None, self.alpha)
+
+    def _latency_samples(self):
+        return [((model, features.label, path), stats.latency)
+                for (model, features, path), stats in self._stats.items() if stats.latency is not None]
+
+    def _error_rate_samples(self):
+        return [((model, features.label, path), stats.error_rate)
+                for (model, features, path), stats in self._stats.items()]
@@ -0,0 +1,106 @@
+"""
+구조화 로깅 설정 모듈
+- 서브시스템별 로거(nsales.<subsystem>)와 레벨 (LOG_LEVEL, LOG_LEVELS="stream=DEBUG,tools=WARNING")
+- QueueHandler로 이벤트 루프에서는 큐에 넣기만 하고 실제 출력은 QueueListener 스레드가 담당
+- 청크 단위 이벤트는 SampledLogger로 N건 중 1건만 기록 (비활성 레벨이면 카운트도 하지 않음)
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from typing import Dict, Optional
+
+APP_LOGGER_PREFIX = "nsales"
+SUBSYSTEMS = ("api", "openai", "stream", "files", "tools", "google")
+
+# LogRecord 기본 속성 (나머지는 extra로 전달된 구조화 필드)
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    """서브시스템 로거 (예: get_logger("stream") -> nsales.stream)"""
+    return logging.getLogger(f"{APP_LOGGER_PREFIX}.{subsystem}")
+
+
+class StructuredFormatter(logging.Formatter):
+    """`시각 레벨 로거 메시지 key=value ...` 형식 (extra 필드를 key=value로 덧붙임)"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = [f"{key}={value!r}" for key, value in record.__dict__.items() if key not in _RECORD_ATTRS]
+        return f"{line} {' '.join(fields)}" if fields else line
+
+
+class SampledLogger:
+    """청크마다 호출되는 로그를 every건 중 1건만 기록
+
+    레벨이 꺼져 있으면 isEnabledFor 확인만 하고 반환하므로 인자 포맷/카운트 비용이 없음
+    """
+
+    __slots__ = ("logger", "level", "every", "_count")
+
+    def __init__(self, logger: logging.Logger, every: int, level: int = logging.DEBUG):
+        self.logger = logger
+        self.level = level
+        self.every = max(1, every)
+        self._count = 0
+
+    def log(self, msg: str, *args, **kwargs) -> None:
+        if not self.logger.isEnabledFor(self.level):
+            return
+        self._count += 1
+        if (self._count - 1) % self.every == 0:
+            kwargs.setdefault("extra", {})["sampled"] = f"1/{self.every}"
+            self.logger.log(self.level, msg, *args, **kwargs)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """메시지 포맷까지 QueueListener 스레드로 미룸 (기본 QueueHandler는 큐에 넣기 전에 포맷)"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """"stream=DEBUG,summarizer=WARNING" -> {"nsales.stream": 10, "summarizer": 30} (서브시스템 외 이름은 그대로)"""
+    levels = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, level = item.partition("=")
+        name = name.strip()
+        if name in SUBSYSTEMS:
+            name = f"{APP_LOGGER_PREFIX}.{name}"
+        levels[name] = logging.getLevelName(level.strip().upper())
+        if not isinstance(levels[name], int):
+            raise ValueError(f"Unknown log level for {name}: {level}")
+    return levels
+
+
+def configure_logging(level: Optional[str] = None, levels: Optional[str] = None) -> logging.handlers.QueueListener:
+    """루트 로거를 비차단 QueueHandler로 교체하고 서브시스템 레벨 적용 (재호출 시 레벨만 갱신)"""
+    global _listener
+
+    root = logging.getLogger()
+    root.setLevel(logging.getLevelName((level or os.getenv("LOG_LEVEL", "INFO")).upper()))
+    for name, value in parse_levels(levels if levels is not None else os.getenv("LOG_LEVELS", "")).items():
+        logging.getLogger(name).setLevel(value)
+
+    if _listener is None:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(StructuredFormatter())
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(DeferredQueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+    return _listener
@@ -0,0 +1,107 @@
+"""
+Assistant 풀 모듈
+같은 설정(모델, instructions, 도구, 벡터 스토어)의 세션이 하나의 Assistant를 공유
+
+- 설정 키: 설정 JSON의 SHA-256 -> assistant_id (저장소 ASSISTANT_POOL 네임스페이스에 보관)
+- instructions는 요청마다 바뀌는 현재 시간 섹션을 빼고 공백을 정규화해 키로 사용
+  (Assistant에도 시간 섹션 없는 instructions로 생성하고, 현재 시간은 Run의 additional_instructions로 전달)
+- 존재 확인(assistants.retrieve)은 verify_ttl마다 한 번만 수행하고, 그 사이 요청은 제어 API 호출 없이 바로 사용
+- 같은 키로 동시에 들어온 첫 요청들은 키별 락으로 묶어 Assistant를 하나만 생성
+"""
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import openai
+
+from app_logging import get_logger
+from context_builder import split_time_prompt
+from storage import ASSISTANT_POOL, ChatRepository
+
+logger = get_logger("openai")
+
+
+def pooled_instructions(instructions: str) -> str:
+    """Assistant에 고정할 instructions (요청마다 바뀌는 현재 시간 섹션 제외)"""
+    return split_time_prompt(instructions or "")[0].strip()
+
+
+def assistant_config_key(model: str, instructions: str, tools: Sequence[Dict[str, Any]],
+                         vector_store_ids: Sequence[str]) -> str:
+    """Assistant 설정 해시 (도구/벡터 스토어 순서, instructions의 현재 시간 섹션/공백 차이와 무관)"""
+    config = {
+        "model": model,
+        "instructions": " ".join(pooled_instructions(instructions).split()),
+        "tools": sorted(json.dumps(tool, sort_keys=True, ensure_ascii=False) for tool in tools),
+        "vector_store_ids": sorted(vector_store_ids),
+    }
+    return hashlib.sha256(json.dumps(config, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class AssistantPool:
+    """설정 키별 공유 Assistant와 로컬 검증 만료 시각"""
+
+    def __init__(self, client: openai.AsyncOpenAI, repository: ChatRepository, verify_ttl: float = 3600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.client = client
+        self.repository = repository
+        self.verify_ttl = verify_ttl
+        self.clock = clock
+        self._verified_until: Dict[str, float] = {}  # assistant_id -> 검증 만료 시각
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _verified(self, assistant_id: Optional[str]) -> bool:
+        return assistant_id is not None and self._verified_until.get(assistant_id, 0.0) > self.clock()
+
+    def _mark_verified(self, assistant_id: str) -> None:
+        self._verified_until[assistant_id] = self.clock() + self.verify_ttl
+
+    def invalidate(self, assistant_id: str) -> None:
+        """Run에서 Assistant를 찾지 못했을 때 호출 (다음 사용 시 다시 확인)"""
+        self._verified_until.pop(assistant_id, None)
+
+    async def acquire(self, model: str, instructions: str, tools: List[Dict[str, Any]],
+                      vector_store_ids: Sequence[str] = (), name: str = "NSales Pro Assistant") -> str:
+        """설정에 맞는 Assistant ID (검증 기간 내면 저장소 조회만으로 반환)"""
+        instructions = pooled_instructions(instructions)
+        key = assistant_config_key(model, instructions, tools, vector_store_ids)
+        assistant_id = self.repository.get_value(ASSISTANT_POOL, key)
+        if self._verified(assistant_id):
+            return assistant_id
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            assistant_id = self.repository.get_value(ASSISTANT_POOL, key)
+            if self._verified(assistant_id):
+                return assistant_id
+
+            if assistant_id:
+                try:
+                    await self.client.beta.assistants.retrieve(assistant_id)
+                    self._mark_verified(assistant_id)
+                    logger.debug("🤖 Verified pooled assistant: %s", assistant_id)
+                    return assistant_id
+                except openai.NotFoundError:
+                    logger.warning("⚠️ Pooled assistant %s not found, creating a new one", assistant_id)
+                    self.repository.delete_value(ASSISTANT_POOL, key)
+                    self.invalidate(assistant_id)
+
+            params: Dict[str, Any] = {
+                "name": name,
+                "instructions": instructions,
+                "model": model,
+                "tools": tools,
+                "metadata": {"pool_key": key[:32]},
+            }
+            if vector_store_ids:
+                params["tool_resources"] = {"file_search": {"vector_store_ids": list(vector_store_ids)}}
+
+            assistant = await self.client.beta.assistants.create(**params)
+            self.repository.set_value(ASSISTANT_POOL, key, assistant.id)
+            self._mark_verified(assistant.id)
+            logger.info("✅ Created pooled assistant: %s", assistant.id, extra={
+                "model": model, "tools": len(tools), "vector_stores": len(vector_store_ids)
+            })
+            return assistant.id
@@ -0,0 +1,70 @@
+"""
+Assistant Run 스트리밍 모듈
+runs.create(stream=True) 이벤트 스트림에서 텍스트 델타를 바로 꺼내 전달 (create_and_poll의 폴링 간격/전체 완료 대기 없음)
+
+- thread.message.delta: 텍스트 델타를 그대로 yield
+- thread.run.requires_action: 스트림을 닫고 도구를 실행한 뒤 submit_tool_outputs(stream=True)의 새 스트림으로 이어서 진행
+- thread.run.failed / cancelled / expired / incomplete, error: APIPathError (경로 라우터가 다른 경로로 폴백)
+"""
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import openai
+from openai import AsyncStream
+
+from api_router import APIPathError
+from app_logging import get_logger
+
+logger = get_logger("openai")
+
+RUN_ENDED_EVENTS = {
+    "thread.run.failed": "failed",
+    "thread.run.cancelled": "cancelled",
+    "thread.run.expired": "expired",
+    "thread.run.incomplete": "incomplete",
+}
+
+ToolRunner = Callable[[List[Any]], Awaitable[List[Dict[str, str]]]]
+
+
+def _run_error(status: str, run: Any) -> APIPathError:
+    message = f"Assistant 실행 실패: {status}"
+    last_error = getattr(run, "last_error", None)
+    if last_error is not None and getattr(last_error, "message", None):
+        message += f" - {last_error.message}"
+    return APIPathError(message)
+
+
+async def assistant_run_deltas(client: openai.AsyncOpenAI, stream: AsyncStream, thread_id: str,
+                               run_tools: ToolRunner, timeout: Optional[httpx.Timeout] = None) -> AsyncIterator[str]:
+    """Run 이벤트 스트림의 텍스트 델타 (도구 호출이 끝날 때까지 이어지는 스트림 포함)
+
+    run_tools는 tool_calls를 받아 [{"tool_call_id", "output"}] 목록을 돌려주는 코루틴
+    """
+    while stream is not None:
+        pending_run = None
+        async with stream:
+            async for event in stream:
+                kind = event.event
+                if kind == "thread.message.delta":
+                    for block in event.data.delta.content or ():
+                        if block.type == "text" and block.text is not None and block.text.value:
+                            yield block.text.value
+                elif kind == "thread.run.requires_action":
+                    # Run은 도구 출력을 기다리며 멈추므로 현재 스트림은 여기서 끝남
+                    pending_run = event.data
+                    break
+                elif kind in RUN_ENDED_EVENTS:
+                    raise _run_error(RUN_ENDED_EVENTS[kind], event.data)
+                elif kind == "error":
+                    raise APIPathError(f"Assistant 실행 오류: {event.data.message}")
+
+        stream = None
+        if pending_run is not None:
+            tool_calls = pending_run.required_action.submit_tool_outputs.tool_calls
+            logger.debug("🔧 Assistant requires action: %s tool calls", len(tool_calls))
+            tool_outputs = await run_tools(tool_calls)
+            stream = await client.beta.threads.runs.submit_tool_outputs(
+                run_id=pending_run.id, thread_id=thread_id, tool_outputs=tool_outputs, stream=True,
+                timeout=timeout if timeout is not None else openai.NOT_GIVEN
+            )
@@ -0,0 +1,109 @@
+"""
+메시지 ID 인덱스 벤치마크
+기존 전체 스캔 방식과 저장소 인덱스 조회(find/delete/regenerate)를 100만 메시지 규모에서 비교
+긴 세션의 앞쪽/뒤쪽 메시지 삭제 비용도 비교 (삭제는 뒤쪽 메시지 위치를 갱신하지 않으므로 차이가 없어야 함)
+
+실행: python benchmarks/message_index_benchmark.py [--messages 1000000] [--per-session 100] [--sqlite]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import InMemoryChatRepository, SQLiteChatRepository  # noqa: E402
+
+
+def legacy_find(messages_db, message_id):
+    """기존 delete_message/regenerate_message 방식: 모든 세션의 모든 메시지 스캔"""
+    for session_id, messages in messages_db.items():
+        for i, msg in enumerate(messages):
+            if msg["id"] == message_id:
+                return session_id, i, msg
+    return None
+
+
+def build(repository, total: int, per_session: int):
+    now = datetime.now()
+    message_ids = []
+    for s in range(total // per_session):
+        session_id = f"session-{s}"
+        repository.create_session({"id": session_id, "title": f"채팅 {s}", "createdAt": now, "updatedAt": now,
+                                   "messageCount": 0})
+        batch = []
+        for m in range(per_session):
+            message_id = f"{session_id}-msg-{m}"
+            batch.append({"id": message_id, "content": "이번 분기 영업 성과는 어떤가요?",
+                          "role": "user" if m % 2 == 0 else "assistant", "timestamp": now, "sessionId": session_id})
+            message_ids.append(message_id)
+        repository.replace_messages(session_id, batch)
+    return message_ids
+
+
+def measure(label: str, fn, samples):
+    start = time.perf_counter()
+    for sample in samples:
+        fn(sample)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<38} {elapsed / len(samples) * 1e6:>12.1f} µs/op")
+
+
+def run(repository, name: str, total: int, per_session: int, legacy: bool):
+    print(f"\n[{name}] building {total:,} messages ({per_session} per session)...")
+    start = time.perf_counter()
+    message_ids = build(repository, total, per_session)
+    print(f"  build time: {time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(42)
+    lookups = rng.sample(message_ids, 1000)
+
+    if legacy:
+        messages_db = {s["id"]: repository.get_messages(s["id"]) for s in repository.iter_sessions()}
+        measure("legacy scan find", lambda mid: legacy_find(messages_db, mid), lookups[:20])
+
+    measure("indexed find_message", repository.find_message, lookups)
+    measure("indexed replace_message (regenerate)",
+            lambda mid: repository.replace_message(mid, {"id": mid, "content": "새 답변", "role": "assistant",
+                                                         "timestamp": datetime.now(), "sessionId": ""}),
+            lookups[:500])
+    measure("indexed delete_message", repository.delete_message, lookups[500:])
+    missing = [mid for mid in lookups[500:] if repository.find_message(mid) is not None]
+    print(f"  deleted messages still indexed: {len(missing)}")
+
+    # 한 세션에 긴 대화: 맨 앞 메시지 삭제(뒤쪽 전체가 남음)와 맨 뒤 메시지 삭제 비교
+    long_session = "long-session"
+    now = datetime.now()
+    repository.create_session({"id": long_session, "title": "긴 대화", "createdAt": now, "updatedAt": now,
+                               "messageCount": 0})
+    long_ids = [f"long-{m}" for m in range(per_session * 100)]
+    repository.replace_messages(long_session, [
+        {"id": message_id, "content": "긴 대화", "role": "user", "timestamp": now, "sessionId": long_session}
+        for message_id in long_ids
+    ])
+    measure(f"delete_message head of {len(long_ids):,}", repository.delete_message, long_ids[:500])
+    measure(f"delete_message tail of {len(long_ids):,}", repository.delete_message, long_ids[:-501:-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--per-session", type=int, default=100)
+    parser.add_argument("--sqlite", action="store_true", help="SQLite 저장소도 측정")
+    args = parser.parse_args()
+
+    run(InMemoryChatRepository(), "memory", args.messages, args.per_session, legacy=True)
+
+    if args.sqlite:
+        with tempfile.TemporaryDirectory() as tmp:
+            repository = SQLiteChatRepository(os.path.join(tmp, "bench.db"))
+            run(repository, "sqlite", args.messages, args.per_session, legacy=False)
+            repository.close()
+
+
+if __name__ == "__main__":
+    main()
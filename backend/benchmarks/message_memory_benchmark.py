@@ -0,0 +1,81 @@
+"""
+메시지 레코드 메모리 벤치마크
+ChatMessage(...).dict() 형태의 dict 저장과 MessageRecord(__slots__) 저장의 메모리 사용량 비교
+
+실행: python benchmarks/message_memory_benchmark.py [--messages 1000000] [--per-session 100]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import MessageRecord  # noqa: E402
+
+
+def make_messages(total: int, per_session: int):
+    """메시지 ID와 본문은 두 방식이 공유 (요청마다 파싱되는 sessionId는 dict 쪽에서 별도 문자열)"""
+    base = datetime(2025, 1, 1)
+    session_ids = [str(uuid.uuid4()) for _ in range(max(1, total // per_session))]
+    contents = [f"이번 분기 영업 성과 #{i % 1000}" for i in range(1000)]
+    return [
+        (str(uuid.uuid4()), contents[i % 1000], "user" if i % 2 == 0 else "assistant",
+         base + timedelta(seconds=i), session_ids[i // per_session % len(session_ids)])
+        for i in range(total)
+    ]
+
+
+def build_dicts(rows):
+    return [
+        {"id": message_id, "content": content, "role": role,
+         "timestamp": datetime.fromtimestamp(timestamp.timestamp()), "sessionId": session_id.encode().decode()}
+        for message_id, content, role, timestamp, session_id in rows
+    ]
+
+
+def build_records(rows):
+    return [
+        MessageRecord.from_message({"id": message_id, "content": content, "role": role,
+                                    "timestamp": timestamp, "sessionId": session_id}, session_id)
+        for message_id, content, role, timestamp, session_id in rows
+    ]
+
+
+def measure(label: str, build, rows):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = build(rows)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_message = current / len(rows)
+    print(f"  {label:<28} {current / 2 ** 20:>10.1f} MiB  {per_message:>7.1f} B/msg  build {elapsed:.1f}s")
+    del store
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--per-session", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"preparing {args.messages:,} messages...")
+    rows = make_messages(args.messages, args.per_session)
+
+    legacy = measure("dict (ChatMessage.dict())", build_dicts, rows)
+    compact = measure("MessageRecord (__slots__)", build_records, rows)
+
+    saved = (legacy - compact) / args.messages * 1_000_000
+    print(f"\n  saved per 1M messages: {saved / 2 ** 20:.1f} MiB ({(1 - compact / legacy) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+스트리밍 청크 인코딩 벤치마크
+델타마다 ChatStreamChunk(...).json() / json.dumps(dict)로 만드는 기존 방식과 StreamChunkEncoder 비교
+
+실행: python benchmarks/sse_encoder_benchmark.py [--deltas 200000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+import warnings
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sse_encoder import StreamChunkEncoder  # noqa: E402
+
+
+class ChatStreamChunk(BaseModel):
+    """main.ChatStreamChunk와 같은 필드 구성 (main은 OpenAI 클라이언트 초기화가 필요해 직접 import하지 않음)"""
+    id: str
+    content: str
+    role: str
+    timestamp: datetime
+    sessionId: str
+    isComplete: bool = False
+    functionCall: Optional[str] = None
+    functionStatus: Optional[str] = None
+
+
+def make_deltas(total: int):
+    """스트리밍 델타와 비슷한 1~6자 조각 (한글/영문/줄바꿈/따옴표 혼합)"""
+    pieces = ["안녕", "하세요", " 이번", " 분기", " 매출은", " 12%", " 증가", "했습니다.", "\n\n", " **", "\"요약\"", " sales", " up"]
+    return [pieces[i % len(pieces)] for i in range(total)]
+
+
+def pydantic_path(message_id, session_id, deltas):
+    for delta in deltas:
+        chunk = ChatStreamChunk(
+            id=message_id,
+            content=delta,
+            role="assistant",
+            timestamp=datetime.now(),
+            sessionId=session_id,
+            isComplete=False
+        )
+        yield f"data: {chunk.json()}\n\n"
+
+
+def dict_path(message_id, session_id, deltas):
+    for delta in deltas:
+        chunk_data = {
+            "id": message_id,
+            "content": delta,
+            "role": "assistant",
+            "timestamp": datetime.now().isoformat(),
+            "sessionId": session_id,
+            "isComplete": False
+        }
+        yield f"data: {json.dumps(chunk_data)}\n\n"
+
+
+def encoder_path(encoder, deltas):
+    for delta in deltas:
+        yield encoder.encode(delta)
+
+
+def measure(label: str, frames) -> float:
+    start = time.perf_counter()
+    count = 0
+    for _ in frames:
+        count += 1
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<36} {elapsed:>7.3f}s  {elapsed / count * 1e6:>6.2f} µs/delta")
+    return elapsed
+
+
+def check_identical(message_id, session_id, deltas):
+    """같은 timestamp에서 기존 방식과 바이트 단위로 같은지 확인"""
+    timestamp = datetime.now()
+    chat_encoder = StreamChunkEncoder.for_model(ChatStreamChunk, message_id, session_id)
+    dict_encoder = StreamChunkEncoder(message_id, session_id, compact=False)
+    for delta in set(deltas):
+        chunk = ChatStreamChunk(id=message_id, content=delta, role="assistant", timestamp=timestamp,
+                                sessionId=session_id, isComplete=False)
+        assert chat_encoder.encode(delta, timestamp=timestamp) == f"data: {chunk.json()}\n\n"
+        chunk_data = {"id": message_id, "content": delta, "role": "assistant", "timestamp": timestamp.isoformat(),
+                      "sessionId": session_id, "isComplete": False}
+        assert dict_encoder.encode(delta, timestamp=timestamp) == f"data: {json.dumps(chunk_data)}\n\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--deltas", type=int, default=200_000)
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")  # pydantic v2의 .json() deprecation 경고 (main과 동일 조건)
+    message_id, session_id = str(uuid.uuid4()), str(uuid.uuid4())
+    deltas = make_deltas(args.deltas)
+    check_identical(message_id, session_id, deltas)
+    print(f"{args.deltas:,} deltas, wire format identical\n")
+
+    legacy = measure("ChatStreamChunk(...).json()", pydantic_path(message_id, session_id, deltas))
+    fast = measure("StreamChunkEncoder (compact)", encoder_path(
+        StreamChunkEncoder.for_model(ChatStreamChunk, message_id, session_id), deltas))
+    print(f"  -> {legacy / fast:.1f}x\n")
+
+    legacy = measure("json.dumps(dict)", dict_path(message_id, session_id, deltas))
+    fast = measure("StreamChunkEncoder (compact=False)", encoder_path(
+        StreamChunkEncoder(message_id, session_id, compact=False), deltas))
+    print(f"  -> {legacy / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
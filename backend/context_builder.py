@@ -0,0 +1,129 @@
+"""
+채팅 컨텍스트 구성 모듈
+모든 채팅 엔드포인트가 공유하는 시스템 프롬프트 캐시 + 대화 메시지 구성
+"""
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from context_packer import pack_context, pack_turns, input_budget
+from context_window import ContextWindowCache
+
+KST = timezone(timedelta(hours=9))
+
+GOOGLE_MENTION_KEYWORDS = ['@캘린더', '@메일', '@일정생성', '@빈시간']
+
+ASSISTANT_PROMPT = "당신은 NSales Pro의 영업 AI 도우미입니다. 영업 데이터 분석, 프로젝트 정보 조회, 업무 관련 질문에 도움을 주세요. 한국어로 친근하고 전문적으로 답변해주세요. 이전 대화 내용을 기억하고 문맥을 유지하여 답변하세요."
+
+WEB_SEARCH_PROMPT = " 최신 정보가 필요하거나 실시간 데이터, 뉴스, 시장 동향 등을 질문받으면 웹 검색을 적극 활용하여 정확하고 최신의 정보를 제공하세요."
+
+TIME_PROMPT = """
+
+**현재 시간 정보:**
+- 현재 날짜: {date}
+- 현재 시간: {time}
+- 시간대: 한국 표준시 (KST, UTC+9)
+
+"오늘", "이번 주", "이번 달" 등의 시간 표현을 사용할 때는 위의 한국 시간 기준으로 해석해주세요."""
+
+GOOGLE_MENTION_PROMPT = "\n\n**🎯 Google 서비스 멘션 감지됨:**\n사용자가 @멘션을 사용했습니다. 다음 함수를 반드시 호출하여 요청을 처리하세요:\n- @캘린더 → get_calendar_events 함수 호출\n- @메일 → get_emails 또는 send_email 함수 호출\n- @일정생성 → create_calendar_event 함수 호출\n- @빈시간 → find_free_time 함수 호출\n\n멘션이 포함된 요청은 반드시 해당 함수를 실행하여 실제 데이터를 제공해야 합니다."
+
+GOOGLE_GUIDE_DETAILED_PROMPT = "\n\n**Google 서비스 연동 안내:**\n사용자가 캘린더, 일정, 스케줄, Gmail, 이메일 관련 질문을 하면 다음 함수들을 적극 활용하세요:\n- get_calendar_events: 캘린더 일정 조회 (오늘, 이번주, 이번달 등)\n- create_calendar_event: 새 일정 생성\n- send_email: 이메일 전송\n- get_emails: 이메일 조회\n- find_free_time: 빈 시간 찾기\n\n사용자가 '캘린더', '일정', '스케줄' 등의 키워드를 사용하면 반드시 해당 함수를 호출하여 실제 데이터를 제공하세요."
+
+GOOGLE_GUIDE_BRIEF_PROMPT = "\n\n**🛠️ Google 서비스 활용 가능:**\n캘린더 조회, 이메일 관리, 일정 생성 등의 요청 시 Google 함수를 적극 활용하여 실제 데이터를 제공해주세요."
+
+# 엔드포인트별 프롬프트 구성: (기본 프롬프트, 현재 시간 포함 여부, Google 인증 시 안내문)
+PROMPT_PROFILES: Dict[str, Tuple[str, bool, Optional[str]]] = {
+    "chat": (ASSISTANT_PROMPT + WEB_SEARCH_PROMPT, False, GOOGLE_GUIDE_DETAILED_PROMPT),      # send_message
+    "stream": (ASSISTANT_PROMPT + WEB_SEARCH_PROMPT, True, GOOGLE_GUIDE_BRIEF_PROMPT),        # stream_chat
+    "enhanced": (ASSISTANT_PROMPT + WEB_SEARCH_PROMPT, True, None),                          # enhanced_chat_stream
+    "regenerate": (ASSISTANT_PROMPT, False, None),                                           # regenerate_message
+}
+
+
+# TIME_PROMPT 형식의 현재 시간 섹션 (날짜/시간 값만 다른 부분)
+TIME_PROMPT_PATTERN = re.compile(
+    re.escape(TIME_PROMPT).replace(re.escape("{date}"), "(?P<date>[^\n]*)").replace(re.escape("{time}"), "[^\n]*")
+)
+
+
+def strip_time_prompt(prompt: str) -> str:
+    """시스템 프롬프트의 현재 시간 섹션에서 분 단위로 바뀌는 시각 값만 제거 (날짜는 유지, 캐시 키 등 비교용)"""
+    return TIME_PROMPT_PATTERN.sub(lambda match: TIME_PROMPT.format(date=match["date"], time=""), prompt)
+
+
+def split_time_prompt(prompt: str) -> Tuple[str, str]:
+    """(현재 시간 섹션을 뺀 프롬프트, 현재 시간 섹션) - 시간 섹션이 없으면 두 번째 값은 빈 문자열"""
+    match = TIME_PROMPT_PATTERN.search(prompt)
+    if match is None:
+        return prompt, ""
+    return prompt[:match.start()] + prompt[match.end():], match.group(0)
+
+
+def detect_google_mention(content: str) -> bool:
+    """Google 서비스 @멘션 포함 여부"""
+    return any(keyword in content for keyword in GOOGLE_MENTION_KEYWORDS)
+
+
+class ContextBuilder:
+    """채팅 엔드포인트 공용 컨텍스트 구성기
+
+    - 시스템 프롬프트는 (프로필, 멘션 여부, Google 인증 여부, 분 단위 KST 시각) 키로 캐시
+    - 대화 메시지는 ContextWindowCache의 변환 완료된 뷰를 그대로 사용 (새 턴만 증분 변환)
+    - 뷰는 모델별 토큰 예산(context_window - max_tokens)에 맞춰 context_packer로 채움
+    """
+
+    def __init__(self, context_windows: ContextWindowCache, max_cached_prompts: int = 64):
+        self.context_windows = context_windows
+        self.max_cached_prompts = max_cached_prompts
+        self._prompts: Dict[Tuple, str] = {}
+
+    def system_prompt(self, profile: str, mention_detected: bool = False, google_authenticated: bool = False,
+                      now: Optional[datetime] = None) -> str:
+        base, with_time, google_guide = PROMPT_PROFILES[profile]
+        mention = mention_detected and google_authenticated and google_guide is not None
+        google = google_authenticated and google_guide is not None
+
+        current_time = (now or datetime.now(KST)) if with_time else None
+        minute = current_time.strftime('%Y%m%d%H%M') if current_time else None
+        key = (profile, mention, google, minute)
+
+        prompt = self._prompts.get(key)
+        if prompt is not None:
+            return prompt
+
+        prompt = base
+        if current_time is not None:
+            prompt += TIME_PROMPT.format(
+                date=current_time.strftime('%Y년 %m월 %d일 (%A)'),
+                time=current_time.strftime('%H시 %M분')
+            )
+        if mention:
+            prompt += GOOGLE_MENTION_PROMPT
+        elif google:
+            prompt += google_guide
+
+        # 지난 분의 프롬프트는 다시 쓰이지 않으므로 상한 도달 시 비움
+        if len(self._prompts) >= self.max_cached_prompts:
+            self._prompts.clear()
+        self._prompts[key] = prompt
+        return prompt
+
+    def build(self, session_id: str, system_prompt: str, model_config: Dict[str, Any],
+              retrieved: Sequence[str] = (), reserved_tokens: int = 0) -> List[Dict[str, Any]]:
+        """[시스템 프롬프트] + [요약] + [검색 컨텍스트] + 현재 사용자 메시지까지의 최근 대화 (모델 예산 내)
+
+        필수 부분(시스템 프롬프트 + 현재 사용자 메시지)이 예산을 넘으면 ContextBudgetExceeded
+        """
+        view = self.context_windows.get(session_id)
+        return pack_context(
+            system_prompt, view.messages, model_config,
+            summary=view.prefix, retrieved=retrieved,
+            turn_tokens=view.message_tokens, reserved_tokens=reserved_tokens
+        )
+
+    def recent_turns(self, session_id: str, model_config: Dict[str, Any],
+                     reserved_tokens: int = 0) -> List[Dict[str, Any]]:
+        """시스템 메시지 없이 예산 안에 들어가는 최근 user/assistant 대화 (Thread 초기화 등)"""
+        view = self.context_windows.get(session_id)
+        return pack_turns(view.messages, input_budget(model_config, reserved_tokens), view.message_tokens)
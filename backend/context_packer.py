@@ -0,0 +1,116 @@
+"""
+토큰 예산 기반 컨텍스트 패킹 모듈
+모델별 컨텍스트/출력 한도 안에서 시스템 프롬프트 > 요약 > 검색 컨텍스트 > 최근 대화 순으로 채움
+"""
+import json
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from tokenizer import count_tokens
+
+# OpenAI 채팅 형식의 메시지당 고정 오버헤드와 응답 시작 토큰
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_PRIMING_TOKENS = 3
+
+DEFAULT_CONTEXT_WINDOW = 8192
+DEFAULT_OUTPUT_TOKENS = 2000
+
+
+class ContextBudgetExceeded(Exception):
+    """필수 컨텍스트(시스템 프롬프트 + 현재 사용자 메시지)만으로도 모델 한도를 넘는 요청"""
+
+    def __init__(self, required_tokens: int, available_tokens: int):
+        self.required_tokens = required_tokens
+        self.available_tokens = available_tokens
+        super().__init__(
+            f"Request needs {required_tokens} input tokens but the model allows {available_tokens}"
+        )
+
+
+def input_budget(model_config: Dict[str, Any], reserved_tokens: int = 0) -> int:
+    """모델 컨텍스트 한도에서 출력 예산과 예약분(도구 스키마 등)을 뺀 입력 예산"""
+    context_window = model_config.get("context_window", DEFAULT_CONTEXT_WINDOW)
+    output_tokens = model_config.get("max_tokens", DEFAULT_OUTPUT_TOKENS)
+    return context_window - output_tokens - REPLY_PRIMING_TOKENS - reserved_tokens
+
+
+def message_cost(message: Dict[str, Any], tokens: Optional[int] = None,
+                 counter: Callable[[str], int] = count_tokens) -> int:
+    if tokens is None:
+        tokens = message.get("tokens")
+    if tokens is None:
+        content = message.get("content", "")
+        tokens = counter(content if isinstance(content, str) else str(content))
+    return tokens + MESSAGE_OVERHEAD_TOKENS
+
+
+def tools_tokens(tools: Optional[Sequence[Dict[str, Any]]], counter: Callable[[str], int] = count_tokens) -> int:
+    """요청에 함께 전송되는 도구 스키마의 토큰 수 (입력 예산에서 예약)"""
+    if not tools:
+        return 0
+    return counter(json.dumps(list(tools), ensure_ascii=False))
+
+
+def ensure_fits(system_prompt: Optional[str], user_content: str, model_config: Dict[str, Any],
+                reserved_tokens: int = 0, counter: Callable[[str], int] = count_tokens) -> int:
+    """시스템 프롬프트 + 현재 사용자 메시지가 입력 예산 안에 들어가는지 확인 (남는 예산 반환)
+
+    OpenAI 호출(및 메시지 저장) 전에 불가능한 요청을 걸러내기 위해 사용
+    """
+    budget = input_budget(model_config, reserved_tokens)
+    required = message_cost({"content": user_content}, counter=counter)
+    if system_prompt:
+        required += message_cost({"content": system_prompt}, counter=counter)
+    if required > budget:
+        raise ContextBudgetExceeded(required, budget)
+    return budget - required
+
+
+def pack_turns(turns: Sequence[Dict[str, Any]], budget: int, turn_tokens: Optional[Sequence[int]] = None,
+               counter: Callable[[str], int] = count_tokens) -> List[Dict[str, Any]]:
+    """최근 대화부터 예산 안에 들어가는 만큼 선택 (시간순 반환)"""
+    kept = []
+    for i in range(len(turns) - 1, -1, -1):
+        cost = message_cost(turns[i], turn_tokens[i] if turn_tokens is not None else None, counter)
+        if cost > budget:
+            break
+        kept.append(turns[i])
+        budget -= cost
+    kept.reverse()
+    return kept
+
+
+def pack_context(system_prompt: Optional[str], turns: Sequence[Dict[str, Any]], model_config: Dict[str, Any],
+                 summary: Sequence[Dict[str, Any]] = (), retrieved: Sequence[str] = (),
+                 turn_tokens: Optional[Sequence[int]] = None, reserved_tokens: int = 0,
+                 counter: Callable[[str], int] = count_tokens) -> List[Dict[str, Any]]:
+    """우선순위에 따라 모델 입력 메시지 구성
+
+    1. 시스템 프롬프트, 마지막 턴(현재 사용자 메시지): 필수 - 들어가지 않으면 ContextBudgetExceeded
+    2. 대화 요약 3. 검색된 컨텍스트: 들어가는 항목만 포함
+    4. 나머지 최근 대화: 최신 순으로 남은 예산만큼
+    """
+    system_messages = [{"role": "system", "content": system_prompt}] if system_prompt else []
+    last_turn = list(turns[-1:])
+    budget = input_budget(model_config, reserved_tokens)
+    required = sum(message_cost(m, counter=counter) for m in system_messages)
+    if last_turn:
+        required += message_cost(last_turn[0], turn_tokens[-1] if turn_tokens is not None else None, counter)
+    if required > budget:
+        raise ContextBudgetExceeded(required, budget)
+    budget -= required
+
+    optional: List[Dict[str, Any]] = []
+    for message in summary:
+        cost = message_cost(message, counter=counter)
+        if cost <= budget:
+            optional.append(message)
+            budget -= cost
+    for text in retrieved:
+        message = {"role": "system", "content": text}
+        cost = message_cost(message, counter=counter)
+        if cost <= budget:
+            optional.append(message)
+            budget -= cost
+
+    history = pack_turns(turns[:-1], budget, turn_tokens[:-1] if turn_tokens is not None else None, counter)
+    return system_messages + optional + history + last_turn
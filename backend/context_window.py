@@ -0,0 +1,156 @@
+"""
+모델 컨텍스트 뷰 모듈
+저장된 전체 히스토리는 그대로 두고, 모델에 보낼 "요약 + 최근 대화" 뷰를 세션별로 캐시
+"""
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from storage import ChatRepository
+from summarizer import ConversationSummarizer
+
+logger = logging.getLogger(__name__)
+
+
+def summary_message(summary: str) -> Dict[str, str]:
+    return {
+        "role": "system",
+        "content": f"이전 대화 요약: {summary}\n\n위 내용을 참고하여 지속적이고 일관된 대화를 이어가세요."
+    }
+
+
+class ContextView:
+    """세션 하나의 컨텍스트 뷰 (OpenAI 메시지 형식으로 변환된 상태로 보관)"""
+
+    __slots__ = ("revision", "summary_revision", "prefix", "prefix_tokens", "messages", "message_ids", "message_tokens")
+
+    def __init__(self):
+        self.revision: Tuple = ()
+        self.summary_revision: Optional[str] = None
+        self.prefix: List[Dict[str, str]] = []       # 요약 시스템 메시지
+        self.prefix_tokens = 0
+        self.messages: List[Dict[str, str]] = []     # 요약 이후 최근 대화 {"role", "content"}
+        self.message_ids: List[Optional[str]] = []
+        self.message_tokens: List[int] = []
+
+    @property
+    def tokens(self) -> int:
+        return self.prefix_tokens + sum(self.message_tokens)
+
+    def as_messages(self) -> List[Dict[str, str]]:
+        return self.prefix + self.messages
+
+
+class ContextWindowCache:
+    """세션별 모델 컨텍스트 뷰 캐시
+
+    - 뷰 = [요약 시스템 메시지] + 요약에 반영되지 않은 최근 메시지 (개수/토큰 상한)
+    - 저장소의 토큰 누적치(메시지 추가/삭제 시 갱신)와 요약 상태가 바뀌지 않으면 캐시된 뷰 재사용
+    - 메시지가 추가만 된 경우 새 메시지만 변환해 뒤에 붙이고, 그 외 변경은 최근 tail_messages개만 읽어 재구성
+    - 뷰는 최근 사용한 max_sessions개 세션만 보관 (LRU)
+    """
+
+    def __init__(self, repository: ChatRepository, summarizer: ConversationSummarizer,
+                 tail_messages: int = 15, max_tokens: int = 8000, max_sessions: int = 1000):
+        self.repository = repository
+        self.summarizer = summarizer
+        self.tail_messages = tail_messages
+        self.max_tokens = max_tokens
+        self.max_sessions = max_sessions
+        self._views: "OrderedDict[str, ContextView]" = OrderedDict()
+
+    def _tokens(self, message: Dict[str, Any]) -> int:
+        """캐시된 메시지 토큰 수 (요약 메시지처럼 캐시가 없으면 저장소 token_counter로 계산)"""
+        if message.get("tokens") is None and self.repository.token_counter is not None:
+            return self.repository.token_counter(message.get("content", ""))
+        return self.repository.message_tokens(message)
+
+    def get_view(self, session_id: str) -> List[Dict[str, str]]:
+        """모델 컨텍스트용 메시지 목록 (저장된 히스토리는 변경하지 않음)"""
+        return self.get(session_id).as_messages()
+
+    def get_view_tokens(self, session_id: str) -> int:
+        return self.get(session_id).tokens
+
+    def invalidate(self, session_id: str) -> None:
+        self._views.pop(session_id, None)
+
+    def get(self, session_id: str) -> ContextView:
+        summary_state = self.summarizer.get_state(session_id)
+        summary_revision = summary_state.get("updated_at") if summary_state else None
+        usage = self.repository.get_token_usage(session_id)
+        revision = (usage["messages_count"], usage["total_tokens"], usage["last_updated"], summary_revision)
+
+        view = self._views.get(session_id)
+        if view is not None:
+            self._views.move_to_end(session_id)
+            if view.revision == revision:
+                return view
+
+        if view is None or view.summary_revision != summary_revision or not self._extend(session_id, view, usage):
+            view = self._build(session_id, summary_state)
+
+        view.revision = revision
+        view.summary_revision = summary_revision
+        self._views[session_id] = view
+        while len(self._views) > self.max_sessions:
+            self._views.popitem(last=False)
+        return view
+
+    def _append(self, view: ContextView, message: Dict[str, Any]) -> None:
+        view.messages.append({"role": message["role"], "content": message["content"]})
+        view.message_ids.append(message.get("id"))
+        view.message_tokens.append(self._tokens(message))
+
+    def _trim(self, view: ContextView) -> None:
+        """개수/토큰 상한을 넘는 오래된 메시지 제거 (마지막 메시지는 항상 유지)"""
+        budget = self.max_tokens - view.prefix_tokens
+        total = sum(view.message_tokens)
+        drop = 0
+        while len(view.messages) - drop > 1 and (
+                len(view.messages) - drop > self.tail_messages or total > budget):
+            total -= view.message_tokens[drop]
+            drop += 1
+        if drop:
+            del view.messages[:drop], view.message_ids[:drop], view.message_tokens[:drop]
+
+    def _extend(self, session_id: str, view: ContextView, usage: Dict[str, Any]) -> bool:
+        """마지막 뷰 이후 메시지가 추가만 되었으면 새 메시지만 붙임 (불가능하면 False)"""
+        previous_count = view.revision[0] if view.revision else 0
+        added = usage["messages_count"] - previous_count
+        if added <= 0 or added > self.tail_messages or not view.message_ids or view.message_ids[-1] is None:
+            return False
+
+        # 이전 뷰의 마지막 메시지 바로 뒤부터 added개가 새 메시지인지 확인
+        recent = self.repository.get_recent_messages(session_id, added + 1)
+        if len(recent) != added + 1 or recent[0].get("id") != view.message_ids[-1]:
+            return False
+        # 그 사이 다른 메시지가 교체/삭제되었다면 토큰 누적치가 맞지 않음
+        added_tokens = sum(self.repository.message_tokens(message) for message in recent[1:])
+        if view.revision[1] + added_tokens != usage["total_tokens"]:
+            return False
+
+        for message in recent[1:]:
+            self._append(view, message)
+        self._trim(view)
+        return True
+
+    def _build(self, session_id: str, summary_state: Optional[Dict[str, Any]]) -> ContextView:
+        view = ContextView()
+        tail = self.repository.get_recent_messages(session_id, self.tail_messages)
+
+        summary = summary_state.get("summary") if summary_state else ""
+        if summary:
+            # 이미 요약에 반영된 메시지는 tail에서 제외
+            last_message_id = summary_state.get("last_message_id")
+            for i in range(len(tail) - 1, -1, -1):
+                if last_message_id and tail[i].get("id") == last_message_id:
+                    tail = tail[i + 1:]
+                    break
+            view.prefix = [summary_message(summary)]
+            view.prefix_tokens = self._tokens(view.prefix[0])
+
+        for message in tail:
+            self._append(view, message)
+        self._trim(view)
+        return view
@@ -229,7 +229,7 @@ GOOGLE_TOOLS = [
 ]
 
 # AI 함수 구현
-def get_calendar_events(start_date: str = None, end_date: str = None, max_results: int = 50, **kwargs) -> str:
+async def get_calendar_events(start_date: str = None, end_date: str = None, max_results: int = 50, **kwargs) -> str:
     """캘린더 일정 조회 함수"""
     try:
         if not auth_service.is_authenticated():
@@ -274,7 +274,7 @@ def get_calendar_events(start_date: str = None, end_date: str = None, max_result
             if not end_date:
                 end_date = today.strftime('%Y-%m-%d')
         
-        events = calendar_service.get_events(start_date, end_date, max_results)
+        events = await calendar_service.fetch_events(start_date, end_date, max_results)
         
         if not events:
             return json.dumps({
@@ -483,7 +483,7 @@ def get_emails(query: str = "", max_results: int = 10) -> str:
             "error": f"이메일 조회 중 오류가 발생했습니다: {str(e)}"
         }, ensure_ascii=False)
 
-def find_free_time(
+async def find_free_time(
     start_date: str,
     end_date: str,
     duration_minutes: int = 60,
@@ -497,7 +497,7 @@ def find_free_time(
             }, ensure_ascii=False)
         
         # 기간 내 모든 일정 조회
-        events = calendar_service.get_events(start_date, end_date)
+        events = await calendar_service.fetch_events(start_date, end_date)
         
         # 빈 시간 계산 로직
         free_slots = []
@@ -6,6 +6,8 @@ Google Calendar, Gmail API와 AI 통합을 위한 서비스 클래스들
 import os
 import json
 import pickle
+import asyncio
+import threading
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
@@ -16,6 +18,12 @@ from google_auth_oauthlib.flow import Flow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+from app_logging import get_logger
+from metrics import track_google
+from singleflight import SingleFlight
+
+logger = get_logger("google")
+
 # Google API 스코프 정의
 SCOPES = [
     'https://www.googleapis.com/auth/calendar',
@@ -81,7 +89,7 @@ class GoogleAuthService:
             return auth_url
             
         except Exception as e:
-            print(f"Authorization URL 생성 실패: {e}")
+            logger.error("Authorization URL 생성 실패: %s", e)
             return ""
     
     def handle_callback(self, code: str) -> bool:
@@ -99,11 +107,11 @@ class GoogleAuthService:
             with open(self.token_file, 'wb') as token:
                 pickle.dump(flow.credentials, token)
             
-            print("Google 인증 성공!")
+            logger.info("Google 인증 성공!")
             return True
             
         except Exception as e:
-            print(f"인증 콜백 처리 실패: {e}")
+            logger.error("인증 콜백 처리 실패: %s", e)
             return False
     
     def get_credentials(self) -> Optional[Credentials]:
@@ -123,7 +131,7 @@ class GoogleAuthService:
                 with open(self.token_file, 'wb') as token:
                     pickle.dump(creds, token)
             except Exception as e:
-                print(f"토큰 갱신 실패: {e}")
+                logger.error("토큰 갱신 실패: %s", e)
                 return None
         
         return creds if creds and creds.valid else None
@@ -138,17 +146,28 @@ class GoogleCalendarService:
     def __init__(self, auth_service: GoogleAuthService):
         self.auth_service = auth_service
         self._service = None
+        # googleapiclient 서비스 객체(httplib2)는 스레드 안전하지 않으므로 이벤트 루프/작업 스레드 호출을 한 번에 하나씩
+        self._api_lock = threading.RLock()
+        self._event_flights = SingleFlight("calendar_events")
     
     def _get_service(self):
         """Calendar API 서비스 객체 생성"""
-        if not self._service:
-            creds = self.auth_service.get_credentials()
-            if not creds:
-                raise Exception("Google 인증이 필요합니다.")
-            
-            self._service = build('calendar', 'v3', credentials=creds)
-        
-        return self._service
+        with self._api_lock:
+            if not self._service:
+                creds = self.auth_service.get_credentials()
+                if not creds:
+                    raise Exception("Google 인증이 필요합니다.")
+
+                self._service = build('calendar', 'v3', credentials=creds)
+
+            return self._service
+
+    async def fetch_events(self, start_date: str, end_date: str, max_results: int = 50) -> List[Dict]:
+        """get_events를 작업 스레드에서 실행 (이벤트 루프를 막지 않고, 같은 범위의 동시 조회는 한 번만)"""
+        return await self._event_flights.do(
+            (start_date, end_date, max_results),
+            lambda: asyncio.to_thread(self.get_events, start_date, end_date, max_results)
+        )
     
     def get_events(self, start_date: str, end_date: str, max_results: int = 50) -> List[Dict]:
         """캘린더 이벤트 조회"""
@@ -159,14 +178,15 @@ class GoogleCalendarService:
             start_datetime = f"{start_date}T00:00:00Z"
             end_datetime = f"{end_date}T23:59:59Z"
             
-            events_result = service.events().list(
-                calendarId='primary',
-                timeMin=start_datetime,
-                timeMax=end_datetime,
-                maxResults=max_results,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
+            with self._api_lock, track_google("calendar.events.list"):
+                events_result = service.events().list(
+                    calendarId='primary',
+                    timeMin=start_datetime,
+                    timeMax=end_datetime,
+                    maxResults=max_results,
+                    singleEvents=True,
+                    orderBy='startTime'
+                ).execute()
             
             events = events_result.get('items', [])
             
@@ -189,10 +209,10 @@ class GoogleCalendarService:
             return formatted_events
             
         except HttpError as e:
-            print(f"Calendar API 오류: {e}")
+            logger.error("Calendar API 오류: %s", e)
             return []
         except Exception as e:
-            print(f"일정 조회 실패: {e}")
+            logger.error("일정 조회 실패: %s", e)
             return []
     
     def create_event(self, event_data: CalendarEvent) -> Dict:
@@ -222,10 +242,11 @@ class GoogleCalendarService:
                 event_body['attendees'] = [{'email': email} for email in event_data.attendees]
             
             # 이벤트 생성
-            event = service.events().insert(
-                calendarId='primary',
-                body=event_body
-            ).execute()
+            with self._api_lock, track_google("calendar.events.insert"):
+                event = service.events().insert(
+                    calendarId='primary',
+                    body=event_body
+                ).execute()
             
             return {
                 'success': True,
@@ -251,10 +272,11 @@ class GoogleCalendarService:
             service = self._get_service()
             
             # 기존 이벤트 조회
-            existing_event = service.events().get(
-                calendarId='primary',
-                eventId=event_id
-            ).execute()
+            with self._api_lock, track_google("calendar.events.get"):
+                existing_event = service.events().get(
+                    calendarId='primary',
+                    eventId=event_id
+                ).execute()
             
             # 업데이트할 필드만 수정
             if event_data.summary:
@@ -275,11 +297,12 @@ class GoogleCalendarService:
                 existing_event['location'] = event_data.location
             
             # 이벤트 업데이트
-            updated_event = service.events().update(
-                calendarId='primary',
-                eventId=event_id,
-                body=existing_event
-            ).execute()
+            with self._api_lock, track_google("calendar.events.update"):
+                updated_event = service.events().update(
+                    calendarId='primary',
+                    eventId=event_id,
+                    body=existing_event
+                ).execute()
             
             return {
                 'success': True,
@@ -303,10 +326,11 @@ class GoogleCalendarService:
         try:
             service = self._get_service()
             
-            service.events().delete(
-                calendarId='primary',
-                eventId=event_id
-            ).execute()
+            with self._api_lock, track_google("calendar.events.delete"):
+                service.events().delete(
+                    calendarId='primary',
+                    eventId=event_id
+                ).execute()
             
             return {
                 'success': True,
@@ -375,10 +399,11 @@ class GoogleGmailService:
             raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
             
             # 이메일 전송
-            result = service.users().messages().send(
-                userId='me',
-                body={'raw': raw_message}
-            ).execute()
+            with track_google("gmail.messages.send"):
+                result = service.users().messages().send(
+                    userId='me',
+                    body={'raw': raw_message}
+                ).execute()
             
             return {
                 'success': True,
@@ -403,21 +428,23 @@ class GoogleGmailService:
             service = self._get_service()
             
             # 메시지 목록 조회
-            results = service.users().messages().list(
-                userId='me',
-                q=query,
-                maxResults=max_results
-            ).execute()
+            with track_google("gmail.messages.list"):
+                results = service.users().messages().list(
+                    userId='me',
+                    q=query,
+                    maxResults=max_results
+                ).execute()
             
             messages = results.get('messages', [])
             
             # 메시지 상세 정보 조회
             detailed_messages = []
             for message in messages:
-                msg_detail = service.users().messages().get(
-                    userId='me',
-                    id=message['id']
-                ).execute()
+                with track_google("gmail.messages.get"):
+                    msg_detail = service.users().messages().get(
+                        userId='me',
+                        id=message['id']
+                    ).execute()
                 
                 # 헤더 정보 추출
                 headers = msg_detail['payload'].get('headers', [])
@@ -451,10 +478,10 @@ class GoogleGmailService:
             return detailed_messages
             
         except HttpError as e:
-            print(f"Gmail API 오류: {e}")
+            logger.error("Gmail API 오류: %s", e)
             return []
         except Exception as e:
-            print(f"메시지 조회 실패: {e}")
+            logger.error("메시지 조회 실패: %s", e)
             return []
     
     def get_unread_count(self) -> Dict:
@@ -463,10 +490,11 @@ class GoogleGmailService:
             service = self._get_service()
             
             # 읽지 않은 메시지 조회
-            results = service.users().messages().list(
-                userId='me',
-                q='is:unread'
-            ).execute()
+            with track_google("gmail.messages.list"):
+                results = service.users().messages().list(
+                    userId='me',
+                    q='is:unread'
+                ).execute()
             
             messages = results.get('messages', [])
             unread_count = len(messages)
@@ -1,14 +1,14 @@
 from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, RedirectResponse
+from fastapi.responses import Response, StreamingResponse, RedirectResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import asyncio
+import inspect
 import json
 import uuid
 from datetime import datetime, timezone, timedelta
 import os
-from openai import AsyncOpenAI
 import openai  # 에러 처리용
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
@@ -18,18 +18,61 @@ from PIL import Image
 import pytesseract
 import io
 import tempfile
+import time
 import logging
 import base64
 
+from tokenizer import count_tokens, get_tokenizer
+from summarizer import ConversationSummarizer
+from context_window import ContextWindowCache
+from context_builder import ContextBuilder, detect_google_mention, split_time_prompt
+from context_packer import ContextBudgetExceeded, ensure_fits, pack_context, pack_turns, input_budget, tools_tokens
+from sse_encoder import DeltaFrame, StreamChunkEncoder
+from stream_coalescer import coalesce_stream
+from openai_pool import OpenAIConnectionPool, OpenAIPoolSettings
+from rate_governor import RATE_LIMIT_SHED_CODE, RateGovernor
+from resilience import PATH_FAILURES, CircuitBreakers, retry_delay
+from api_router import APIPathError, APIRouter, RouteFeatures
+from assistant_pool import AssistantPool
+from thread_sync import ThreadSynchronizer
+from assistant_stream import assistant_run_deltas
+from response_cache import ResponseCache, mark_uncacheable, response_cache_key
+from singleflight import SingleFlight
+from metrics import (
+    CONTENT_TYPE_LATEST, OPENAI_RETRIES, REGISTRY, MetricsMiddleware, observe_openai, track_openai, track_stream,
+    track_tool
+)
+from app_logging import SampledLogger, configure_logging, get_logger
+from storage import (
+    create_repository,
+    CONVERSATION_SUMMARIES,
+    VECTOR_STORES,
+    SETTINGS,
+    make_snippet,
+    run_session_migrations,
+    SESSION_SCHEMA_VERSION,
+)
+
+# .env 파일 로드
+load_dotenv()
+
+# 로거 설정 (LOG_LEVEL / LOG_LEVELS로 서브시스템별 레벨, 출력은 큐 리스너 스레드에서)
+configure_logging()
+logger = get_logger("api")
+openai_logger = get_logger("openai")
+stream_logger = get_logger("stream")
+file_logger = get_logger("files")
+chunk_logger = SampledLogger(stream_logger, every=int(os.getenv("LOG_CHUNK_SAMPLE", "100")))  # 청크 단위 이벤트
+
 # Google 서비스 import
 try:
     from google_services import auth_service, calendar_service, gmail_service
     from google_functions import GOOGLE_TOOLS, FUNCTION_MAP
 
     GOOGLE_SERVICES_AVAILABLE = True
-    print("✅ Google 서비스가 성공적으로 로드되었습니다.")
+    logger.info("✅ Google 서비스가 성공적으로 로드되었습니다.")
 except ImportError as e:
-    print(f"⚠️ Google 서비스 로드 실패: {e}")
+    logger.warning("⚠️ Google 서비스 로드 실패: %s", e)
     GOOGLE_SERVICES_AVAILABLE = False
     GOOGLE_TOOLS = []
     FUNCTION_MAP = {}
@@ -38,9 +81,9 @@ except ImportError as e:
 try:
     from title_generator import TitleGenerator
     TITLE_GENERATOR_AVAILABLE = True
-    print("✅ Title Generator가 성공적으로 로드되었습니다.")
+    logger.info("✅ Title Generator가 성공적으로 로드되었습니다.")
 except ImportError as e:
-    print(f"⚠️ Title Generator 로드 실패: {e}")
+    logger.warning("⚠️ Title Generator 로드 실패: %s", e)
     TITLE_GENERATOR_AVAILABLE = False
 
 # 새로운 AI Tools 시스템 import
@@ -48,30 +91,13 @@ try:
     from tools.manager import tool_manager
 
     TOOLS_SYSTEM_AVAILABLE = True
-    print("✅ AI Tools 시스템이 성공적으로 로드되었습니다.")
-    print(f"📊 등록된 도구 상태: {tool_manager.get_status()}")
+    logger.info("✅ AI Tools 시스템이 성공적으로 로드되었습니다.")
+    logger.info("📊 등록된 도구 상태: %s", tool_manager.get_status())
 except ImportError as e:
-    print(f"⚠️ AI Tools 시스템 로드 실패: {e}")
+    logger.warning("⚠️ AI Tools 시스템 로드 실패: %s", e)
     TOOLS_SYSTEM_AVAILABLE = False
     tool_manager = None
 
-# .env 파일 로드
-load_dotenv()
-
-# 로거 설정
-logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
-
-# OpenAI 클라이언트 초기화
-client = AsyncOpenAI(
-    api_key=os.getenv("OPENAI_API_KEY", "your-openai-api-key-here")
-)
-
-# Title Generator 초기화
-title_generator = None
-if TITLE_GENERATOR_AVAILABLE:
-    title_generator = TitleGenerator(client)
-
 # 사용 가능한 AI 모델 설정
 AVAILABLE_MODELS = {
     "gpt-4o": {
@@ -80,8 +106,11 @@ AVAILABLE_MODELS = {
         "provider": "openai",
         "supports_web_search": True,
         "supports_assistant": True,
+        "context_window": 128000,  # 입력 + 출력 합계 토큰 한도
         "max_tokens": 4000,
-        "temperature": 0.7
+        "temperature": 0.7,
+        "rpm": int(os.getenv("OPENAI_GPT4O_RPM", "500")),  # 분당 요청/토큰 한도 (조직 등급에 맞게 설정)
+        "tpm": int(os.getenv("OPENAI_GPT4O_TPM", "30000"))
     },
     "gpt-4": {
         "name": "GPT-4",
@@ -89,8 +118,11 @@ AVAILABLE_MODELS = {
         "provider": "openai",
         "supports_web_search": True,
         "supports_assistant": True,
+        "context_window": 8192,
         "max_tokens": 4000,
-        "temperature": 0.7
+        "temperature": 0.7,
+        "rpm": int(os.getenv("OPENAI_GPT4_RPM", "500")),
+        "tpm": int(os.getenv("OPENAI_GPT4_TPM", "10000"))
     },
     "gpt-3.5-turbo": {
         "name": "GPT-3.5 Turbo",
@@ -98,29 +130,93 @@ AVAILABLE_MODELS = {
         "provider": "openai",
         "supports_web_search": False,
         "supports_assistant": False,
+        "context_window": 16385,
         "max_tokens": 2000,
-        "temperature": 0.7
+        "temperature": 0.7,
+        "rpm": int(os.getenv("OPENAI_GPT35_RPM", "3500")),
+        "tpm": int(os.getenv("OPENAI_GPT35_TPM", "200000"))
     }
 }
 
-# 메모리 저장소 (실제 환경에서는 데이터베이스 사용)
-sessions_db: Dict[str, Dict] = {}
-messages_db: Dict[str, List[Dict]] = {}
-assistants_db: Dict[str, str] = {}  # session_id -> assistant_id 매핑
-threads_db: Dict[str, str] = {}  # session_id -> thread_id 매핑
+# OpenAI 요청 속도 제어 (모델별 rpm/tpm 토큰 버킷, 대화형 요청 우선)
+rate_governor = RateGovernor(
+    AVAILABLE_MODELS,
+    headroom=float(os.getenv("OPENAI_RATE_LIMIT_HEADROOM", "0.9")),
+    interactive_max_wait=float(os.getenv("OPENAI_QUEUE_MAX_WAIT", "10")),
+    background_max_wait=float(os.getenv("OPENAI_BACKGROUND_MAX_WAIT", "120")),
+)
 
-# 📊 토큰 관리 및 최적화
-token_usage_db: Dict[str, Dict] = {}  # session_id -> token usage stats
-conversation_summaries: Dict[str, str] = {}  # session_id -> summary
+# OpenAI 클라이언트 초기화 (모든 호출이 하나의 튜닝된 커넥션 풀을 공유)
+openai_pool = OpenAIConnectionPool(OpenAIPoolSettings.from_env(), governor=rate_governor)
+client = openai_pool.create_client(os.getenv("OPENAI_API_KEY", "your-openai-api-key-here"))
+STREAM_TIMEOUT = openai_pool.stream_timeout  # 스트리밍 호출은 청크 간 idle 타임아웃 적용
+# safe_openai_call_with_retry가 재시도/백오프를 직접 관리하는 호출용 (SDK 재시도와 곱해지지 않도록)
+no_retry_client = client.with_options(max_retries=0)
+
+# API 경로별 서킷 브레이커: 연속 실패한 경로는 cooldown 동안 건너뛰고 폴백 경로로 바로 이동
+circuit_breakers = CircuitBreakers(
+    ("responses", "assistant", "chat_completions"),
+    failure_threshold=int(os.getenv("OPENAI_BREAKER_FAILURES", "5")),
+    cooldown=float(os.getenv("OPENAI_BREAKER_COOLDOWN", "30")),
+)
+OPENAI_RETRY_MAX_DELAY = float(os.getenv("OPENAI_RETRY_MAX_DELAY", "20"))
+
+# (모델, 기능 조합)별 API 경로 선택: 지원하지 않는 경로 기억 + EWMA 지연/오류율 기반 정렬 + 간헐적 탐색
+api_router = APIRouter(
+    probe_rate=float(os.getenv("OPENAI_ROUTE_PROBE_RATE", "0.05")),
+    capability_ttl=float(os.getenv("OPENAI_CAPABILITY_TTL", "3600")),
+)
+
+# Title Generator 초기화
+title_generator = None
+if TITLE_GENERATOR_AVAILABLE:
+    title_generator = TitleGenerator(client)
 
+# 채팅 저장소 (CHAT_STORAGE_BACKEND: sqlite | memory)
+# 세션, 메시지, 토큰 사용량, 요약, Assistant/Thread/벡터 스토어 매핑을 모두 저장
+repository = create_repository(token_counter=count_tokens)  # 메시지 저장 시 토큰 수 캐시
+
+# 설정별 공유 Assistant (존재 확인은 ASSISTANT_VERIFY_TTL초마다 한 번)
+assistant_pool = AssistantPool(
+    client, repository, verify_ttl=float(os.getenv("ASSISTANT_VERIFY_TTL", "3600"))
+)
+
+# 📊 토큰 관리 및 최적화
 # 토큰 사용량 추적 설정
 MAX_CONVERSATION_TOKENS = 8000  # 대화당 최대 토큰
 SUMMARY_TRIGGER_TOKENS = 6000  # 요약 트리거 토큰
 MAX_MESSAGES_PER_SESSION = 50  # 세션당 최대 메시지
 
+# 📡 스트리밍 델타 코얼레싱 (첫 델타는 즉시, 이후 N ms 또는 M 바이트마다 하나의 SSE 이벤트로 전송, 0이면 비활성)
+STREAM_COALESCE_MS = int(os.getenv("STREAM_COALESCE_MS", "50"))
+STREAM_COALESCE_BYTES = int(os.getenv("STREAM_COALESCE_BYTES", "1024"))
+
+# 백그라운드 누적 요약 워커 (lifespan에서 시작/종료)
+summarizer = ConversationSummarizer(client, repository, trigger_tokens=SUMMARY_TRIGGER_TOKENS)
+
+# 모델 컨텍스트 뷰 (요약 + 최근 대화, 저장된 전체 히스토리는 변경하지 않음)
+context_windows = ContextWindowCache(
+    repository, summarizer, tail_messages=MAX_MESSAGES_PER_SESSION, max_tokens=MAX_CONVERSATION_TOKENS,
+    max_sessions=int(os.getenv("CONTEXT_VIEW_MAX_SESSIONS", "1000"))  # 뷰를 보관할 최근 세션 수 (LRU)
+)
+
+# 채팅 엔드포인트 공용 컨텍스트 구성 (시스템 프롬프트 캐시 + 컨텍스트 뷰)
+context_builder = ContextBuilder(context_windows)
+
+# Assistant Thread 증분 동기화 (세션별 커서 이후 메시지만 전송, 존재 확인은 THREAD_VERIFY_TTL초마다)
+thread_sync = ThreadSynchronizer(
+    client, repository, context_builder, verify_ttl=float(os.getenv("THREAD_VERIFY_TTL", "600"))
+)
+
+# 💾 응답 캐시 (opt-in, 같은 모델/시스템 프롬프트/최근 대화/질문이면 저장된 응답 재사용)
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000")),
+    max_bytes=int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(8 * 1024 * 1024))),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL", "300")),
+) if os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() in ("1", "true", "on", "yes") else None
+
 # 🗂️ 벡터 스토어 및 지식 베이스 관리
-vector_stores_db: Dict[str, str] = {}  # session_id -> vector_store_id 매핑
-knowledge_base_id: str = None  # 전역 지식 베이스 벡터 스토어 ID
+KNOWLEDGE_BASE_KEY = "knowledge_base_id"  # 전역 지식 베이스 벡터 스토어 ID (SETTINGS 네임스페이스)
 
 
 # ===========================
@@ -131,8 +227,8 @@ async def create_or_get_vector_store(session_id: str = None, name: str = None) -
     """세션별 벡터 스토어 생성 또는 기존 벡터 스토어 반환"""
     try:
         # 세션별 벡터 스토어 확인
-        if session_id and session_id in vector_stores_db:
-            return vector_stores_db[session_id]
+        if session_id and repository.has_value(VECTOR_STORES, session_id):
+            return repository.get_value(VECTOR_STORES, session_id)
 
         # 새 벡터 스토어 생성
         vector_store_name = name or f"Session Vector Store {session_id or 'Global'}"
@@ -149,16 +245,15 @@ async def create_or_get_vector_store(session_id: str = None, name: str = None) -
         # 벡터 스토어 ID 저장
         vector_store_id = vector_store.id
         if session_id:
-            vector_stores_db[session_id] = vector_store_id
+            repository.set_value(VECTOR_STORES, session_id, vector_store_id)
         else:
-            global knowledge_base_id
-            knowledge_base_id = vector_store_id
+            repository.set_value(SETTINGS, KNOWLEDGE_BASE_KEY, vector_store_id)
 
-        logger.info(f"✅ Vector store created: {vector_store_id} for session: {session_id}")
+        logger.info("✅ Vector store created: %s for session: %s", vector_store_id, session_id)
         return vector_store_id
 
     except Exception as e:
-        logger.error(f"❌ Vector store creation failed: {str(e)}")
+        logger.error("❌ Vector store creation failed: %s", e)
         raise
 
 
@@ -171,16 +266,26 @@ async def add_file_to_vector_store(vector_store_id: str, file_id: str) -> bool:
             file_id=file_id
         )
 
-        logger.info(f"✅ File {file_id} added to vector store {vector_store_id}")
+        logger.info("✅ File %s added to vector store %s", file_id, vector_store_id)
         return vector_store_file.status == "completed"
 
     except Exception as e:
-        logger.error(f"❌ Failed to add file to vector store: {str(e)}")
+        logger.error("❌ Failed to add file to vector store: %s", e)
         return False
 
 
+# 같은 벡터 스토어/쿼리의 동시 검색은 한 번만 실행 (컨텍스트 검색, 세션 검색 API 공용)
+vector_search_flights = SingleFlight("vector_search")
+
+
 async def search_vector_store(vector_store_id: str, query: str, limit: int = 5) -> List[Dict]:
-    """벡터 스토어에서 유사한 문서 검색"""
+    """벡터 스토어에서 유사한 문서 검색 (진행 중인 같은 검색이 있으면 그 결과를 공유)"""
+    return await vector_search_flights.do(
+        (vector_store_id, query, limit), lambda: query_vector_store(vector_store_id, query, limit)
+    )
+
+
+async def query_vector_store(vector_store_id: str, query: str, limit: int) -> List[Dict]:
     try:
         # 벡터 스토어에서 검색 수행
         search_results = await client.beta.vector_stores.search(
@@ -199,11 +304,11 @@ async def search_vector_store(vector_store_id: str, query: str, limit: int = 5)
                 "metadata": result.metadata if hasattr(result, 'metadata') else {}
             })
 
-        logger.info(f"✅ Vector search completed: {len(formatted_results)} results")
+        logger.info("✅ Vector search completed: %s results", len(formatted_results))
         return formatted_results
 
     except Exception as e:
-        logger.error(f"❌ Vector store search failed: {str(e)}")
+        logger.error("❌ Vector store search failed: %s", e)
         return []
 
 
@@ -240,11 +345,11 @@ async def create_knowledge_base_embeddings(documents: List[str], session_id: str
                 except:
                     pass
 
-        logger.info(f"✅ Knowledge base created with {len(uploaded_files)} documents")
+        logger.info("✅ Knowledge base created with %s documents", len(uploaded_files))
         return vector_store_id
 
     except Exception as e:
-        logger.error(f"❌ Knowledge base creation failed: {str(e)}")
+        logger.error("❌ Knowledge base creation failed: %s", e)
         raise
 
 
@@ -253,10 +358,10 @@ async def get_relevant_context(query: str, session_id: str = None) -> str:
     try:
         # 세션별 벡터 스토어 확인
         vector_store_id = None
-        if session_id and session_id in vector_stores_db:
-            vector_store_id = vector_stores_db[session_id]
-        elif knowledge_base_id:
-            vector_store_id = knowledge_base_id
+        if session_id:
+            vector_store_id = repository.get_value(VECTOR_STORES, session_id)
+        if not vector_store_id:
+            vector_store_id = repository.get_value(SETTINGS, KNOWLEDGE_BASE_KEY)
 
         if not vector_store_id:
             logger.info("No vector store available for context search")
@@ -277,7 +382,7 @@ async def get_relevant_context(query: str, session_id: str = None) -> str:
         return "\n\n".join(context_parts)
 
     except Exception as e:
-        logger.error(f"❌ Context retrieval failed: {str(e)}")
+        logger.error("❌ Context retrieval failed: %s", e)
         return ""
 
 
@@ -299,161 +404,40 @@ async def list_vector_stores() -> List[Dict]:
         return stores_info
 
     except Exception as e:
-        logger.error(f"❌ Failed to list vector stores: {str(e)}")
+        logger.error("❌ Failed to list vector stores: %s", e)
         return []
 
 
 # 📊 토큰 관리 및 최적화 함수들
 def estimate_tokens(text: str) -> int:
-    """텍스트의 토큰 수를 추정 (1 토큰 ≈ 4 characters)"""
-    return max(1, len(text) // 4)
+    """텍스트의 토큰 수 계산 (TOKENIZER_VOCAB_PATH 어휘 파일이 있으면 BPE, 없으면 근사값)"""
+    return max(1, count_tokens(text))
 
 
 def calculate_conversation_tokens(messages: List[Dict]) -> int:
-    """대화의 총 토큰 수 계산"""
+    """대화의 총 토큰 수 계산 (저장 시 캐시된 메시지별 토큰 수 우선 사용)"""
     total_tokens = 0
     for message in messages:
-        content = message.get("content", "")
-        total_tokens += estimate_tokens(content)
+        tokens = message.get("tokens")
+        total_tokens += max(1, tokens) if tokens is not None else estimate_tokens(message.get("content", ""))
     return total_tokens
 
 
-async def create_conversation_summary(session_id: str, messages: List[Dict]) -> str:
-    """대화 요약 생성"""
+def ensure_request_fits(system_prompt: str, content: str, model_config: Dict, tools: Optional[List[Dict]] = None):
+    """시스템 프롬프트 + 사용자 메시지가 모델 입력 예산을 넘으면 저장/OpenAI 호출 전에 400으로 거절"""
     try:
-        print(f"📝 Creating conversation summary for session: {session_id}")
-
-        # 요약할 메시지들 준비 (최근 20개만)
-        messages_to_summarize = messages[-20:] if len(messages) > 20 else messages
-
-        conversation_text = ""
-        for msg in messages_to_summarize:
-            role = msg.get("role", "")
-            content = msg.get("content", "")
-            conversation_text += f"{role}: {content}\n"
-
-        # OpenAI를 사용하여 요약 생성
-        summary_response = await client.chat.completions.create(
-            model="gpt-3.5-turbo",  # 요약은 저렴한 모델 사용
-            messages=[
-                {
-                    "role": "system",
-                    "content": """당신은 대화 요약 전문가입니다. 주어진 대화를 간결하고 핵심적으로 요약해주세요.
-
-요약 형식:
-- 주요 주제와 논의 내용
-- 핵심 결론이나 결정사항
-- 중요한 데이터나 정보
-- 사용자 관심사나 요구사항
-
-한국어로 3-5문장으로 요약해주세요."""
-                },
-                {
-                    "role": "user",
-                    "content": f"다음 대화를 요약해주세요:\n\n{conversation_text}"
-                }
-            ],
-            max_tokens=200,
-            temperature=0.3
-        )
-
-        summary = summary_response.choices[0].message.content
-
-        # 요약 저장
-        conversation_summaries[session_id] = summary
-        print(f"✅ Summary created for session {session_id}")
-
-        return summary
-
-    except Exception as e:
-        print(f"🚨 Failed to create summary: {e}")
-        return "대화 요약 생성 실패"
-
-
-async def optimize_conversation_for_tokens(session_id: str) -> List[Dict]:
-    """토큰 사용량에 따른 대화 최적화"""
-    messages = messages_db.get(session_id, [])
-
-    if not messages:
-        return []
-
-    current_tokens = calculate_conversation_tokens(messages)
-    print(f"📊 Current conversation tokens: {current_tokens}")
-
-    # 토큰 한계 초과 시 처리
-    if current_tokens > MAX_CONVERSATION_TOKENS or len(messages) > MAX_MESSAGES_PER_SESSION:
-        print(f"🚨 Token limit exceeded, optimizing conversation...")
-
-        # 1. 대화 요약 생성 (아직 없다면)
-        if session_id not in conversation_summaries:
-            await create_conversation_summary(session_id, messages[:-10])  # 최근 10개 제외하고 요약
-
-        # 2. 최근 메시지만 유지 (시스템 메시지 + 요약 + 최근 대화)
-        recent_messages = messages[-15:]  # 최근 15개 메시지만 유지
-
-        # 3. 요약을 시스템 메시지로 삽입
-        summary = conversation_summaries.get(session_id, "")
-        if summary:
-            summary_message = {
-                "role": "system",
-                "content": f"이전 대화 요약: {summary}\n\n위 내용을 참고하여 지속적이고 일관된 대화를 이어가세요."
-            }
-            optimized_messages = [summary_message] + recent_messages
-        else:
-            optimized_messages = recent_messages
-
-        # 4. 최적화된 메시지로 업데이트
-        messages_db[session_id] = optimized_messages
-
-        # 5. 토큰 사용량 업데이트
-        new_tokens = calculate_conversation_tokens(optimized_messages)
-        update_token_usage(session_id, current_tokens, new_tokens, optimized=True)
-
-        print(f"✅ Conversation optimized: {current_tokens} → {new_tokens} tokens")
-        return optimized_messages
-
-    else:
-        # 토큰 사용량 추적
-        update_token_usage(session_id, current_tokens, current_tokens)
-        return messages
-
-
-def update_token_usage(session_id: str, old_tokens: int, new_tokens: int, optimized: bool = False):
-    """토큰 사용량 업데이트"""
-    if session_id not in token_usage_db:
-        token_usage_db[session_id] = {
-            "total_tokens": 0,
-            "messages_count": 0,
-            "optimizations": 0,
-            "last_updated": datetime.now().isoformat()
-        }
-
-    usage = token_usage_db[session_id]
-    usage["total_tokens"] = new_tokens
-    usage["messages_count"] = len(messages_db.get(session_id, []))
-    usage["last_updated"] = datetime.now().isoformat()
-
-    if optimized:
-        usage["optimizations"] += 1
-        usage["tokens_saved"] = usage.get("tokens_saved", 0) + (old_tokens - new_tokens)
+        ensure_fits(system_prompt, content, model_config, tools_tokens(tools))
+    except ContextBudgetExceeded as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
-async def get_optimized_conversation_messages(session_id: str, max_messages: int = 20) -> List[Dict]:
-    """최적화된 대화 메시지 가져오기"""
-    # 먼저 토큰 최적화 수행
-    optimized_messages = await optimize_conversation_for_tokens(session_id)
-
-    # 요청된 최대 메시지 수로 제한
-    if len(optimized_messages) > max_messages:
-        # 시스템 메시지가 있다면 유지하고 나머지를 제한
-        system_messages = [msg for msg in optimized_messages if msg.get("role") == "system"]
-        user_assistant_messages = [msg for msg in optimized_messages if msg.get("role") in ["user", "assistant"]]
-
-        # 최근 메시지들 선택
-        recent_messages = user_assistant_messages[-(max_messages - len(system_messages)):]
-        return system_messages + recent_messages
-
-    return optimized_messages
+def cache_key_for(session_id: str, model: str, system_prompt: str, conversation_messages: List[Dict],
+                  needs_web_search: bool, mention_detected: bool) -> Optional[str]:
+    """응답 캐시 키 (캐시 비활성, 웹 검색, Google 멘션, 세션 업로드 파일이 있으면 None)"""
+    if (response_cache is None or needs_web_search or mention_detected
+            or repository.has_value(VECTOR_STORES, session_id)):
+        return None
+    return response_cache_key(model, system_prompt, conversation_messages)
 
 
 # Google 서비스 도구 정의
@@ -659,9 +643,16 @@ def format_calendar_events_as_table(events: List[Dict]) -> str:
     return table
 
 
+async def run_google_function(function_name: str, function_args: dict):
+    """FUNCTION_MAP 함수 실행 (캘린더 조회처럼 코루틴 함수면 결과를 기다림)"""
+    result = FUNCTION_MAP[function_name](**function_args)
+    return await result if inspect.isawaitable(result) else result
+
+
 # Google 함수 실행 핸들러
 async def execute_google_function(function_name: str, arguments: dict):
     """Google 함수를 실행하고 결과를 반환"""
+    mark_uncacheable()  # 도구 결과는 시점/계정에 따라 달라지므로 이 요청의 응답은 캐시하지 않음
     try:
         if not GOOGLE_SERVICES_AVAILABLE or not auth_service.is_authenticated():
             return {"error": "Google 서비스가 연결되지 않았습니다. 먼저 Google 인증을 완료해주세요."}
@@ -721,11 +712,7 @@ async def execute_google_function(function_name: str, arguments: dict):
                 start_date = today.isoformat()
                 end_date = today.isoformat()
 
-            result = await calendar_service.get_events(
-                start_date=start_date,
-                end_date=end_date,
-                max_results=arguments.get("max_results", 10)
-            )
+            result = await calendar_service.fetch_events(start_date, end_date, arguments.get("max_results", 10))
             return result
 
         elif function_name == "create_calendar_event":
@@ -770,7 +757,7 @@ async def execute_google_function(function_name: str, arguments: dict):
             return {"error": f"알 수 없는 함수: {function_name}"}
 
     except Exception as e:
-        print(f"Google function execution error: {e}")
+        logger.error("Google function execution error: %s", e)
         return {"error": f"함수 실행 중 오류가 발생했습니다: {str(e)}"}
 
 
@@ -792,44 +779,95 @@ async def create_response_with_best_api(
     - Chat Completions API (폴백)
     """
 
-    # 1. Assistant API 사용 조건 확인
-    use_assistant_api = (
-            model_config.get("supports_assistant", False) and
-            not needs_web_search  # 웹 검색이 필요하지 않은 경우 (도구 유무 무관)
-    )
+    web_search = needs_web_search and model_config.get("supports_web_search", False)
+    use_assistant = model_config.get("supports_assistant", False) and not needs_web_search
+    # 세션 전용 파일 스토어는 Assistant(file_search)만 검색할 수 있음
+    files = use_assistant and repository.has_value(VECTOR_STORES, session_id)
+    features = RouteFeatures(web_search=web_search, tools=bool(available_tools), files=files)
+
+    # 1. 같은 기능을 제공하는 경로 후보 (기본 선호 순서: Assistant > Responses > Chat Completions)
+    fallbacks = []
+    if web_search:
+        candidates = ["responses"]  # 웹 검색은 Responses API만 지원
+    elif files:
+        candidates, fallbacks = ["assistant"], ["responses", "chat_completions"]  # 파일 검색 없이 응답하는 폴백
+    else:
+        candidates = ["responses", "chat_completions"]
+        if use_assistant:
+            candidates.insert(0, "assistant")
+
+    # 2. 지원하지 않는 경로 제외, 정상이면서 빠른 경로 우선, 차단된(서킷 오픈) 경로는 뒤로
+    route = api_router.plan(model, features, candidates, fallbacks,
+                            available=lambda path: circuit_breakers[path].available())
+
+    openai_logger.debug("🔍 API selection", extra={
+        "model": model, "supports_assistant": model_config.get("supports_assistant", False),
+        "needs_web_search": needs_web_search, "tools": len(available_tools) if available_tools else 0,
+        "route": route
+    })
+
+    last_error = None
+    for api_path in route:
+        start = time.monotonic()
+        try:
+            if api_path == "assistant":
+                openai_logger.debug("🎯 Using Assistant API for complex conversation with tools")
+                content = await create_response_with_assistant_api(
+                    session_id, user_input, model, model_config, instructions
+                )
+            elif api_path == "responses":
+                content = await create_response_with_responses_api(
+                    model, instructions, user_input, conversation_messages,
+                    available_tools, web_search, model_config
+                )
+            else:
+                content = await create_response_with_chat_completions(
+                    model, conversation_messages, available_tools, model_config, user_input
+                )
+        except APIPathError as e:
+            api_router.record(model, features, api_path, time.monotonic() - start, e.cause, failed=True)
+            openai_logger.warning("⚠️ %s failed, trying next API path", api_path)
+            last_error = e
+            continue
+
+        api_router.record(model, features, api_path, time.monotonic() - start)
+        return content
 
-    print(f"🔍 API Selection Debug:")
-    print(f"  - Model: {model}")
-    print(f"  - supports_assistant: {model_config.get('supports_assistant', False)}")
-    print(f"  - needs_web_search: {needs_web_search}")
-    print(f"  - available_tools: {len(available_tools) if available_tools else 0}")
-    print(f"  - use_assistant_api: {use_assistant_api}")
-
-    if use_assistant_api:
-        print("🎯 Using Assistant API for complex conversation with tools")
-        return await create_response_with_assistant_api(
-            session_id, user_input, model, model_config, instructions
+    if web_search and not api_router.supports(model, features, "responses"):
+        # 이 모델에서 웹 검색이 지원되지 않는 것으로 확인되면 검색 없이 응답
+        openai_logger.warning("⚠️ Web search unsupported for %s, answering without it", model)
+        return await create_response_with_best_api(
+            session_id, model, instructions, user_input, conversation_messages,
+            available_tools, False, model_config
         )
 
-    # 2. Responses API 사용 (기존 로직)
-    return await create_response_with_responses_api_fallback(
-        model, instructions, user_input, conversation_messages,
-        available_tools, needs_web_search, model_config
-    )
+    mark_uncacheable()  # 오류 안내 문구는 캐시하지 않음
+    return last_error.message if last_error else "AI 응답을 생성하지 못했습니다. 잠시 후 다시 시도해주세요."
 
 
-def build_context_input(user_input: str, conversation_messages: list) -> str:
-    """대화 컨텍스트를 포함한 입력 구성"""
+def build_context_input(user_input: str, conversation_messages: list, model_config: Dict,
+                        instructions: str = "") -> str:
+    """대화 컨텍스트를 포함한 입력 구성 (instructions와 함께 모델 입력 예산에 맞춤)"""
     context_input = user_input
-    if conversation_messages:
-        # 최근 대화 히스토리를 컨텍스트로 포함 (최대 5개)
-        recent_messages = conversation_messages[-5:]
+    # instructions로 따로 전달되는 첫 시스템 프롬프트와 현재 질문은 제외
+    history = list(conversation_messages)
+    if history and history[0].get('role') == 'system':
+        history = history[1:]
+    if history and history[-1].get('role') == 'user' and history[-1].get('content') == user_input:
+        history = history[:-1]
+
+    # 최근 대화부터 남은 토큰 예산만큼 컨텍스트로 포함
+    reserved = estimate_tokens(user_input) + (estimate_tokens(instructions) if instructions else 0)
+    recent_messages = pack_turns(history, input_budget(model_config, reserved))
+    if recent_messages:
         context_parts = []
         for msg in recent_messages:
             role = msg.get('role', 'user')
             content = msg.get('content', '')
             if role == 'user':
                 context_parts.append(f"사용자: {content}")
+            elif role == 'system':
+                context_parts.append(content)
             else:
                 context_parts.append(f"AI: {content}")
         
@@ -854,85 +892,103 @@ async def create_response_with_responses_api_fallback(
     Google Functions와 웹 검색을 지원
     강화된 에러 처리 포함
     """
+    try:
+        return await create_response_with_responses_api(
+            model, instructions, user_input, conversation_messages,
+            available_tools, needs_web_search, model_config
+        )
+    except APIPathError as e:
+        web_search = needs_web_search and model_config.get("supports_web_search", False)
+        # 웹 검색은 Chat Completions로 대신할 수 없고, 도구 호출은 Responses 경로가 차단된 경우에만 폴백
+        if web_search or (available_tools and not circuit_breakers["responses"].is_open):
+            mark_uncacheable()
+            return e.message
+
+    # Responses API 완전 실패 시 Chat Completions로 폴백
+    openai_logger.warning("⚠️ Responses API completely failed, trying Chat Completions fallback")
+    return await safe_fallback_to_chat_completions(
+        model, conversation_messages, available_tools, model_config, user_input
+    )
+
+
+async def create_response_with_responses_api(
+        model: str,
+        instructions: str,
+        user_input: str,
+        conversation_messages: List[Dict],
+        available_tools: List[Dict],
+        needs_web_search: bool,
+        model_config: Dict
+) -> str:
+    """Responses API 응답 생성 (웹 검색 / Google 도구 / 일반 대화, 실패 시 APIPathError)"""
 
-    print(f"🔍 create_response_with_responses_api_fallback called with:")
-    print(f"  - Model: {model}")
-    print(f"  - Instructions present: {bool(instructions)}")
-    print(f"  - User input: {user_input}")
-    print(f"  - Conversation messages: {len(conversation_messages)}")
-    print(f"  - Available tools: {len(available_tools)}")
-    print(f"  - Needs web search: {needs_web_search}")
-    print(f"  - Model config: {model_config}")
+    openai_logger.debug("🔍 Responses API request", extra={
+        "model": model, "instructions": bool(instructions), "messages": len(conversation_messages),
+        "tools": len(available_tools), "needs_web_search": needs_web_search
+    })
 
     # 1. 웹 검색이 필요한 경우
     if needs_web_search and model_config.get("supports_web_search", False):
-        print("🔍 Using Responses API with web search")
+        openai_logger.debug("🔍 Using Responses API with web search")
 
         async def web_search_call():
             # 대화 컨텍스트를 포함한 입력 구성
-            context_input = build_context_input(user_input, conversation_messages)
+            context_input = build_context_input(user_input, conversation_messages, model_config, instructions)
             
-            return await client.responses.create(
-                model=model,
-                instructions=instructions,
-                input=context_input,
-                tools=[{"type": "web_search"}]
-            )
-
-        response = await safe_openai_call_with_retry(web_search_call, user_content=user_input)
+            with track_openai("responses", model):
+                return await no_retry_client.responses.create(
+                    model=model,
+                    instructions=instructions,
+                    input=context_input,
+                    tools=[{"type": "web_search"}]
+                )
 
-        if isinstance(response, dict) and "error" in response:
-            return response["error"]
+        response = await safe_openai_call_with_retry(web_search_call, user_content=user_input, api_path="responses")
+        raise_if_error(response)
 
         return extract_response_content(response, include_sources=True)
 
     # 2. Google 도구가 필요한 경우
     elif available_tools:
-        print("🛠️ Using Responses API with Google tools")
+        openai_logger.debug("🛠️ Using Responses API with Google tools")
 
         # Google 도구를 Responses API 형식으로 변환
         responses_tools = convert_tools_for_responses_api(available_tools)
 
         async def tools_call():
             # 대화 컨텍스트를 포함한 입력 구성
-            context_input = build_context_input(user_input, conversation_messages)
+            context_input = build_context_input(user_input, conversation_messages, model_config, instructions)
             
-            return await client.responses.create(
-                model=model,
-                instructions=instructions,
-                input=context_input,
-                tools=responses_tools
-            )
-
-        response = await safe_openai_call_with_retry(tools_call, user_content=user_input)
+            with track_openai("responses", model):
+                return await no_retry_client.responses.create(
+                    model=model,
+                    instructions=instructions,
+                    input=context_input,
+                    tools=responses_tools
+                )
 
-        if isinstance(response, dict) and "error" in response:
-            return response["error"]
+        response = await safe_openai_call_with_retry(tools_call, user_content=user_input, api_path="responses")
+        raise_if_error(response)
 
         return await process_tool_calls_in_response(response)
 
     # 3. 일반 대화
     else:
-        print("💬 Using Responses API for general conversation")
+        openai_logger.debug("💬 Using Responses API for general conversation")
 
         async def general_call():
             # 대화 컨텍스트를 포함한 입력 구성
-            context_input = build_context_input(user_input, conversation_messages)
+            context_input = build_context_input(user_input, conversation_messages, model_config, instructions)
             
-            return await client.responses.create(
-                model=model,
-                instructions=instructions,
-                input=context_input
-            )
+            with track_openai("responses", model):
+                return await no_retry_client.responses.create(
+                    model=model,
+                    instructions=instructions,
+                    input=context_input
+                )
 
-        response = await safe_openai_call_with_retry(general_call, user_content=user_input)
-
-        if isinstance(response, dict) and "error" in response:
-            # Responses API 완전 실패 시 Chat Completions로 폴백
-            print("⚠️ Responses API completely failed, trying Chat Completions fallback")
-            return await safe_fallback_to_chat_completions(
-                model, conversation_messages, available_tools, model_config, user_input
-            )
+        response = await safe_openai_call_with_retry(general_call, user_content=user_input, api_path="responses")
+        raise_if_error(response)
 
         return extract_response_content(response)
 
@@ -983,7 +1039,7 @@ def extract_response_content(response, include_sources: bool = False) -> str:
             title = source['title'] if source['title'] else f"출처 {i}"
             # 각 리스트 항목 뒤에 적절한 줄바꿈 추가 (마크다운 리스트 포맷)
             content += f"{i}. **[{title}]({source['url']})**\n\n"
-        print(f"📚 Found {len(sources)} web search sources")
+        openai_logger.debug("📚 Found %s web search sources", len(sources))
 
     return content.strip()  # 마지막에 불필요한 공백/줄바꿈 제거
 
@@ -1017,8 +1073,9 @@ async def process_tool_calls_in_response(response) -> str:
                     function_name = content_item.function.name
                     function_args = json.loads(content_item.function.arguments)
 
-                    print(f"🔧 Executing tool: {function_name}({function_args})")
-                    result = await execute_google_function(function_name, function_args)
+                    openai_logger.debug("🔧 Executing tool: %s(%s)", function_name, function_args)
+                    with track_tool(function_name):
+                        result = await execute_google_function(function_name, function_args)
 
                     # 결과 포맷팅
                     if function_name == "get_calendar_events" and isinstance(result, list):
@@ -1040,7 +1097,7 @@ async def fallback_to_chat_completions(
         model_config: Dict
 ) -> str:
     """Chat Completions API로 폴백 (기존 버전)"""
-    print("⚠️ Falling back to Chat Completions API")
+    openai_logger.warning("⚠️ Falling back to Chat Completions API")
 
     chat_params = {
         "model": model,
@@ -1053,7 +1110,8 @@ async def fallback_to_chat_completions(
         chat_params["tools"] = tools
         chat_params["tool_choice"] = "auto"
 
-    response = await client.chat.completions.create(**chat_params)
+    with track_openai("chat_completions", chat_params["model"]):
+        response = await client.chat.completions.create(**chat_params)
 
     # Function calls 처리
     if response.choices[0].message.tool_calls:
@@ -1063,7 +1121,8 @@ async def fallback_to_chat_completions(
             function_name = tool_call.function.name
             function_args = json.loads(tool_call.function.arguments)
 
-            result = await execute_google_function(function_name, function_args)
+            with track_tool(function_name):
+                result = await execute_google_function(function_name, function_args)
 
             if function_name == "get_calendar_events" and isinstance(result, list):
                 content += "\n\n" + format_calendar_events_as_table(result)
@@ -1087,7 +1146,22 @@ async def safe_fallback_to_chat_completions(
         user_content: str
 ) -> str:
     """안전한 Chat Completions API 폴백 (에러 처리 포함)"""
-    print("🛡️ Safe fallback to Chat Completions API")
+    openai_logger.debug("🛡️ Safe fallback to Chat Completions API")
+    try:
+        return await create_response_with_chat_completions(model, messages, tools, model_config, user_content)
+    except APIPathError as e:
+        mark_uncacheable()
+        return e.message
+
+
+async def create_response_with_chat_completions(
+        model: str,
+        messages: List[Dict],
+        tools: List[Dict],
+        model_config: Dict,
+        user_content: str
+) -> str:
+    """Chat Completions API 응답 생성 (실패 시 APIPathError)"""
 
     async def chat_call():
         chat_params = {
@@ -1101,16 +1175,16 @@ async def safe_fallback_to_chat_completions(
             chat_params["tools"] = tools
             chat_params["tool_choice"] = "auto"
 
-        return await client.chat.completions.create(**chat_params)
+        with track_openai("chat_completions", chat_params["model"]):
+            return await no_retry_client.chat.completions.create(**chat_params)
 
     response = await safe_openai_call_with_retry(
         chat_call,
         max_retries=2,  # 폴백이므로 재시도 횟수 줄임
-        user_content=user_content
+        user_content=user_content,
+        api_path="chat_completions"
     )
-
-    if isinstance(response, dict) and "error" in response:
-        return response["error"]
+    raise_if_error(response)
 
     # Function calls 처리
     if response.choices[0].message.tool_calls:
@@ -1120,7 +1194,8 @@ async def safe_fallback_to_chat_completions(
             function_name = tool_call.function.name
             function_args = json.loads(tool_call.function.arguments)
 
-            result = await execute_google_function(function_name, function_args)
+            with track_tool(function_name):
+                result = await execute_google_function(function_name, function_args)
 
             if function_name == "get_calendar_events" and isinstance(result, list):
                 content += "\n\n" + format_calendar_events_as_table(result)
@@ -1138,47 +1213,28 @@ async def safe_fallback_to_chat_completions(
 
 # Assistant API 관련 함수들
 async def get_or_create_assistant(session_id: str, model: str, instructions: str = None) -> str:
-    """세션용 Assistant를 가져오거나 생성"""
+    """세션에 맞는 Assistant ID
 
-    # 이미 Assistant가 있는지 확인
-    if session_id in assistants_db:
-        assistant_id = assistants_db[session_id]
-        try:
-            # Assistant 존재 확인
-            assistant = await client.beta.assistants.retrieve(assistant_id)
-            print(f"🤖 Using existing assistant: {assistant_id}")
-            return assistant_id
-        except Exception as e:
-            print(f"⚠️ Existing assistant not found: {e}")
-            # Assistant가 삭제되었다면 새로 생성
-            del assistants_db[session_id]
-
-    # 새 Assistant 생성
-    try:
-        print(f"🆕 Creating new assistant for session: {session_id}")
-
-        # Google 도구들을 Assistant 형식으로 변환
-        tools = []
-        if GOOGLE_SERVICES_AVAILABLE and auth_service.is_authenticated():
-            tools.extend(get_google_tools())
-            print(f"🛠️ Added {len(tools)} Google tools to assistant")
+    같은 설정(모델, instructions, 도구, 벡터 스토어)의 세션은 풀의 Assistant를 공유하고,
+    자체 파일 스토어가 있는 세션만 해당 스토어를 붙인 전용 Assistant를 사용
+    검증 기간 안에서는 저장소 조회만 하므로 제어 API(retrieve/create) 호출 없음
+    """
 
-        # 벡터 스토어 생성 또는 가져오기 (선택적)
-        tool_resources = {}
-        try:
-            vector_store_id = await create_or_get_vector_store(session_id)
-            if vector_store_id:
-                tool_resources["file_search"] = {
-                    "vector_store_ids": [vector_store_id]
-                }
-                # 파일 검색 도구 추가
-                tools.append({"type": "file_search"})
-                print(f"🗂️ Added vector store to assistant: {vector_store_id}")
-        except Exception as vs_error:
-            print(f"⚠️ Vector store creation failed, continuing without: {vs_error}")
-
-        # instructions가 제공되지 않은 경우 기본값 사용
-        if not instructions:
+    # Google 도구들을 Assistant 형식으로 변환
+    tools = []
+    if GOOGLE_SERVICES_AVAILABLE and auth_service.is_authenticated():
+        tools.extend(get_google_tools())
+
+    # 세션 전용 파일 스토어 > 전역 지식 베이스 순 (새 벡터 스토어는 만들지 않음)
+    vector_store_id = repository.get_value(VECTOR_STORES, session_id) or repository.get_value(SETTINGS, KNOWLEDGE_BASE_KEY)
+    vector_store_ids = [vector_store_id] if vector_store_id else []
+    if vector_store_ids:
+        # 파일 검색 도구 추가
+        tools.append({"type": "file_search"})
+    dedicated = repository.has_value(VECTOR_STORES, session_id)
+
+    # instructions가 제공되지 않은 경우 기본값 사용
+    if not instructions:
             instructions = """당신은 NSales Pro의 전문적인 영업 AI 도우미입니다. 
 
 주요 역할:
@@ -1199,83 +1255,63 @@ Google 서비스 멘션:
 - @일정생성 → 새 일정 생성
 - @빈시간 → 빈 시간 검색"""
 
-        # Assistant 생성 (벡터 스토어 리소스 포함)
-        assistant_params = {
-            "name": f"NSales Pro Assistant - {session_id[:8]}",
-            "instructions": instructions,
-            "model": model,
-            "tools": tools
-        }
-
-        # 벡터 스토어가 있는 경우 tool_resources 추가
-        if tool_resources:
-            assistant_params["tool_resources"] = tool_resources
-
-        assistant = await client.beta.assistants.create(**assistant_params)
-
-        assistant_id = assistant.id
-        assistants_db[session_id] = assistant_id
-        print(f"✅ Created assistant: {assistant_id}")
-
-        return assistant_id
-
+    try:
+        return await assistant_pool.acquire(
+            model, instructions, tools, vector_store_ids,
+            name=f"NSales Pro Assistant - {session_id[:8]}" if dedicated else f"NSales Pro Assistant - {model}"
+        )
     except Exception as e:
-        print(f"🚨 Failed to create assistant: {e}")
+        openai_logger.error("🚨 Failed to create assistant: %s", e)
         raise e
 
 
-async def get_or_create_thread(session_id: str) -> str:
-    """세션용 Thread를 가져오거나 생성하고 기존 대화 히스토리 동기화"""
-
-    # 이미 Thread가 있는지 확인
-    if session_id in threads_db:
-        thread_id = threads_db[session_id]
-        try:
-            # Thread 존재 확인
-            thread = await client.beta.threads.retrieve(thread_id)
-            print(f"🧵 Using existing thread: {thread_id}")
-            return thread_id
-        except Exception as e:
-            print(f"⚠️ Existing thread not found: {e}")
-            # Thread가 삭제되었다면 새로 생성
-            del threads_db[session_id]
+async def start_assistant_run(
+        session_id: str,
+        user_input: str,
+        model: str,
+        model_config: Dict,
+        instructions: str = None
+):
+    """Assistant와 Thread를 준비하고 스트리밍 Run 시작 (thread_id, 이벤트 스트림 반환, 실패 시 APIPathError)"""
 
-    # 새 Thread 생성
+    assistant_id = None
     try:
-        print(f"🆕 Creating new thread for session: {session_id}")
+        openai_logger.debug("🎯 Using Assistant API for session: %s", session_id)
 
-        # 기존 세션 메시지들을 Thread에 추가할 메시지로 준비
-        initial_messages = []
-        session_messages = messages_db.get(session_id, [])
+        # Assistant 준비, Thread에는 마지막 동기화 이후 메시지(현재 사용자 메시지 포함)만 추가
+        assistant_id = await get_or_create_assistant(session_id, model, instructions)
+        thread_id = await thread_sync.sync(session_id, model_config, instructions, user_input)
 
-        # 최근 20개 메시지만 Thread에 포함 (토큰 절약)
-        recent_messages = session_messages[-20:] if len(session_messages) > 20 else session_messages
+        openai_logger.debug("📝 Assistant ID: %s", assistant_id)
+        openai_logger.debug("🧵 Thread ID: %s", thread_id)
 
-        for msg in recent_messages:
-            # Assistant API Thread는 system 메시지를 지원하지 않으므로 제외
-            if msg.get("role") in ["user", "assistant"]:
-                initial_messages.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
-
-        # Thread 생성 (기존 메시지 포함)
-        if initial_messages:
-            thread = await client.beta.threads.create(messages=initial_messages)
-            print(f"📚 Thread created with {len(initial_messages)} existing messages")
-        else:
-            thread = await client.beta.threads.create()
-            print(f"📝 Empty thread created")
+        # 풀의 Assistant에는 시간 섹션 없는 instructions만 고정되므로 현재 시간은 Run마다 전달
+        _, time_section = split_time_prompt(instructions or "")
+        run_options = {"additional_instructions": time_section.strip()} if time_section else {}
 
-        thread_id = thread.id
-        threads_db[session_id] = thread_id
-        print(f"✅ Created thread: {thread_id}")
+        # Run 생성 (폴링 대신 이벤트 스트림, 재시도는 첫 이벤트 전 생성 단계까지만)
+        async def assistant_call():
+            with track_openai("assistant", model):
+                return await no_retry_client.beta.threads.runs.create(
+                    thread_id=thread_id,
+                    assistant_id=assistant_id,
+                    stream=True,
+                    timeout=STREAM_TIMEOUT,
+                    **run_options
+                )
 
-        return thread_id
+        stream = await safe_openai_call_with_retry(assistant_call, user_content=user_input, api_path="assistant")
+        raise_if_error(stream)
+        return thread_id, stream
 
+    except APIPathError as e:
+        if assistant_id and isinstance(e.cause, openai.NotFoundError):
+            # 삭제된 Assistant/Thread면 다음 요청에서 존재 확인 후 재생성
+            assistant_pool.invalidate(assistant_id)
+            thread_sync.invalidate(session_id)
+        raise
     except Exception as e:
-        print(f"🚨 Failed to create thread: {e}")
-        raise e
+        raise APIPathError(handle_openai_error(e, user_content=user_input), e)
 
 
 async def create_response_with_assistant_api(
@@ -1285,158 +1321,57 @@ async def create_response_with_assistant_api(
         model_config: Dict,
         instructions: str = None
 ) -> str:
-    """Assistant API를 사용한 응답 생성"""
+    """Assistant API를 사용한 응답 생성 (스트리밍 Run의 델타를 모아 반환, 실패 시 APIPathError)"""
 
+    thread_id, stream = await start_assistant_run(session_id, user_input, model, model_config, instructions)
     try:
-        print(f"🎯 Using Assistant API for session: {session_id}")
-        print(f"🔍 Session messages count: {len(messages_db.get(session_id, []))}")
-
-        # Assistant와 Thread 준비
-        assistant_id = await get_or_create_assistant(session_id, model, instructions)
-        thread_id = await get_or_create_thread(session_id)
-
-        print(f"📝 Assistant ID: {assistant_id}")
-        print(f"🧵 Thread ID: {thread_id}")
-
-        # 사용자 메시지를 Thread에 추가
-        await client.beta.threads.messages.create(
-            thread_id=thread_id,
-            role="user",
-            content=user_input
-        )
-
-        # Run 생성 및 실행
-        async def assistant_call():
-            return await client.beta.threads.runs.create_and_poll(
-                thread_id=thread_id,
-                assistant_id=assistant_id,
-                timeout=60  # 60초 타임아웃
-            )
-
-        run = await safe_openai_call_with_retry(assistant_call, user_content=user_input)
-
-        if isinstance(run, dict) and "error" in run:
-            return run["error"]
-
-        # Run 상태 확인
-        if run.status == 'completed':
-            # 최신 메시지 가져오기
-            messages = await client.beta.threads.messages.list(
-                thread_id=thread_id,
-                order="desc",
-                limit=1
-            )
-
-            if messages.data:
-                latest_message = messages.data[0]
-                if latest_message.role == "assistant" and latest_message.content:
-                    # 텍스트 내용 추출
-                    content = ""
-                    for content_block in latest_message.content:
-                        if content_block.type == "text":
-                            content += content_block.text.value
-
-                    print(f"✅ Assistant response completed")
-                    return content
-
-        elif run.status == 'requires_action':
-            # 도구 호출 처리
-            print(f"🔧 Assistant requires action: tool calls")
-            return await handle_assistant_tool_calls(run, thread_id)
-
-        elif run.status in ['failed', 'expired', 'cancelled']:
-            error_msg = f"Assistant 실행 실패: {run.status}"
-            if hasattr(run, 'last_error') and run.last_error:
-                error_msg += f" - {run.last_error.message}"
-            return error_msg
-
-        else:
-            return f"Assistant 실행 상태: {run.status}. 잠시 후 다시 시도해주세요."
-
+        content = "".join([delta async for delta in assistant_run_deltas(
+            no_retry_client, stream, thread_id, run_assistant_tools, STREAM_TIMEOUT
+        )])
+    except APIPathError:
+        raise
     except Exception as e:
-        return handle_openai_error(e, user_content=user_input)
+        raise APIPathError(handle_openai_error(e, user_content=user_input), e)
 
+    if not content:
+        raise APIPathError("Assistant가 응답을 생성하지 않았습니다. 잠시 후 다시 시도해주세요.")
 
-async def handle_assistant_tool_calls(run, thread_id: str) -> str:
-    """Assistant의 도구 호출 처리"""
+    openai_logger.debug("✅ Assistant response completed")
+    thread_sync.mark_reply(session_id)
+    return content
 
-    try:
-        tool_outputs = []
 
-        for tool_call in run.required_action.submit_tool_outputs.tool_calls:
-            function_name = tool_call.function.name
+async def run_assistant_tools(tool_calls) -> List[Dict[str, str]]:
+    """Assistant Run의 requires_action 도구 호출 실행 (submit_tool_outputs 형식으로 반환)"""
+    tool_outputs = []
+
+    for tool_call in tool_calls:
+        function_name = tool_call.function.name
+        try:
             function_args = json.loads(tool_call.function.arguments)
 
-            print(f"🔧 Assistant tool call: {function_name}({function_args})")
+            openai_logger.debug("🔧 Assistant tool call: %s(%s)", function_name, function_args)
 
             # Google 함수 실행
-            result = await execute_google_function(function_name, function_args)
+            with track_tool(function_name):
+                result = await execute_google_function(function_name, function_args)
 
             # 결과 포맷팅
             if function_name == "get_calendar_events" and isinstance(result, list):
                 output = format_calendar_events_as_table(result)
             else:
                 output = json.dumps(result, ensure_ascii=False, indent=2)
+        except Exception as e:
+            # 실패도 출력으로 제출해야 Run이 멈추지 않고 모델이 오류를 설명할 수 있음
+            openai_logger.error("🚨 Assistant tool call error: %s", e)
+            output = f"도구 실행 중 오류가 발생했습니다: {str(e)}"
 
-            tool_outputs.append({
-                "tool_call_id": tool_call.id,
-                "output": output
-            })
-
-        # 도구 출력 제출 및 Run 완료 대기
-        completed_run = await client.beta.threads.runs.submit_tool_outputs_and_poll(
-            thread_id=thread_id,
-            run_id=run.id,
-            tool_outputs=tool_outputs
-        )
-
-        if completed_run.status == 'completed':
-            # 최신 응답 가져오기
-            messages = await client.beta.threads.messages.list(
-                thread_id=thread_id,
-                order="desc",
-                limit=1
-            )
-
-            if messages.data:
-                latest_message = messages.data[0]
-                if latest_message.role == "assistant" and latest_message.content:
-                    content = ""
-                    for content_block in latest_message.content:
-                        if content_block.type == "text":
-                            content += content_block.text.value
-
-                    print(f"✅ Assistant tool calls completed")
-                    return content
-
-        # 최종 응답 반환
-        final_content = ""
-        if completed_run.status == 'completed':
-            messages = await client.beta.threads.messages.list(
-                thread_id=thread_id,
-                order="desc",
-                limit=1
-            )
-            if messages.data and messages.data[0].content:
-                for content_block in messages.data[0].content:
-                    if content_block.type == "text":
-                        final_content += content_block.text.value
-
-        # 도구 실행 결과 요약
-        tool_results_summary = "\n".join([f"- {tool['tool_call_id']}: {tool['output'][:100]}..." for tool in tool_outputs])
+        tool_outputs.append({
+            "tool_call_id": tool_call.id,
+            "output": output
+        })
 
-        # 최종적으로 생성된 AI의 답변을 반환합니다.
-        if final_content:
-            # AI 응답과 도구 실행 결과를 함께 제공할 수 있습니다.
-            # return f"{final_content}\n\n--- 도구 실행 요약 ---\n{tool_results_summary}"
-            return final_content
-        else:
-            # 만약 AI의 최종 답변이 없다면, 도구 실행 결과라도 반환합니다.
-            return f"도구 실행이 완료되었습니다. 요약:\n{tool_results_summary}"
-
-    except Exception as e:
-        print(f"🚨 Assistant tool call error: {e}")
-        return f"도구 실행 중 오류가 발생했습니다: {str(e)}"
+    return tool_outputs
 
 
 # 체계적인 OpenAI 에러 처리 함수들
@@ -1444,13 +1379,13 @@ def handle_openai_error(e: Exception, user_content: str = "", request_id: str =
     """
     OpenAI API 에러를 체계적으로 처리하고 사용자 친화적인 메시지 반환
     """
-    print(f"🚨 OpenAI API Error: {type(e).__name__}: {e}")
+    openai_logger.error("🚨 OpenAI API Error: %s: %s", type(e).__name__, e)
 
     # Request ID 로깅 (디버깅용)
     if request_id:
-        print(f"🔍 Request ID: {request_id}")
+        openai_logger.debug("🔍 Request ID: %s", request_id)
     elif hasattr(e, 'request_id'):
-        print(f"🔍 Request ID: {e.request_id}")
+        openai_logger.debug("🔍 Request ID: %s", e.request_id)
 
     if isinstance(e, openai.APIConnectionError):
         return handle_connection_error(e)
@@ -1474,37 +1409,37 @@ def handle_openai_error(e: Exception, user_content: str = "", request_id: str =
 
 def handle_connection_error(e: openai.APIConnectionError) -> str:
     """네트워크 연결 에러 처리"""
-    print(f"🌐 Connection Error: {e}")
+    openai_logger.error("🌐 Connection Error: %s", e)
     return "네트워크 연결에 문제가 있습니다. 인터넷 연결을 확인하고 잠시 후 다시 시도해주세요."
 
 
 def handle_rate_limit_error(e: openai.RateLimitError) -> str:
     """API 속도 제한 에러 처리"""
-    print(f"⏱️ Rate Limit Error: {e}")
+    openai_logger.warning("⏱️ Rate Limit Error: %s", e)
     return "현재 요청이 많아 처리가 지연되고 있습니다. 잠시 후 다시 시도해주세요."
 
 
 def handle_auth_error(e: openai.AuthenticationError) -> str:
     """인증 에러 처리"""
-    print(f"🔐 Authentication Error: {e}")
+    openai_logger.warning("🔐 Authentication Error: %s", e)
     return "AI 서비스 인증에 문제가 있습니다. 관리자에게 문의해주세요."
 
 
 def handle_permission_error(e: openai.PermissionDeniedError) -> str:
     """권한 에러 처리"""
-    print(f"🚫 Permission Error: {e}")
+    openai_logger.warning("🚫 Permission Error: %s", e)
     return "AI 서비스 접근 권한이 없습니다. 관리자에게 문의해주세요."
 
 
 def handle_not_found_error(e: openai.NotFoundError) -> str:
     """리소스 없음 에러 처리"""
-    print(f"❓ Not Found Error: {e}")
+    openai_logger.warning("❓ Not Found Error: %s", e)
     return "요청한 AI 모델이나 리소스를 찾을 수 없습니다. 다른 모델을 선택해주세요."
 
 
 def handle_validation_error(e: openai.UnprocessableEntityError, user_content: str) -> str:
     """입력 검증 에러 처리"""
-    print(f"⚠️ Validation Error: {e}")
+    openai_logger.warning("⚠️ Validation Error: %s", e)
 
     error_message = str(e).lower()
     if "context_length_exceeded" in error_message or "maximum context length" in error_message:
@@ -1517,13 +1452,13 @@ def handle_validation_error(e: openai.UnprocessableEntityError, user_content: st
 
 def handle_server_error(e: openai.InternalServerError) -> str:
     """서버 에러 처리"""
-    print(f"🔥 Server Error: {e}")
+    openai_logger.error("🔥 Server Error: %s", e)
     return "AI 서비스에 일시적인 문제가 발생했습니다. 잠시 후 다시 시도해주세요."
 
 
 def handle_bad_request_error(e: openai.BadRequestError, user_content: str) -> str:
     """잘못된 요청 에러 처리"""
-    print(f"❌ Bad Request Error: {e}")
+    openai_logger.error("❌ Bad Request Error: %s", e)
 
     error_message = str(e).lower()
     if "safety" in error_message or "policy" in error_message:
@@ -1536,7 +1471,7 @@ def handle_bad_request_error(e: openai.BadRequestError, user_content: str) -> st
 
 def handle_generic_error(e: Exception, user_content: str) -> str:
     """일반 에러 처리"""
-    print(f"🔍 Generic Error: {type(e).__name__}: {e}")
+    openai_logger.error("🔍 Generic Error: %s: %s", type(e).__name__, e)
     return f"예상치 못한 오류가 발생했습니다. 잠시 후 다시 시도해주세요."
 
 
@@ -1544,11 +1479,19 @@ async def safe_openai_call_with_retry(
         api_call_func,
         max_retries: int = 3,
         base_delay: float = 1.0,
-        user_content: str = ""
+        user_content: str = "",
+        api_path: Optional[str] = None
 ):
     """
     재시도 로직이 포함된 안전한 OpenAI API 호출
+    - full-jitter 지수 백오프, 서버가 준 Retry-After 힌트 우선
+    - api_path가 있으면 해당 경로의 서킷 브레이커를 확인/갱신 (차단 중이면 호출하지 않고 바로 에러)
     """
+    breaker = circuit_breakers.get(api_path)
+    if breaker is not None and not breaker.allow():
+        openai_logger.warning("⛔ %s circuit open, skipping call", api_path)
+        return {"error": "AI 서비스 연결이 일시적으로 불안정합니다. 잠시 후 다시 시도해주세요.", "circuit_open": True}
+
     last_exception = None
 
     for attempt in range(max_retries):
@@ -1558,29 +1501,55 @@ async def safe_openai_call_with_retry(
 
             # Request ID 추출 및 로깅
             if hasattr(response, '_request_id'):
-                print(f"✅ OpenAI Request ID: {response._request_id}")
+                openai_logger.debug("✅ OpenAI Request ID: %s", response._request_id)
 
+            if breaker is not None:
+                breaker.record_success()
             return response
 
         except (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError) as e:
             last_exception = e
 
+            # 클라이언트 속도 제어에서 이미 대기 한도를 넘겨 거절한 요청은 재시도해도 같은 결과
+            if getattr(e, "code", None) == RATE_LIMIT_SHED_CODE:
+                openai_logger.warning("🚦 Request shed by client rate limiter, not retrying")
+                break
+
+            if breaker is not None and isinstance(e, PATH_FAILURES):
+                breaker.record_failure()
+                if breaker.is_open:
+                    # 경로가 차단되면 남은 재시도 대신 호출자가 폴백 경로로 이동
+                    break
+
             # 재시도 가능한 에러들
             if attempt < max_retries - 1:
-                delay = base_delay * (2 ** attempt)  # 지수 백오프
-                print(f"🔄 Retry {attempt + 1}/{max_retries} after {delay}s due to: {type(e).__name__}")
+                delay = retry_delay(e, attempt, base_delay, OPENAI_RETRY_MAX_DELAY)
+                if delay is None:
+                    openai_logger.warning("⏳ Retry-After exceeds %ss, not retrying %s", OPENAI_RETRY_MAX_DELAY, type(e).__name__)
+                    break
+                OPENAI_RETRIES.inc(api_path or "unknown", type(e).__name__)
+                openai_logger.debug("🔄 Retry %s/%s after %.2fs due to: %s", attempt + 1, max_retries, delay, type(e).__name__)
                 await asyncio.sleep(delay)
             else:
-                print(f"❌ Max retries exceeded for {type(e).__name__}")
+                openai_logger.error("❌ Max retries exceeded for %s", type(e).__name__)
 
         except Exception as e:
             # 재시도 불가능한 에러들
             last_exception = e
-            print(f"💥 Non-retryable error: {type(e).__name__}: {e}")
+            openai_logger.error("💥 Non-retryable error: %s: %s", type(e).__name__, e)
             break
 
+    if breaker is not None:
+        breaker.release()  # 경로 장애가 아닌 이유로 끝난 half-open 탐색 요청 반환
+
     # 모든 재시도 실패 시 에러 처리
-    return {"error": handle_openai_error(last_exception, user_content)}
+    return {"error": handle_openai_error(last_exception, user_content), "exception": last_exception}
+
+
+def raise_if_error(response) -> None:
+    """safe_openai_call_with_retry가 에러 dict를 돌려줬으면 APIPathError로 전달 (경로 라우터가 원인 예외로 판단)"""
+    if isinstance(response, dict) and "error" in response:
+        raise APIPathError(response["error"], response.get("exception"))
 
 
 # Pydantic 모델들
@@ -1630,6 +1599,7 @@ class ChatSearch(BaseModel):
     page: int = 0
     size: int = 50
     sort: Optional[str] = None
+    cursor: Optional[str] = None  # 이전 응답의 nextCursor (지정 시 page 대신 사용)
 
 
 class ChatSessionList(BaseModel):
@@ -1638,6 +1608,29 @@ class ChatSessionList(BaseModel):
     totalPages: int
     currentPage: int
     size: int
+    nextCursor: Optional[str] = None
+
+
+class MessageSearch(BaseModel):
+    query: str
+    sessionId: Optional[str] = None
+    limit: int = 20
+
+
+class MessageSearchHit(BaseModel):
+    messageId: str
+    sessionId: str
+    sessionTitle: Optional[str] = None
+    role: str
+    snippet: str
+    score: float
+    timestamp: Optional[datetime] = None
+
+
+class MessageSearchResult(BaseModel):
+    query: str
+    hits: List[MessageSearchHit]
+    totalElements: int
 
 
 class ChatHistory(BaseModel):
@@ -1662,7 +1655,7 @@ async def process_file_with_openai(file_content: bytes, filename: str, content_t
                                    add_to_vector_store: bool = False) -> str:
     """OpenAI Files API를 사용한 고급 파일 처리 (벡터 스토어 통합)"""
     try:
-        print(f"🔍 Processing file with OpenAI: {filename} ({content_type})")
+        file_logger.debug("🔍 Processing file with OpenAI: %s (%s)", filename, content_type)
 
         # OpenAI Files API에 파일 업로드
         with tempfile.NamedTemporaryFile(delete=False, suffix=f"_{filename}") as temp_file:
@@ -1675,7 +1668,7 @@ async def process_file_with_openai(file_content: bytes, filename: str, content_t
                 purpose="assistants"  # 문서 분석용
             )
 
-            print(f"✅ File uploaded to OpenAI: {file_object.id}")
+            file_logger.info("✅ File uploaded to OpenAI: %s", file_object.id)
 
             # 파일 처리 완료까지 대기
             await client.files.wait_for_processing(file_object.id)
@@ -1685,13 +1678,13 @@ async def process_file_with_openai(file_content: bytes, filename: str, content_t
                 try:
                     vector_store_id = await create_or_get_vector_store(session_id)
                     if await add_file_to_vector_store(vector_store_id, file_object.id):
-                        print(f"📚 File added to vector store for future reference")
+                        file_logger.debug("📚 File added to vector store for future reference")
                         # 벡터 스토어에 추가된 경우 파일을 삭제하지 않음
                         file_should_be_deleted = False
                     else:
                         file_should_be_deleted = True
                 except Exception as vs_error:
-                    print(f"⚠️ Failed to add file to vector store: {vs_error}")
+                    file_logger.warning("⚠️ Failed to add file to vector store: %s", vs_error)
                     file_should_be_deleted = True
             else:
                 file_should_be_deleted = True
@@ -1703,7 +1696,7 @@ async def process_file_with_openai(file_content: bytes, filename: str, content_t
             if file_should_be_deleted:
                 try:
                     await client.files.delete(file_object.id)
-                    print(f"🗑️ Cleaned up file: {file_object.id}")
+                    file_logger.info("🗑️ Cleaned up file: %s", file_object.id)
                 except:
                     pass  # 삭제 실패는 무시
 
@@ -1713,7 +1706,7 @@ async def process_file_with_openai(file_content: bytes, filename: str, content_t
             return analysis_result
 
     except Exception as e:
-        print(f"🚨 OpenAI Files API error: {e}")
+        file_logger.error("🚨 OpenAI Files API error: %s", e)
         # 폴백: 로컬 처리
         return await process_file_locally(file_content, filename, content_type)
 
@@ -1756,11 +1749,12 @@ async def analyze_file_with_assistant(file_id: str, filename: str) -> str:
         )
 
         # Assistant 실행
-        run = await client.beta.threads.runs.create_and_poll(
-            thread_id=thread.id,
-            assistant_id=assistant.id,
-            timeout=60
-        )
+        with track_openai("assistant", assistant.model):
+            run = await client.beta.threads.runs.create_and_poll(
+                thread_id=thread.id,
+                assistant_id=assistant.id,
+                timeout=60
+            )
 
         if run.status == 'completed':
             # 응답 메시지 가져오기
@@ -1786,13 +1780,13 @@ async def analyze_file_with_assistant(file_id: str, filename: str) -> str:
         raise Exception(f"Assistant API run failed: {run.status}")
 
     except Exception as e:
-        print(f"🚨 Assistant file analysis error: {e}")
+        file_logger.error("🚨 Assistant file analysis error: %s", e)
         raise e
 
 
 async def process_file_locally(file_content: bytes, filename: str, content_type: str) -> str:
     """로컬 파일 처리 (폴백)"""
-    print(f"🔄 Fallback to local processing: {filename}")
+    file_logger.debug("🔄 Fallback to local processing: %s", filename)
 
     try:
         if content_type == "application/pdf" or filename.lower().endswith('.pdf'):
@@ -1861,32 +1855,33 @@ async def analyze_image_with_gpt4o_vision(file_content: bytes, filename: str, pr
 한국어로 상세하고 구체적으로 답변해주세요."""
 
         # GPT-4o Vision API 호출
-        response = await client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt},
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{base64_image}",
-                                "detail": "high"  # 고해상도 분석
+        with track_openai("chat_completions", "gpt-4o"):
+            response = await client.chat.completions.create(
+                model="gpt-4o",
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "text", "text": prompt},
+                            {
+                                "type": "image_url",
+                                "image_url": {
+                                    "url": f"data:image/jpeg;base64,{base64_image}",
+                                    "detail": "high"  # 고해상도 분석
+                                }
                             }
-                        }
-                    ]
-                }
-            ],
-            max_tokens=2000,
-            temperature=0.1  # 더 정확한 분석을 위해 낮은 temperature
-        )
+                        ]
+                    }
+                ],
+                max_tokens=2000,
+                temperature=0.1  # 더 정확한 분석을 위해 낮은 temperature
+            )
         
         vision_result = response.choices[0].message.content
         return f"🔍 GPT-4o Vision 분석 결과:\n\n{vision_result}"
         
     except Exception as e:
-        print(f"GPT-4o Vision API 오류: {e}")
+        file_logger.error("GPT-4o Vision API 오류: %s", e)
         return f"GPT-4o Vision 분석 오류: {str(e)}"
 
 
@@ -1904,7 +1899,7 @@ async def extract_text_from_image_local(file_content: bytes) -> str:
 async def process_image_with_hybrid_approach(file_content: bytes, filename: str) -> str:
     """이미지를 OCR과 GPT-4o Vision을 모두 사용하여 처리 (하이브리드 접근)"""
     try:
-        print(f"🖼️ Processing image with hybrid approach: {filename}")
+        file_logger.debug("🖼️ Processing image with hybrid approach: %s", filename)
         
         # 1. GPT-4o Vision 분석 시도
         vision_result = await analyze_image_with_gpt4o_vision(file_content, filename)
@@ -1928,7 +1923,7 @@ async def process_image_with_hybrid_approach(file_content: bytes, filename: str)
         return combined_result
         
     except Exception as e:
-        print(f"Hybrid image processing error: {e}")
+        file_logger.error("Hybrid image processing error: %s", e)
         # 폴백: OCR만 사용
         return await extract_text_from_image_local(file_content)
 
@@ -1970,10 +1965,10 @@ async def create_multimodal_message_content(text: str, image_files: list = None)
                     }
                 })
                 
-                print(f"🖼️ Added image to multimodal message: {file.filename} ({image_format})")
+                file_logger.debug("🖼️ Added image to multimodal message: %s (%s)", file.filename, image_format)
                 
             except Exception as e:
-                print(f"Failed to process image {file.filename}: {e}")
+                file_logger.error("Failed to process image %s: %s", file.filename, e)
                 # 이미지 처리 실패 시 텍스트로 알림 추가
                 content.append({
                     "type": "text", 
@@ -2016,7 +2011,8 @@ async def send_multimodal_message_to_gpt4o(
             chat_params["tool_choice"] = "auto"
         
         # GPT-4o Vision API 호출
-        response = await client.chat.completions.create(**chat_params)
+        with track_openai("chat_completions", chat_params["model"]):
+            response = await client.chat.completions.create(**chat_params)
         
         # Function calls 처리 (기존 로직과 동일)
         if response.choices[0].message.tool_calls:
@@ -2026,7 +2022,8 @@ async def send_multimodal_message_to_gpt4o(
                 function_name = tool_call.function.name
                 function_args = json.loads(tool_call.function.arguments)
                 
-                result = await execute_google_function(function_name, function_args)
+                with track_tool(function_name):
+                    result = await execute_google_function(function_name, function_args)
                 
                 if isinstance(result, dict) and "error" in result:
                     content += f"\n\n## ❌ {function_name} 실행 오류\n\n{result['error']}"
@@ -2042,7 +2039,7 @@ async def send_multimodal_message_to_gpt4o(
         return response.choices[0].message.content
         
     except Exception as e:
-        print(f"Multimodal message error: {e}")
+        file_logger.error("Multimodal message error: %s", e)
         raise e
 
 
@@ -2053,7 +2050,7 @@ async def process_uploaded_file(file: UploadFile, session_id: str = None, add_to
         file_type = file.content_type.lower() if file.content_type else ""
         filename = file.filename or "unknown_file"
 
-        print(f"📁 Processing uploaded file: {filename} ({file_type})")
+        file_logger.debug("📁 Processing uploaded file: %s (%s)", filename, file_type)
 
         # 파일 크기 확인 (OpenAI 제한: 512MB)
         file_size_mb = len(file_content) / (1024 * 1024)
@@ -2080,14 +2077,14 @@ async def process_uploaded_file(file: UploadFile, session_id: str = None, add_to
         )
 
         if use_openai_files:
-            print(f"🚀 Using OpenAI Files API for enhanced processing")
+            file_logger.debug("🚀 Using OpenAI Files API for enhanced processing")
             return await process_file_with_openai(file_content, filename, file_type, session_id, add_to_vector_store)
         else:
-            print(f"🔄 Using local processing (file too large or unsupported)")
+            file_logger.debug("🔄 Using local processing (file too large or unsupported)")
             return await process_file_locally(file_content, filename, file_type)
 
     except Exception as e:
-        print(f"🚨 File processing error: {e}")
+        file_logger.error("🚨 File processing error: %s", e)
         return f"파일 처리 오류: {str(e)}"
 
 
@@ -2100,7 +2097,7 @@ def create_session(title: str = None) -> ChatSession:
     session_id = generate_id()
     session = ChatSession(
         id=session_id,
-        title=title or f"새 채팅 {len(sessions_db) + 1}",
+        title=title or f"새 채팅 {repository.count_sessions() + 1}",
         createdAt=datetime.now(),
         updatedAt=datetime.now(),
         messageCount=0,
@@ -2108,96 +2105,57 @@ def create_session(title: str = None) -> ChatSession:
         titleGeneratedAt=None
     )
 
-    sessions_db[session_id] = session.dict()
-    messages_db[session_id] = []
+    repository.create_session({**session.dict(), "schemaVersion": SESSION_SCHEMA_VERSION})
     return session
 
 
 def get_session(session_id: str) -> ChatSession:
-    if session_id not in sessions_db:
+    # 레거시 레코드는 시작 시 run_session_migrations에서 이미 현재 스키마로 변환됨
+    session_data = repository.get_session(session_id)
+    if session_data is None:
         raise HTTPException(status_code=404, detail="Session not found")
-    
-    session_data = sessions_db[session_id].copy()
-    
-    # Handle legacy sessions missing required fields
-    if "title" not in session_data:
-        session_data["title"] = f"채팅 {session_id[:8]}"
-    if "updatedAt" not in session_data:
-        session_data["updatedAt"] = session_data.get("createdAt", datetime.now())
-    if "createdAt" not in session_data:
-        session_data["createdAt"] = datetime.now()
-    if "messageCount" not in session_data:
-        session_data["messageCount"] = len(messages_db.get(session_id, []))
-    if "titleGenerated" not in session_data:
-        session_data["titleGenerated"] = False
-    if "titleGeneratedAt" not in session_data:
-        session_data["titleGeneratedAt"] = None
-    
-    # Update the stored session with missing fields for future use
-    sessions_db[session_id].update(session_data)
-    
     return ChatSession(**session_data)
 
 
-def migrate_legacy_sessions():
-    """Legacy sessions을 새로운 스키마로 마이그레이션"""
-    migrated_count = 0
-    for session_id, session_data in sessions_db.items():
-        updated = False
-        if "title" not in session_data:
-            session_data["title"] = f"채팅 {session_id[:8]}"
-            updated = True
-        if "updatedAt" not in session_data:
-            session_data["updatedAt"] = session_data.get("createdAt", datetime.now())
-            updated = True
-        if "createdAt" not in session_data:
-            session_data["createdAt"] = datetime.now()
-            updated = True
-        if "messageCount" not in session_data:
-            session_data["messageCount"] = len(messages_db.get(session_id, []))
-            updated = True
-        if "titleGenerated" not in session_data:
-            session_data["titleGenerated"] = False
-            updated = True
-        if "titleGeneratedAt" not in session_data:
-            session_data["titleGeneratedAt"] = None
-            updated = True
-        
-        if updated:
-            migrated_count += 1
-    
-    if migrated_count > 0:
-        logger.info(f"✅ Migrated {migrated_count} legacy sessions to new schema")
-
-
 def update_session_message_count(session_id: str):
-    if session_id in sessions_db:
-        sessions_db[session_id]["messageCount"] = len(messages_db.get(session_id, []))
-        sessions_db[session_id]["updatedAt"] = datetime.now()
+    repository.update_session(
+        session_id,
+        messageCount=repository.count_messages(session_id),
+        updatedAt=datetime.now()
+    )
+    # 요약 임계값을 넘은 세션은 백그라운드 요약 예약
+    summarizer.maybe_schedule(session_id)
 
 
 def update_session_title(session_id: str, new_title: str, auto_generated: bool = False):
     """세션 제목 업데이트"""
-    if session_id in sessions_db:
-        sessions_db[session_id]["title"] = new_title
-        sessions_db[session_id]["updatedAt"] = datetime.now()
-        if auto_generated:
-            sessions_db[session_id]["titleGenerated"] = True
-            sessions_db[session_id]["titleGeneratedAt"] = datetime.now()
+    fields = {"title": new_title, "updatedAt": datetime.now()}
+    if auto_generated:
+        fields["titleGenerated"] = True
+        fields["titleGeneratedAt"] = datetime.now()
+    repository.update_session(session_id, **fields)
+
+
+# 같은 세션의 동시 제목 생성은 한 번만 실행 (중복 요청, 여러 탭)
+title_flights = SingleFlight("auto_title")
 
 
 async def auto_generate_title_if_needed(session_id: str) -> Optional[str]:
-    """자동 제목 생성이 필요한 경우 생성하여 업데이트"""
+    """자동 제목 생성이 필요한 경우 생성하여 업데이트 (진행 중인 생성이 있으면 그 결과를 공유)"""
+    return await title_flights.do(session_id, lambda: generate_title_if_needed(session_id))
+
+
+async def generate_title_if_needed(session_id: str) -> Optional[str]:
     if not title_generator or not TITLE_GENERATOR_AVAILABLE:
         return None
     
     try:
         # 세션과 메시지 데이터 가져오기
-        if session_id not in sessions_db or session_id not in messages_db:
+        session_data = repository.get_session(session_id)
+        if session_data is None:
             return None
             
-        session_data = sessions_db[session_id]
-        messages = messages_db[session_id]
+        messages = repository.get_messages(session_id)
         
         # 제목 생성 조건 확인
         if not title_generator.should_generate_title(messages, session_data["title"]):
@@ -2209,26 +2167,26 @@ async def auto_generate_title_if_needed(session_id: str) -> Optional[str]:
         if new_title:
             # 제목 업데이트
             update_session_title(session_id, new_title, auto_generated=True)
-            logger.info(f"Auto-generated title for session {session_id}: {new_title}")
+            logger.info("Auto-generated title for session %s: %s", session_id, new_title)
             return new_title
         else:
             # 폴백 제목 사용
             fallback_title = title_generator.get_fallback_title(messages)
             update_session_title(session_id, fallback_title, auto_generated=True)
-            logger.info(f"Using fallback title for session {session_id}: {fallback_title}")
+            logger.info("Using fallback title for session %s: %s", session_id, fallback_title)
             return fallback_title
             
     except Exception as e:
-        logger.error(f"Failed to generate title for session {session_id}: {str(e)}")
+        logger.error("Failed to generate title for session %s: %s", session_id, e)
         return None
 
 
 # 초기 데모 데이터 생성
 def initialize_demo_data():
-    if not sessions_db:
+    if not repository.count_sessions():
         # 데모 세션 1
         demo_session_1 = create_session("영업 데이터 분석")
-        messages_db[demo_session_1.id] = [
+        repository.replace_messages(demo_session_1.id, [
             {
                 "id": generate_id(),
                 "content": "이번 분기 영업 성과는 어떤가요?",
@@ -2243,11 +2201,11 @@ def initialize_demo_data():
                 "timestamp": datetime.now(),
                 "sessionId": demo_session_1.id
             }
-        ]
+        ])
 
         # 데모 세션 2
         demo_session_2 = create_session("프로젝트 현황 조회")
-        messages_db[demo_session_2.id] = [
+        repository.replace_messages(demo_session_2.id, [
             {
                 "id": generate_id(),
                 "content": "진행 중인 프로젝트 목록을 보여주세요",
@@ -2262,14 +2220,13 @@ def initialize_demo_data():
                 "timestamp": datetime.now(),
                 "sessionId": demo_session_2.id
             }
-        ]
+        ])
 
         # 데모 세션 3
         demo_session_3 = create_session("고객사 정보 문의")
-        messages_db[demo_session_3.id] = []
 
         # 메시지 카운트 업데이트
-        for session_id in sessions_db.keys():
+        for session_id in (demo_session_1.id, demo_session_2.id, demo_session_3.id):
             update_session_message_count(session_id)
 
 
@@ -2278,10 +2235,15 @@ def initialize_demo_data():
 async def lifespan(app: FastAPI):
     # Startup
     # initialize_demo_data()  # 데모 데이터 생성 비활성화
-    migrate_legacy_sessions()  # Legacy sessions 마이그레이션
+    migrated_count = run_session_migrations(repository)  # 구버전 세션 스키마 1회 마이그레이션
+    if migrated_count > 0:
+        logger.info("✅ Migrated %s legacy sessions to schema v%s", migrated_count, SESSION_SCHEMA_VERSION)
+    summarizer.start()
     yield
     # Shutdown
-    pass
+    await summarizer.stop()
+    await openai_pool.aclose()
+    repository.close()
 
 
 app = FastAPI(
@@ -2299,6 +2261,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)  # 요청 컨텍스트(endpoint 라벨) + HTTP 요청 시간
 
 
 # API 엔드포인트들
@@ -2313,6 +2276,12 @@ async def health_check():
     return {"status": "healthy", "timestamp": datetime.now()}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus 텍스트 형식 메트릭 (TTFT, 초당 토큰, OpenAI/Google/도구 지연)"""
+    return Response(content=REGISTRY.render(), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+
 @app.get("/api/v1/models")
 async def get_available_models():
     """사용 가능한 AI 모델 목록 반환"""
@@ -2341,10 +2310,10 @@ async def google_callback(code: str):
 
     success = auth_service.handle_callback(code)
     if success:
-        print("✅ Google OAuth 인증 성공! 사용자가 5173 포트로 리다이렉트됩니다.")
+        logger.info("✅ Google OAuth 인증 성공! 사용자가 5173 포트로 리다이렉트됩니다.")
         return RedirectResponse(url="http://localhost:5173?google_auth=success&message=Google 서비스 연동이 성공적으로 완료되었습니다!")
     else:
-        print("❌ Google OAuth 인증 실패! 사용자가 5173 포트로 리다이렉트됩니다.")
+        logger.warning("❌ Google OAuth 인증 실패! 사용자가 5173 포트로 리다이렉트됩니다.")
         return RedirectResponse(url="http://localhost:5173?google_auth=error&message=Google 서비스 연동에 실패했습니다. 다시 시도해주세요.")
 
 
@@ -2364,57 +2333,64 @@ async def google_status():
 @app.post("/api/v1/chat/sessions", response_model=ChatSession)
 async def create_chat_session(request: SessionCreateRequest):
     session = create_session(request.title)
-    return session
-
-
-@app.get("/api/v1/chat/sessions", response_model=ChatSessionList)
-async def get_chat_sessions(search: ChatSearch = Depends()):
-    sessions = []
-    for session_id, session_data in sessions_db.items():
-        # Handle legacy sessions missing required fields
-        cleaned_session = session_data.copy()
-        if "title" not in cleaned_session:
-            cleaned_session["title"] = f"채팅 {session_id[:8]}"
-        if "updatedAt" not in cleaned_session:
-            cleaned_session["updatedAt"] = cleaned_session.get("createdAt", datetime.now())
-        if "createdAt" not in cleaned_session:
-            cleaned_session["createdAt"] = datetime.now()
-        if "messageCount" not in cleaned_session:
-            cleaned_session["messageCount"] = len(messages_db.get(session_id, []))
-        if "titleGenerated" not in cleaned_session:
-            cleaned_session["titleGenerated"] = False
-        if "titleGeneratedAt" not in cleaned_session:
-            cleaned_session["titleGeneratedAt"] = None
-        
-        sessions.append(cleaned_session)
-        # Update the stored session with missing fields for future use
-        sessions_db[session_id].update(cleaned_session)
-
-    # 검색 필터 적용
-    if search.query:
-        sessions = [
-            s for s in sessions
-            if search.query.lower() in s["title"].lower()
-        ]
+    return session
 
-    # 정렬 (최신순)
-    sessions.sort(key=lambda x: x["updatedAt"], reverse=True)
 
-    # 페이징
-    total = len(sessions)
-    start = search.page * search.size
-    end = start + search.size
-    paged_sessions = sessions[start:end]
+@app.get("/api/v1/chat/sessions", response_model=ChatSessionList)
+async def get_chat_sessions(search: ChatSearch = Depends()):
+    # 정렬/제목 검색은 저장소 인덱스에서 처리하고 현재 페이지만 읽음
+    try:
+        result = repository.list_sessions(
+            offset=search.page * search.size,
+            limit=search.size,
+            query=search.query,
+            cursor=search.cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
+    total = result.total
     return ChatSessionList(
-        sessions=[ChatSession(**s) for s in paged_sessions],
+        sessions=[ChatSession(**s) for s in result.sessions],
         totalElements=total,
         totalPages=(total + search.size - 1) // search.size,
         currentPage=search.page,
-        size=search.size
+        size=search.size,
+        nextCursor=result.next_cursor
     )
 
 
+@app.get("/api/v1/chat/search", response_model=MessageSearchResult)
+async def search_messages(search: MessageSearch = Depends()):
+    """메시지 본문 전문 검색 (bigram/trigram 역색인, 점수순)"""
+    if len(search.query.strip()) < 2:
+        raise HTTPException(status_code=400, detail="Search query must be at least 2 characters")
+
+    hits, total = repository.search_messages(search.query, limit=search.limit, session_id=search.sessionId)
+
+    results = []
+    session_titles = {}
+    for hit in hits:
+        found = repository.find_message(hit.message_id)
+        if found is None:
+            continue
+        message = found[2]
+        if hit.session_id not in session_titles:
+            session = repository.get_session(hit.session_id)
+            session_titles[hit.session_id] = session.get("title") if session else None
+        results.append(MessageSearchHit(
+            messageId=hit.message_id,
+            sessionId=hit.session_id,
+            sessionTitle=session_titles[hit.session_id],
+            role=message.get("role", ""),
+            snippet=make_snippet(message.get("content", ""), search.query),
+            score=round(hit.score, 4),
+            timestamp=message.get("timestamp")
+        ))
+
+    return MessageSearchResult(query=search.query, hits=results, totalElements=total)
+
+
 @app.get("/api/v1/chat/sessions/{session_id}", response_model=ChatSession)
 async def get_chat_session(session_id: str):
     return get_session(session_id)
@@ -2422,22 +2398,17 @@ async def get_chat_session(session_id: str):
 
 @app.patch("/api/v1/chat/sessions/{session_id}")
 async def update_chat_session(session_id: str, request: SessionUpdateRequest):
-    if session_id not in sessions_db:
+    if not repository.update_session(session_id, title=request.title, updatedAt=datetime.now()):
         raise HTTPException(status_code=404, detail="Session not found")
 
-    sessions_db[session_id]["title"] = request.title
-    sessions_db[session_id]["updatedAt"] = datetime.now()
     return {"message": "Session updated successfully"}
 
 
 @app.delete("/api/v1/chat/sessions/{session_id}")
 async def delete_chat_session(session_id: str):
-    if session_id not in sessions_db:
+    if not repository.delete_session(session_id):
         raise HTTPException(status_code=404, detail="Session not found")
-
-    del sessions_db[session_id]
-    if session_id in messages_db:
-        del messages_db[session_id]
+    context_windows.invalidate(session_id)
 
     return {"message": "Session deleted successfully"}
 
@@ -2445,12 +2416,12 @@ async def delete_chat_session(session_id: str):
 @app.post("/api/v1/chat/sessions/{session_id}/generate-title")
 async def generate_session_title(session_id: str):
     """세션의 AI 기반 제목 생성 (수동 트리거)"""
-    if session_id not in sessions_db:
+    if not repository.has_session(session_id):
         raise HTTPException(status_code=404, detail="Session not found")
     
     try:
         # 세션 메시지 가져오기
-        messages = messages_db.get(session_id, [])
+        messages = repository.get_messages(session_id)
         
         if len(messages) < 2:
             return {"success": False, "message": "메시지가 충분하지 않습니다"}
@@ -2464,12 +2435,9 @@ async def generate_session_title(session_id: str):
             return {"success": False, "title": fallback_title, "message": "AI 제목 생성 실패, 폴백 제목 사용"}
         
         # 세션 제목 업데이트
-        sessions_db[session_id]["title"] = generated_title
-        sessions_db[session_id]["titleGenerated"] = True
-        sessions_db[session_id]["titleGeneratedAt"] = datetime.now()
-        sessions_db[session_id]["updatedAt"] = datetime.now()
+        update_session_title(session_id, generated_title, auto_generated=True)
         
-        logger.info(f"✨ Manual title generated for session {session_id}: {generated_title}")
+        logger.info("✨ Manual title generated for session %s: %s", session_id, generated_title)
         
         return {
             "success": True, 
@@ -2478,17 +2446,17 @@ async def generate_session_title(session_id: str):
         }
         
     except Exception as e:
-        logger.error(f"❌ Manual title generation failed for session {session_id}: {str(e)}")
+        logger.error("❌ Manual title generation failed for session %s: %s", session_id, e)
         return {"success": False, "message": f"제목 생성 중 오류 발생: {str(e)}"}
 
 
 # 메시지 관리
 @app.get("/api/v1/chat/sessions/{session_id}/messages", response_model=ChatHistory)
 async def get_message_history(session_id: str):
-    if session_id not in sessions_db:
+    if not repository.has_session(session_id):
         raise HTTPException(status_code=404, detail="Session not found")
 
-    messages = messages_db.get(session_id, [])
+    messages = repository.get_messages(session_id)
     return ChatHistory(
         messages=[ChatMessage(**msg) for msg in messages],
         sessionId=session_id,
@@ -2499,28 +2467,21 @@ async def get_message_history(session_id: str):
 @app.get("/api/v1/chat/sessions/{session_id}/tokens")
 async def get_token_usage(session_id: str):
     """세션의 토큰 사용량 정보 조회"""
-    if session_id not in sessions_db:
+    if not repository.has_session(session_id):
         raise HTTPException(status_code=404, detail="Session not found")
 
-    # 현재 토큰 사용량 계산
-    current_messages = messages_db.get(session_id, [])
-    current_tokens = calculate_conversation_tokens(current_messages)
-
-    # 저장된 토큰 사용량 정보
-    usage_info = token_usage_db.get(session_id, {
-        "total_tokens": current_tokens,
-        "messages_count": len(current_messages),
-        "optimizations": 0,
-        "tokens_saved": 0,
-        "last_updated": datetime.now().isoformat()
-    })
+    # 저장소가 증분 관리하는 토큰 누적치 (메시지 재계산 없음)
+    usage_info = dict(repository.get_token_usage(session_id))
+    current_tokens = usage_info["total_tokens"]
 
     # 실시간 정보 업데이트
     usage_info.update({
         "current_tokens": current_tokens,
         "max_tokens": MAX_CONVERSATION_TOKENS,
         "optimization_threshold": SUMMARY_TRIGGER_TOKENS,
-        "has_summary": session_id in conversation_summaries,
+        "context_tokens": context_windows.get_view_tokens(session_id),
+        "tokenizer": get_tokenizer().name,
+        "has_summary": repository.has_value(CONVERSATION_SUMMARIES, session_id),
         "efficiency_percentage": round((1 - current_tokens / MAX_CONVERSATION_TOKENS) * 100,
                                        1) if current_tokens < MAX_CONVERSATION_TOKENS else 0
     })
@@ -2538,10 +2499,10 @@ async def send_message_with_files(
     """파일 첨부를 지원하는 채팅 메시지 전송"""
     try:
         # 세션 존재 확인
-        if sessionId not in sessions_db:
+        if not repository.has_session(sessionId):
             raise HTTPException(status_code=404, detail="Session not found")
 
-        session_messages = messages_db.get(sessionId, [])
+        session_messages = repository.get_messages(sessionId)
 
         # 파일 분류: 이미지 파일과 문서 파일 분리
         image_files = []
@@ -2551,12 +2512,12 @@ async def send_message_with_files(
         if files:
             for file in files:
                 if file.filename:  # 파일이 실제로 업로드된 경우
-                    print(f"Processing file: {file.filename}, type: {file.content_type}")
+                    file_logger.debug("Processing file: %s, type: %s", file.filename, file.content_type)
                     
                     if is_image_file(file):
                         # 이미지 파일은 멀티모달 처리를 위해 별도 보관
                         image_files.append(file)
-                        print(f"🖼️ Image file detected: {file.filename}")
+                        file_logger.debug("🖼️ Image file detected: %s", file.filename)
                     else:
                         # 문서 파일은 기존 방식으로 처리
                         document_files.append(file)
@@ -2571,6 +2532,19 @@ async def send_message_with_files(
         # 이미지 파일이 있으면 멀티모달 메시지 사용 여부 결정
         use_multimodal = len(image_files) > 0 and model == "gpt-4o"
 
+        # 선택된 모델 정보 가져오기
+        selected_model = model if model in AVAILABLE_MODELS else "gpt-4o"
+        model_config = AVAILABLE_MODELS[selected_model]
+
+        system_prompt = "당신은 NSales Pro의 영업 AI 도우미입니다. 영업 데이터 분석, 프로젝트 정보 조회, 업무 관련 질문에 도움을 주세요. 한국어로 친근하고 전문적으로 답변해주세요. 첨부된 파일의 내용을 분석하여 관련된 답변을 제공해주세요. 최신 정보가 필요하거나 실시간 데이터, 뉴스, 시장 동향 등을 질문받으면 웹 검색을 적극 활용하여 정확하고 최신의 정보를 제공하세요."
+
+        # 파일 내용을 포함한 메시지가 모델 한도를 넘으면 저장/호출 전에 거절
+        google_tools = get_google_tools() if GOOGLE_SERVICES_AVAILABLE and auth_service.is_authenticated() else []
+        try:
+            history_budget = ensure_fits(system_prompt, message_content, model_config, tools_tokens(google_tools))
+        except ContextBudgetExceeded as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
         # 사용자 메시지 저장
         # 멀티모달의 경우 이미지 정보 추가 표시
         display_content = message_content
@@ -2586,30 +2560,23 @@ async def send_message_with_files(
             sessionId=sessionId
         )
         session_messages.append(user_message.model_dump())
+        repository.append_message(sessionId, user_message.model_dump())
 
-        # OpenAI API에 전달할 메시지 구성
-        system_prompt = "당신은 NSales Pro의 영업 AI 도우미입니다. 영업 데이터 분석, 프로젝트 정보 조회, 업무 관련 질문에 도움을 주세요. 한국어로 친근하고 전문적으로 답변해주세요. 첨부된 파일의 내용을 분석하여 관련된 답변을 제공해주세요. 최신 정보가 필요하거나 실시간 데이터, 뉴스, 시장 동향 등을 질문받으면 웹 검색을 적극 활용하여 정확하고 최신의 정보를 제공하세요."
-        
+        # OpenAI API에 전달할 메시지 구성 (파일 내용이 포함된 현재 메시지를 뺀 남은 예산만큼 최근 대화 포함)
         conversation_messages = [{"role": "system", "content": system_prompt}]
-
-        # 기존 대화 내용 추가 (최근 20개 메시지만 유지)
-        recent_messages = session_messages[-21:] if len(session_messages) > 21 else session_messages[:-1]  # 현재 메시지 제외
+        recent_messages = pack_turns(session_messages[:-1], history_budget)  # 현재 메시지 제외
         for msg in recent_messages:
             conversation_messages.append({
                 "role": msg["role"],
                 "content": msg["content"]
             })
 
-        # 선택된 모델 정보 가져오기
-        selected_model = model if model in AVAILABLE_MODELS else "gpt-4o"
-        model_config = AVAILABLE_MODELS[selected_model]
-
         # OpenAI API 호출
         try:
-            print(f"Using model: {selected_model} ({model_config['name']})")
-            print(f"Conversation length: {len(conversation_messages)} messages")
-            print(f"Files processed: {len(file_contents)} documents, {len(image_files)} images")
-            print(f"Multimodal mode: {use_multimodal}")
+            file_logger.debug("Using model: %s (%s)", selected_model, model_config['name'])
+            file_logger.debug("Conversation length: %s messages", len(conversation_messages))
+            file_logger.debug("Files processed: %s documents, %s images", len(file_contents), len(image_files))
+            file_logger.debug("Multimodal mode: %s", use_multimodal)
 
             # 사용 가능한 도구 목록 구성
             available_tools = []
@@ -2618,7 +2585,7 @@ async def send_message_with_files(
 
             if use_multimodal:
                 # 멀티모달 메시지로 처리 (이미지 + 텍스트)
-                print("🔄 Using multimodal message processing...")
+                file_logger.debug("🔄 Using multimodal message processing...")
                 ai_content = await send_multimodal_message_to_gpt4o(
                     conversation_messages,
                     message_content,
@@ -2628,7 +2595,7 @@ async def send_message_with_files(
                 )
             else:
                 # 기존 방식으로 처리
-                print("🔄 Using traditional text-only processing...")
+                file_logger.debug("🔄 Using traditional text-only processing...")
                 
                 # 현재 사용자 메시지 추가 (텍스트만)
                 conversation_messages.append({"role": "user", "content": message_content})
@@ -2648,7 +2615,7 @@ async def send_message_with_files(
                     model_config
                 )
 
-            print(f"OpenAI Response: {ai_content}")
+            file_logger.debug("OpenAI Response: %s", ai_content)
 
         except Exception as e:
             # 개선된 에러 처리
@@ -2662,14 +2629,10 @@ async def send_message_with_files(
             timestamp=datetime.now(),
             sessionId=sessionId
         )
-        session_messages.append(ai_message.model_dump())
-
-        # 메시지 저장
-        messages_db[sessionId] = session_messages
+        repository.append_message(sessionId, ai_message.model_dump())
 
         # 세션 업데이트
-        sessions_db[sessionId]["messageCount"] = len(session_messages)
-        sessions_db[sessionId]["updatedAt"] = datetime.now()
+        update_session_message_count(sessionId)
 
         return {
             "userMessage": user_message,
@@ -2677,16 +2640,39 @@ async def send_message_with_files(
             "success": True
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error in send_message_with_files: {e}")
+        file_logger.error("Error in send_message_with_files: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/v1/chat/messages", response_model=ChatResponse)
 async def send_message(request: ChatRequest):
-    if request.sessionId not in sessions_db:
+    if not repository.has_session(request.sessionId):
         raise HTTPException(status_code=404, detail="Session not found")
 
+    # 선택된 모델 정보 가져오기
+    selected_model = request.model if request.model in AVAILABLE_MODELS else "gpt-4o"
+    model_config = AVAILABLE_MODELS[selected_model]
+
+    # 멘션 기반 서비스 활성화 로직
+    mention_detected = detect_google_mention(request.content)
+    google_authenticated = GOOGLE_SERVICES_AVAILABLE and auth_service.is_authenticated()
+
+    # Google 서비스 사용 안내를 포함한 시스템 프롬프트 (캐시)
+    system_prompt = context_builder.system_prompt("chat", mention_detected, google_authenticated)
+
+    # 사용 가능한 도구 목록 구성
+    available_tools = []
+    if google_authenticated:
+        google_tools = get_google_tools()
+        available_tools.extend(google_tools)
+        logger.debug("🛠️ Google 도구 %s개 추가됨", len(google_tools))
+
+    # 모델 한도를 넘는 요청은 저장/호출 전에 거절
+    ensure_request_fits(system_prompt, request.content, model_config, available_tools)
+
     # 사용자 메시지 저장
     user_message = ChatMessage(
         id=generate_id(),
@@ -2696,79 +2682,43 @@ async def send_message(request: ChatRequest):
         sessionId=request.sessionId
     )
 
-    if request.sessionId not in messages_db:
-        messages_db[request.sessionId] = []
-
-    messages_db[request.sessionId].append(user_message.dict())
-
-    # 세션의 기존 메시지 히스토리 가져오기
-    session_messages = messages_db.get(request.sessionId, [])
-
-    # Google 서비스 사용 안내를 포함한 시스템 프롬프트 구성
-    system_prompt = "당신은 NSales Pro의 영업 AI 도우미입니다. 영업 데이터 분석, 프로젝트 정보 조회, 업무 관련 질문에 도움을 주세요. 한국어로 친근하고 전문적으로 답변해주세요. 이전 대화 내용을 기억하고 문맥을 유지하여 답변하세요. 최신 정보가 필요하거나 실시간 데이터, 뉴스, 시장 동향 등을 질문받으면 웹 검색을 적극 활용하여 정확하고 최신의 정보를 제공하세요."
-
-    # 멘션 기반 서비스 활성화 로직
-    mention_detected = False
-    google_mention_keywords = ['@캘린더', '@메일', '@일정생성', '@빈시간']
-
-    for keyword in google_mention_keywords:
-        if keyword in request.content:
-            mention_detected = True
-            break
-
-    # Google 서비스가 사용 가능하고 멘션이 감지된 경우 안내 추가
-    if GOOGLE_SERVICES_AVAILABLE and auth_service.is_authenticated() and mention_detected:
-        system_prompt += "\n\n**🎯 Google 서비스 멘션 감지됨:**\n사용자가 @멘션을 사용했습니다. 다음 함수를 반드시 호출하여 요청을 처리하세요:\n- @캘린더 → get_calendar_events 함수 호출\n- @메일 → get_emails 또는 send_email 함수 호출\n- @일정생성 → create_calendar_event 함수 호출\n- @빈시간 → find_free_time 함수 호출\n\n멘션이 포함된 요청은 반드시 해당 함수를 실행하여 실제 데이터를 제공해야 합니다."
-    elif GOOGLE_SERVICES_AVAILABLE and auth_service.is_authenticated():
-        system_prompt += "\n\n**Google 서비스 연동 안내:**\n사용자가 캘린더, 일정, 스케줄, Gmail, 이메일 관련 질문을 하면 다음 함수들을 적극 활용하세요:\n- get_calendar_events: 캘린더 일정 조회 (오늘, 이번주, 이번달 등)\n- create_calendar_event: 새 일정 생성\n- send_email: 이메일 전송\n- get_emails: 이메일 조회\n- find_free_time: 빈 시간 찾기\n\n사용자가 '캘린더', '일정', '스케줄' 등의 키워드를 사용하면 반드시 해당 함수를 호출하여 실제 데이터를 제공하세요."
-
-    # 📊 토큰 최적화된 대화 메시지 구성
-    optimized_messages = await get_optimized_conversation_messages(request.sessionId, max_messages=18)
-
-    conversation_messages = [{"role": "system", "content": system_prompt}]
 
-    # 최적화된 메시지 추가
-    for msg in optimized_messages:
-        if msg.get("role") != "system":  # 시스템 메시지는 이미 추가됨
-            conversation_messages.append({
-                "role": msg["role"],
-                "content": msg["content"]
-            })
-
-    # 현재 사용자 메시지 추가
-    conversation_messages.append({"role": "user", "content": request.content})
-
-    # 선택된 모델 정보 가져오기
-    selected_model = request.model if request.model in AVAILABLE_MODELS else "gpt-4o"
-    model_config = AVAILABLE_MODELS[selected_model]
+    repository.append_message(request.sessionId, user_message.dict())
 
-    # 사용 가능한 도구 목록 구성
-    available_tools = []
-    if GOOGLE_SERVICES_AVAILABLE and auth_service.is_authenticated():
-        available_tools.extend(get_google_tools())
-        print(f"🛠️ Google 도구 {len(get_google_tools())}개 추가됨")
+    # 📊 모델 토큰 예산에 맞춘 대화 메시지 구성 (요약 + 현재 사용자 메시지까지의 최근 대화)
+    conversation_messages = context_builder.build(
+        request.sessionId, system_prompt, model_config, reserved_tokens=tools_tokens(available_tools)
+    )
 
     # 개선된 OpenAI API 호출 (Responses API 우선 사용)
     try:
-        print(f"Using model: {selected_model} ({model_config['name']})")
-        print(f"Conversation length: {len(conversation_messages)} messages")
+        logger.debug("Using model: %s (%s)", selected_model, model_config['name'])
+        logger.debug("Conversation length: %s messages", len(conversation_messages))
 
         # 웹 검색 여부 확인
         needs_web_search = getattr(request, 'webSearch', False)
 
-        # 최적의 OpenAI API 선택하여 사용
-        ai_content = await create_response_with_best_api(
-            request.sessionId,
-            selected_model,
-            system_prompt,
-            request.content,
-            conversation_messages,
-            available_tools,
-            needs_web_search,
-            model_config
-        )
+        cache_key = cache_key_for(request.sessionId, selected_model, system_prompt, conversation_messages,
+                                  needs_web_search, mention_detected)
+        ai_content = response_cache.get(cache_key, "chat") if cache_key else None
+        if ai_content is not None:
+            logger.debug("💾 Response cache hit")
+        else:
+            # 최적의 OpenAI API 선택하여 사용
+            ai_content = await create_response_with_best_api(
+                request.sessionId,
+                selected_model,
+                system_prompt,
+                request.content,
+                conversation_messages,
+                available_tools,
+                needs_web_search,
+                model_config
+            )
+            if cache_key:
+                response_cache.put(cache_key, ai_content)
 
-        print(f"OpenAI Response: {ai_content}")
+        logger.debug("OpenAI Response: %s", ai_content)
 
     except Exception as e:
         # 개선된 에러 처리
@@ -2783,7 +2733,7 @@ async def send_message(request: ChatRequest):
         sessionId=request.sessionId
     )
 
-    messages_db[request.sessionId].append(ai_message.dict())
+    repository.append_message(request.sessionId, ai_message.dict())
     update_session_message_count(request.sessionId)
 
     # 자동 제목 생성 시도 (백그라운드에서 실행)
@@ -2798,93 +2748,55 @@ async def stream_chat(request: ChatRequest):
     """통합 API 선택을 사용한 스트리밍 채팅"""
 
     # 세션 존재 확인
-    if request.sessionId not in sessions_db:
+    if not repository.has_session(request.sessionId):
         raise HTTPException(status_code=404, detail="Session not found")
 
-    # 사용자 메시지 저장
-    user_message = ChatMessage(
-        id=generate_id(),
-        content=request.content,
-        role="user",
-        timestamp=datetime.now(),
-        sessionId=request.sessionId
-    )
-
-    if request.sessionId not in messages_db:
-        messages_db[request.sessionId] = []
-
-    messages_db[request.sessionId].append(user_message.dict())
-
     # 모델 선택 및 설정
     selected_model = request.model if request.model in AVAILABLE_MODELS else "gpt-4o"
     model_config = AVAILABLE_MODELS[selected_model]
 
-    # 세션의 기존 메시지 히스토리 가져오기
-    session_messages = messages_db.get(request.sessionId, [])
-
-    # 현재 한국 시간 정보 생성
-    korea_tz = timezone(timedelta(hours=9))
-    current_time_kst = datetime.now(korea_tz)
-
-    # Google 서비스 사용 안내를 포함한 시스템 프롬프트 구성
-    system_prompt = f"""당신은 NSales Pro의 영업 AI 도우미입니다. 영업 데이터 분석, 프로젝트 정보 조회, 업무 관련 질문에 도움을 주세요. 한국어로 친근하고 전문적으로 답변해주세요. 이전 대화 내용을 기억하고 문맥을 유지하여 답변하세요. 최신 정보가 필요하거나 실시간 데이터, 뉴스, 시장 동향 등을 질문받으면 웹 검색을 적극 활용하여 정확하고 최신의 정보를 제공하세요.
-
-**현재 시간 정보:**
-- 현재 날짜: {current_time_kst.strftime('%Y년 %m월 %d일 (%A)')}
-- 현재 시간: {current_time_kst.strftime('%H시 %M분')}
-- 시간대: 한국 표준시 (KST, UTC+9)
-
-"오늘", "이번 주", "이번 달" 등의 시간 표현을 사용할 때는 위의 한국 시간 기준으로 해석해주세요."""
-
     # 멘션 기반 서비스 활성화 로직
-    mention_detected = False
-    google_mention_keywords = ['@캘린더', '@메일', '@일정생성', '@빈시간']
+    mention_detected = detect_google_mention(request.content)
+    google_authenticated = GOOGLE_SERVICES_AVAILABLE and auth_service.is_authenticated()
 
-    for keyword in google_mention_keywords:
-        if keyword in request.content:
-            mention_detected = True
-            break
+    # 현재 KST 시간과 Google 서비스 안내를 포함한 시스템 프롬프트 (분 단위 캐시)
+    system_prompt = context_builder.system_prompt("stream", mention_detected, google_authenticated)
 
-    # Google 서비스가 사용 가능하고 멘션이 감지된 경우 안내 추가
-    if GOOGLE_SERVICES_AVAILABLE and auth_service.is_authenticated() and mention_detected:
-        system_prompt += "\n\n**🎯 Google 서비스 멘션 감지됨:**\n사용자가 @멘션을 사용했습니다. 다음 함수를 반드시 호출하여 요청을 처리하세요:\n- @캘린더 → get_calendar_events 함수 호출\n- @메일 → get_emails 또는 send_email 함수 호출\n- @일정생성 → create_calendar_event 함수 호출\n- @빈시간 → find_free_time 함수 호출\n\n멘션이 포함된 요청은 반드시 해당 함수를 실행하여 실제 데이터를 제공해야 합니다."
-    elif GOOGLE_SERVICES_AVAILABLE and auth_service.is_authenticated():
-        system_prompt += "\n\n**🛠️ Google 서비스 활용 가능:**\n캘린더 조회, 이메일 관리, 일정 생성 등의 요청 시 Google 함수를 적극 활용하여 실제 데이터를 제공해주세요."
+    # Google 도구 준비
+    available_tools = []
+    if google_authenticated:
+        available_tools.extend(GOOGLE_TOOLS)
+        stream_logger.debug("🛠️ Google 도구 %s개 추가됨", len(GOOGLE_TOOLS))
+        stream_logger.debug("🎯 멘션 감지: %s", mention_detected)
+        if mention_detected:
+            stream_logger.debug("🔥 강제 Function Calling 활성화 예정: @캘린더 → get_calendar_events")
 
-    # 📊 토큰 최적화된 대화 메시지 구성 (스트리밍)
-    optimized_messages = await get_optimized_conversation_messages(request.sessionId, max_messages=18)
+    # 모델 한도를 넘는 요청은 저장/호출 전에 거절
+    ensure_request_fits(system_prompt, request.content, model_config, available_tools)
 
-    conversation_messages = [{"role": "system", "content": system_prompt}]
+    # 사용자 메시지 저장
+    user_message = ChatMessage(
+        id=generate_id(),
+        content=request.content,
+        role="user",
+        timestamp=datetime.now(),
+        sessionId=request.sessionId
+    )
 
-    # 최적화된 메시지 추가 (현재 메시지는 제외)
-    for msg in optimized_messages:
-        if msg.get("role") != "system":  # 시스템 메시지는 이미 추가됨
-            conversation_messages.append({
-                "role": msg["role"],
-                "content": msg["content"]
-            })
 
-    # 현재 사용자 메시지 추가
-    conversation_messages.append({
-        "role": "user",
-        "content": request.content
-    })
+    repository.append_message(request.sessionId, user_message.dict())
 
-    # Google 도구 준비
-    available_tools = []
-    if GOOGLE_SERVICES_AVAILABLE and auth_service.is_authenticated():
-        available_tools.extend(GOOGLE_TOOLS)
-        print(f"🛠️ Google 도구 {len(GOOGLE_TOOLS)}개 추가됨")
-        print(f"🎯 멘션 감지: {mention_detected}")
-        if mention_detected:
-            print(f"🔥 강제 Function Calling 활성화 예정: @캘린더 → get_calendar_events")
+    # 📊 모델 토큰 예산에 맞춘 대화 메시지 구성 (요약 + 현재 사용자 메시지까지의 최근 대화)
+    conversation_messages = context_builder.build(
+        request.sessionId, system_prompt, model_config, reserved_tokens=tools_tokens(available_tools)
+    )
 
     # 웹 검색 여부 확인
     needs_web_search = getattr(request, 'webSearch', False)
 
     # Google 멘션이 감지된 경우 직접 Function Calling 처리
     if mention_detected and available_tools:
-        print("🎯 멘션 감지됨 - 직접 Function Calling 처리")
+        stream_logger.debug("🎯 멘션 감지됨 - 직접 Function Calling 처리")
         return await stream_with_direct_function_calling(
             request.sessionId,
             selected_model,
@@ -2905,7 +2817,9 @@ async def stream_chat(request: ChatRequest):
         needs_web_search,
         model_config,
         user_message,
-        mention_detected
+        mention_detected,
+        cache_key_for(request.sessionId, selected_model, system_prompt, conversation_messages,
+                      needs_web_search, mention_detected)
     )
 
 
@@ -2919,63 +2833,83 @@ async def stream_with_unified_api(
         needs_web_search: bool,
         model_config: Dict,
         user_message: ChatMessage,
-        mention_detected: bool = False
+        mention_detected: bool = False,
+        cache_key: Optional[str] = None
 ):
-    """통합 API 선택을 사용한 스트리밍 응답 생성"""
+    """통합 API 선택을 사용한 스트리밍 응답 생성 (cache_key가 있으면 캐시된 응답을 같은 SSE 형식으로 재생)"""
 
     async def generate_unified_stream():
         ai_message_id = generate_id()
         full_content = ""
+        cached_content = response_cache.get(cache_key, "stream") if cache_key else None
+        completed = False
 
         try:
             # 1. 통합 API 선택 로직 실행
-            print(f"🔍 Stream API Selection Debug:")
-            print(f"  - Model: {model}")
-            print(f"  - supports_assistant: {model_config.get('supports_assistant', False)}")
-            print(f"  - needs_web_search: {needs_web_search}")
-            print(f"  - available_tools: {len(available_tools) if available_tools else 0}")
-
-            # Assistant API는 현재 스트리밍 미지원이므로 가능한 API 사용
-            # 먼저 Chat Completions로 시도 (더 안정적)
+            stream_logger.debug("🔍 Stream API selection", extra={
+                "model": model, "supports_assistant": model_config.get("supports_assistant", False),
+                "needs_web_search": needs_web_search, "tools": len(available_tools) if available_tools else 0
+            })
+
             use_responses_api = needs_web_search and model_config.get("supports_web_search", False)
+            # 세션 전용 파일 스토어는 Assistant(file_search)만 검색할 수 있으므로 Assistant Run을 스트리밍
+            use_assistant_api = (
+                    model_config.get("supports_assistant", False) and not needs_web_search and
+                    repository.has_value(VECTOR_STORES, session_id) and circuit_breakers["assistant"].available()
+            )
 
-            if use_responses_api:
-                print("🌐 Using Responses API for streaming")
+            assistant_frames = None
+            if use_assistant_api and cached_content is None:
+                try:
+                    thread_id, run_stream = await start_assistant_run(
+                        session_id, user_input, model, model_config, instructions
+                    )
+                    assistant_frames = stream_with_assistant_api(
+                        session_id, thread_id, run_stream, ai_message_id
+                    )
+                except APIPathError as e:
+                    # 첫 델타 전 실패는 Chat Completions 스트리밍으로 폴백
+                    stream_logger.warning("⚠️ Assistant run failed to start, falling back: %s", e.message)
+
+            if cached_content is not None:
+                stream_logger.debug("💾 Replaying cached response")
+                # 캐시된 응답을 델타 하나와 완료 청크로 재생 (스트리밍 응답과 같은 SSE 형식)
+                encode_chunk = StreamChunkEncoder(ai_message_id, session_id, compact=False)  # json.dumps(dict) 형식
+                yield encode_chunk(cached_content)
+                yield encode_chunk("", is_complete=True)
+                full_content = cached_content
+            elif assistant_frames is not None:
+                stream_logger.debug("🎯 Using Assistant API for streaming")
+                async for chunk_str in track_stream(assistant_frames, "assistant", model):
+                    if isinstance(chunk_str, DeltaFrame):
+                        full_content += chunk_str.delta
+                    yield chunk_str
+            elif use_responses_api:
+                stream_logger.debug("🌐 Using Responses API for streaming")
                 # Responses API 스트리밍
-                async for chunk_str in stream_with_responses_api(
+                async for chunk_str in track_stream(stream_with_responses_api(
                         model, instructions, user_input, conversation_messages,
                         available_tools, needs_web_search, model_config, ai_message_id, session_id
-                ):
-                    # chunk_str은 이미 "data: {...}\n\n" 형태
-                    if chunk_str.startswith("data:"):
-                        try:
-                            chunk_data = json.loads(chunk_str[5:].strip())
-                            full_content += chunk_data.get("content", "")
-                        except:
-                            pass
+                ), "responses", model):
+                    # chunk_str은 이미 "data: {...}\n\n" 형태 (델타 프레임은 원본 델타를 함께 보관)
+                    if isinstance(chunk_str, DeltaFrame):
+                        full_content += chunk_str.delta
                     yield chunk_str
             else:
-                print("💬 Using Chat Completions API for streaming")
+                stream_logger.debug("💬 Using Chat Completions API for streaming")
                 # Chat Completions 스트리밍 (폴백)
-                async for chunk_str in stream_with_chat_completions_fallback(
+                async for chunk_str in track_stream(stream_with_chat_completions_fallback(
                         model, conversation_messages, ai_message_id, session_id
-                ):
-                    # chunk_str은 이미 "data: {...}\n\n" 형태
-                    if chunk_str.startswith("data:"):
-                        try:
-                            chunk_data = json.loads(chunk_str[5:].strip())
-                            full_content += chunk_data.get("content", "")
-                        except:
-                            pass
+                ), "chat_completions", model):
+                    # chunk_str은 이미 "data: {...}\n\n" 형태 (델타 프레임은 원본 델타를 함께 보관)
+                    if isinstance(chunk_str, DeltaFrame):
+                        full_content += chunk_str.delta
                     yield chunk_str
+            completed = cached_content is None
 
         except Exception as e:
-            print(f"🚨 Streaming error: {e}")
-            print(f"🚨 Error type: {type(e)}")
-            print(f"🚨 Error details: {str(e)}")
-            import traceback
-            print(f"🚨 Traceback: {traceback.format_exc()}")
-            error_content = handle_openai_error(e, user_content=user_input)
+            stream_logger.exception("🚨 Streaming error: %s: %s", type(e).__name__, e)
+            error_content = e.message if isinstance(e, APIPathError) else handle_openai_error(e, user_content=user_input)
 
             error_chunk = {
                 "id": ai_message_id,
@@ -2988,6 +2922,9 @@ async def stream_with_unified_api(
             yield f"data: {json.dumps(error_chunk)}\n\n"
             full_content = error_content
 
+        if completed and cache_key:
+            response_cache.put(cache_key, full_content)
+
         # AI 응답 저장
         ai_message = ChatMessage(
             id=ai_message_id,
@@ -2997,11 +2934,11 @@ async def stream_with_unified_api(
             sessionId=session_id
         )
 
-        messages_db[session_id].append(ai_message.dict())
+        repository.append_message(session_id, ai_message.dict())
         update_session_message_count(session_id)
 
     return StreamingResponse(
-        generate_unified_stream(),
+        coalesce_stream(generate_unified_stream(), STREAM_COALESCE_MS, STREAM_COALESCE_BYTES),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -3011,6 +2948,29 @@ async def stream_with_unified_api(
     )
 
 
+async def stream_with_assistant_api(
+        session_id: str,
+        thread_id: str,
+        run_stream,
+        ai_message_id: str
+):
+    """Assistant Run 이벤트 스트림의 텍스트 델타를 SSE 청크로 전달 (도구 호출은 스트림 안에서 처리)"""
+    encode_chunk = StreamChunkEncoder(ai_message_id, session_id, compact=False)  # json.dumps(dict) 형식
+
+    try:
+        async for delta in assistant_run_deltas(no_retry_client, run_stream, thread_id, run_assistant_tools,
+                                                STREAM_TIMEOUT):
+            yield encode_chunk(delta)
+    except APIPathError as e:
+        stream_logger.error("🚨 Assistant streaming error: %s", e.message)
+        raise
+
+    thread_sync.mark_reply(session_id)
+
+    # 완료 청크
+    yield encode_chunk("", is_complete=True)
+
+
 async def stream_with_responses_api(
         model: str,
         instructions: str,
@@ -3023,23 +2983,22 @@ async def stream_with_responses_api(
         session_id: str
 ):
     """Responses API를 사용한 스트리밍"""
+    encode_chunk = StreamChunkEncoder(ai_message_id, session_id, compact=False)  # json.dumps(dict) 형식
 
     # Responses API는 스트리밍 미지원이므로 일반 응답 후 청크로 나누어 전송
     try:
-        print(f"🔍 Calling Responses API fallback with:")
-        print(f"  - Model: {model}")
-        print(f"  - Instructions length: {len(instructions) if instructions else 0}")
-        print(f"  - User input: {user_input[:50]}...")
-        print(f"  - Conversation messages: {len(conversation_messages)}")
-        print(f"  - Available tools: {len(available_tools)}")
-        print(f"  - Needs web search: {needs_web_search}")
+        stream_logger.debug("🔍 Calling Responses API fallback", extra={
+            "model": model, "instructions_length": len(instructions) if instructions else 0,
+            "messages": len(conversation_messages), "tools": len(available_tools),
+            "needs_web_search": needs_web_search
+        })
 
         ai_content = await create_response_with_responses_api_fallback(
             model, instructions, user_input, conversation_messages,
             available_tools, needs_web_search, model_config
         )
 
-        print(f"✅ Responses API success, content length: {len(ai_content) if ai_content else 0}")
+        stream_logger.debug("✅ Responses API success, content length: %s", len(ai_content) if ai_content else 0)
 
         # 텍스트를 청크로 나누어 스트리밍 시뮬레이션 - 줄바꿈 보존
         import re
@@ -3054,45 +3013,19 @@ async def stream_with_responses_api(
 
             # 공백/줄바꿈 토큰은 스트리밍하지 않고, 단어 토큰만 스트리밍
             if token.strip():  # 공백이 아닌 토큰(단어)만 전송
-                chunk_data = {
-                    "id": ai_message_id,
-                    "content": token,
-                    "role": "assistant",
-                    "timestamp": datetime.now().isoformat(),
-                    "sessionId": session_id,
-                    "isComplete": False
-                }
-
-                yield f"data: {json.dumps(chunk_data)}\n\n"
+                yield encode_chunk(token)
 
                 # 단어 간 약간의 딜레이 (자연스러운 스트리밍 효과)
                 await asyncio.sleep(0.05)
             else:
                 # 공백/줄바꿈 토큰도 전송 (포맷팅 보존을 위해)
-                chunk_data = {
-                    "id": ai_message_id,
-                    "content": token,
-                    "role": "assistant",
-                    "timestamp": datetime.now().isoformat(),
-                    "sessionId": session_id,
-                    "isComplete": False
-                }
-
-                yield f"data: {json.dumps(chunk_data)}\n\n"
+                yield encode_chunk(token)
 
         # 완료 청크
-        final_chunk = {
-            "id": ai_message_id,
-            "content": "",
-            "role": "assistant",
-            "timestamp": datetime.now().isoformat(),
-            "sessionId": session_id,
-            "isComplete": True
-        }
-        yield f"data: {json.dumps(final_chunk)}\n\n"
+        yield encode_chunk("", is_complete=True)
 
     except Exception as e:
-        print(f"🚨 Responses API streaming error: {e}")
+        stream_logger.error("🚨 Responses API streaming error: %s", e)
         raise e
 
 
@@ -3103,44 +3036,30 @@ async def stream_with_chat_completions_fallback(
         session_id: str
 ):
     """Chat Completions API를 사용한 스트리밍 폴백"""
+    encode_chunk = StreamChunkEncoder(ai_message_id, session_id, compact=False)  # json.dumps(dict) 형식
 
     try:
-        stream = await client.chat.completions.create(
-            model=model,
-            messages=conversation_messages,
-            stream=True,
-            max_tokens=4000,
-            temperature=0.7
-        )
+        with track_openai("chat_completions", model):
+            stream = await client.chat.completions.create(
+                model=model,
+                messages=conversation_messages,
+                stream=True,
+                timeout=STREAM_TIMEOUT,
+                max_tokens=4000,
+                temperature=0.7
+            )
 
         async for chunk in stream:
             if chunk.choices[0].delta.content:
                 content = chunk.choices[0].delta.content
 
-                chunk_data = {
-                    "id": ai_message_id,
-                    "content": content,
-                    "role": "assistant",
-                    "timestamp": datetime.now().isoformat(),
-                    "sessionId": session_id,
-                    "isComplete": False
-                }
-
-                yield f"data: {json.dumps(chunk_data)}\n\n"
+                yield encode_chunk(content)
 
         # 완료 청크
-        final_chunk = {
-            "id": ai_message_id,
-            "content": "",
-            "role": "assistant",
-            "timestamp": datetime.now().isoformat(),
-            "sessionId": session_id,
-            "isComplete": True
-        }
-        yield f"data: {json.dumps(final_chunk)}\n\n"
+        yield encode_chunk("", is_complete=True)
 
     except Exception as e:
-        print(f"🚨 Chat Completions streaming error: {e}")
+        stream_logger.error("🚨 Chat Completions streaming error: %s", e)
         raise e
 
 
@@ -3150,11 +3069,14 @@ async def stream_with_realtime_api(request: ChatRequest, user_message: ChatMessa
     async def generate_realtime_stream():
         ai_message_id = generate_id()
         full_content = ""
+        encode_chunk = StreamChunkEncoder.for_model(ChatStreamChunk, ai_message_id, request.sessionId)
 
         try:
-            print(f"🎙️ Using Realtime API with model: {model}")
+            stream_logger.debug("🎙️ Using Realtime API with model: %s", model)
 
+            connect_start = time.perf_counter()
             async with client.beta.realtime.connect(model=model) as connection:
+                observe_openai("realtime", model, time.perf_counter() - connect_start)
                 # 세션 설정 (텍스트 모드)
                 await connection.session.update(session={'modalities': ['text']})
 
@@ -3177,19 +3099,11 @@ async def stream_with_realtime_api(request: ChatRequest, user_message: ChatMessa
                         delta_text = event.delta
                         full_content += delta_text
 
-                        chunk = ChatStreamChunk(
-                            id=ai_message_id,
-                            content=delta_text,
-                            role="assistant",
-                            timestamp=datetime.now(),
-                            sessionId=request.sessionId,
-                            isComplete=False
-                        )
-                        yield f"data: {chunk.json()}\n\n"
+                        yield encode_chunk(delta_text)
 
                     elif event.type == 'response.text.done':
                         # 텍스트 완료
-                        print(f"✅ Realtime text complete")
+                        stream_logger.debug("✅ Realtime text complete")
 
                     elif event.type == 'response.done':
                         # 전체 응답 완료
@@ -3207,7 +3121,7 @@ async def stream_with_realtime_api(request: ChatRequest, user_message: ChatMessa
                     elif event.type == 'error':
                         # 에러 처리
                         error_msg = f"Realtime API 오류: {event.error.message}"
-                        print(f"🚨 Realtime API Error: {error_msg}")
+                        stream_logger.error("🚨 Realtime API Error: %s", error_msg)
 
                         error_chunk = ChatStreamChunk(
                             id=ai_message_id,
@@ -3230,12 +3144,12 @@ async def stream_with_realtime_api(request: ChatRequest, user_message: ChatMessa
                     sessionId=request.sessionId
                 )
 
-                messages_db[request.sessionId].append(ai_message.dict())
+                repository.append_message(request.sessionId, ai_message.dict())
                 update_session_message_count(request.sessionId)
 
         except Exception as e:
             error_msg = handle_openai_error(e, user_content=request.content)
-            print(f"🚨 Realtime API Exception: {error_msg}")
+            stream_logger.error("🚨 Realtime API Exception: %s", error_msg)
 
             error_chunk = ChatStreamChunk(
                 id=ai_message_id,
@@ -3248,7 +3162,8 @@ async def stream_with_realtime_api(request: ChatRequest, user_message: ChatMessa
             yield f"data: {error_chunk.json()}\n\n"
 
     return StreamingResponse(
-        generate_realtime_stream(),
+        coalesce_stream(track_stream(generate_realtime_stream(), "realtime", model),
+                        STREAM_COALESCE_MS, STREAM_COALESCE_BYTES),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -3265,50 +3180,34 @@ async def stream_with_chat_completions(request: ChatRequest, user_message: ChatM
     async def generate_chat_stream():
         ai_message_id = generate_id()
         full_content = ""
+        encode_chunk = StreamChunkEncoder.for_model(ChatStreamChunk, ai_message_id, request.sessionId)
 
         try:
-            print(f"💬 Using Chat Completions streaming with model: {model}")
+            stream_logger.debug("💬 Using Chat Completions streaming with model: %s", model)
 
-            # 세션 메시지 히스토리 구성
-            session_messages = messages_db.get(request.sessionId, [])
             system_prompt = "당신은 NSales Pro의 영업 AI 도우미입니다. 한국어로 친근하고 전문적으로 답변해주세요."
+            model_config = AVAILABLE_MODELS.get(model, AVAILABLE_MODELS["gpt-4o"])
 
-            conversation_messages = [{"role": "system", "content": system_prompt}]
-
-            # 최근 메시지들 추가
-            recent_messages = session_messages[-20:] if len(session_messages) > 20 else session_messages
-            for msg in recent_messages:
-                conversation_messages.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
-
-            # 현재 사용자 메시지 추가
-            conversation_messages.append({"role": "user", "content": request.content})
+            # 모델 토큰 예산에 맞춘 대화 히스토리 (현재 사용자 메시지는 이미 저장되어 뷰의 마지막에 포함)
+            conversation_messages = context_builder.build(request.sessionId, system_prompt, model_config)
 
             # 스트리밍 요청
-            stream = await client.chat.completions.create(
-                model=model,
-                messages=conversation_messages,
-                max_tokens=2000,
-                temperature=0.7,
-                stream=True
-            )
+            with track_openai("chat_completions", model):
+                stream = await client.chat.completions.create(
+                    model=model,
+                    messages=conversation_messages,
+                    max_tokens=model_config["max_tokens"],
+                    temperature=0.7,
+                    stream=True,
+                    timeout=STREAM_TIMEOUT
+                )
 
             async for chunk in stream:
                 if chunk.choices[0].delta.content:
                     delta_content = chunk.choices[0].delta.content
                     full_content += delta_content
 
-                    chunk_obj = ChatStreamChunk(
-                        id=ai_message_id,
-                        content=delta_content,
-                        role="assistant",
-                        timestamp=datetime.now(),
-                        sessionId=request.sessionId,
-                        isComplete=False
-                    )
-                    yield f"data: {chunk_obj.json()}\n\n"
+                    yield encode_chunk(delta_content)
 
                 # 스트림 완료 체크
                 if chunk.choices[0].finish_reason:
@@ -3333,12 +3232,12 @@ async def stream_with_chat_completions(request: ChatRequest, user_message: ChatM
                     sessionId=request.sessionId
                 )
 
-                messages_db[request.sessionId].append(ai_message.dict())
+                repository.append_message(request.sessionId, ai_message.dict())
                 update_session_message_count(request.sessionId)
 
         except Exception as e:
             error_msg = handle_openai_error(e, user_content=request.content)
-            print(f"🚨 Chat Completions Streaming Error: {error_msg}")
+            stream_logger.error("🚨 Chat Completions Streaming Error: %s", error_msg)
 
             error_chunk = ChatStreamChunk(
                 id=ai_message_id,
@@ -3351,7 +3250,8 @@ async def stream_with_chat_completions(request: ChatRequest, user_message: ChatM
             yield f"data: {error_chunk.json()}\n\n"
 
     return StreamingResponse(
-        generate_chat_stream(),
+        coalesce_stream(track_stream(generate_chat_stream(), "chat_completions", model),
+                        STREAM_COALESCE_MS, STREAM_COALESCE_BYTES),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -3365,7 +3265,7 @@ async def stream_with_chat_completions(request: ChatRequest, user_message: ChatM
 # 원래 스트리밍 함수 (임시 비활성화)
 @app.post("/api/v1/chat/stream_disabled")
 async def stream_chat_original(request: ChatRequest):
-    if request.sessionId not in sessions_db:
+    if not repository.has_session(request.sessionId):
         raise HTTPException(status_code=404, detail="Session not found")
 
     # 사용자 메시지 저장
@@ -3377,17 +3277,13 @@ async def stream_chat_original(request: ChatRequest):
         sessionId=request.sessionId
     )
 
-    if request.sessionId not in messages_db:
-        messages_db[request.sessionId] = []
 
-    messages_db[request.sessionId].append(user_message.dict())
+    repository.append_message(request.sessionId, user_message.dict())
 
     async def generate_stream():
         ai_message_id = generate_id()
         full_content = ""
-
-        # 세션의 기존 메시지 히스토리 가져오기
-        session_messages = messages_db.get(request.sessionId, [])
+        encode_chunk = StreamChunkEncoder.for_model(ChatStreamChunk, ai_message_id, request.sessionId)
 
         # 현재 한국 시간 정보 생성
         korea_tz = timezone(timedelta(hours=9))
@@ -3414,41 +3310,29 @@ async def stream_chat_original(request: ChatRequest):
 
         # Google 서비스가 사용 가능하고 멘션이 감지된 경우 안내 추가
         if GOOGLE_SERVICES_AVAILABLE and auth_service.is_authenticated() and mention_detected:
-            print(f"🎯 Google 멘션 감지됨: {request.content}")
+            stream_logger.debug("🎯 Google 멘션 감지됨: %s", request.content)
             system_prompt += "\n\n**🎯 Google 서비스 멘션 감지됨:**\n사용자가 @멘션을 사용했습니다. 다음 함수를 반드시 호출하여 요청을 처리하세요:\n- @캘린더 → get_calendar_events 함수 호출\n- @메일 → get_emails 또는 send_email 함수 호출\n- @일정생성 → create_calendar_event 함수 호출\n- @빈시간 → find_free_time 함수 호출\n\n멘션이 포함된 요청은 반드시 해당 함수를 실행하여 실제 데이터를 제공해야 합니다."
         elif GOOGLE_SERVICES_AVAILABLE and auth_service.is_authenticated():
             system_prompt += "\n\n**Google 서비스 연동 안내:**\n사용자가 캘린더, 일정, 스케줄, Gmail, 이메일 관련 질문을 하면 다음 함수들을 적극 활용하세요:\n- get_calendar_events: 캘린더 일정 조회 (오늘, 이번주, 이번달 등)\n- create_calendar_event: 새 일정 생성\n- send_email: 이메일 전송\n- get_emails: 이메일 조회\n- find_free_time: 빈 시간 찾기\n\n사용자가 '캘린더', '일정', '스케줄' 등의 키워드를 사용하면 반드시 해당 함수를 호출하여 실제 데이터를 제공하세요."
 
-        # OpenAI API에 전달할 메시지 구성
-        conversation_messages = [
-            {"role": "system", "content": system_prompt}
-        ]
-
-        # 기존 대화 내용 추가 (최근 20개 메시지만 유지하여 토큰 절약)
-        recent_messages = session_messages[-20:] if len(session_messages) > 20 else session_messages
-        for msg in recent_messages:
-            conversation_messages.append({
-                "role": msg["role"],
-                "content": msg["content"]
-            })
-
-        # 현재 사용자 메시지 추가
-        conversation_messages.append({"role": "user", "content": request.content})
-
         try:
             # 선택된 모델 정보 가져오기
             selected_model = request.model if request.model in AVAILABLE_MODELS else "gpt-4o"
             model_config = AVAILABLE_MODELS[selected_model]
 
-            print(f"Stream using model: {selected_model} ({model_config['name']})")
-            print(f"Stream conversation length: {len(conversation_messages)} messages")  # 디버깅용
+            # OpenAI API에 전달할 메시지 구성 (모델 토큰 예산 내 요약 + 현재 사용자 메시지까지의 최근 대화)
+            conversation_messages = context_builder.build(request.sessionId, system_prompt, model_config)
+
+            stream_logger.debug("Stream using model: %s (%s)", selected_model, model_config['name'])
+            stream_logger.debug("Stream conversation length: %s messages", len(conversation_messages))  # 디버깅용
 
             # 사용 가능한 도구 목록 구성
             available_tools = []
-            print(f"🔍 Debug - mention_detected: {mention_detected}")
-            print(f"🔍 Debug - GOOGLE_SERVICES_AVAILABLE: {GOOGLE_SERVICES_AVAILABLE}")
-            print(
-                f"🔍 Debug - is_authenticated: {auth_service.is_authenticated() if GOOGLE_SERVICES_AVAILABLE else 'N/A'}")
+            if stream_logger.isEnabledFor(logging.DEBUG):
+                stream_logger.debug("🔍 Google service state", extra={
+                    "mention_detected": mention_detected, "google_available": GOOGLE_SERVICES_AVAILABLE,
+                    "authenticated": auth_service.is_authenticated() if GOOGLE_SERVICES_AVAILABLE else None
+                })
 
             # 웹 검색 여부는 프론트엔드에서 결정 (webSearch 파라미터로 전달)
             needs_web_search = getattr(request, 'webSearch', False)
@@ -3460,12 +3344,13 @@ async def stream_chat_original(request: ChatRequest):
             # Google 서비스 도구 추가 (인증된 경우만)
             if GOOGLE_SERVICES_AVAILABLE and auth_service.is_authenticated():
                 available_tools.extend(GOOGLE_TOOLS)
-                print(f"🔗 Google 서비스 도구 {len(GOOGLE_TOOLS)}개 추가됨")
-                print(f"🔍 사용 가능한 도구들: {[tool['function']['name'] for tool in GOOGLE_TOOLS]}")
+                stream_logger.debug("🔗 Google 서비스 도구 %s개 추가됨", len(GOOGLE_TOOLS))
+                if stream_logger.isEnabledFor(logging.DEBUG):
+                    stream_logger.debug("🔍 사용 가능한 도구들: %s", [tool['function']['name'] for tool in GOOGLE_TOOLS])
             search_content = request.content
 
             if needs_web_search and model_config["supports_web_search"]:
-                print("🔍 Web search detected in stream - using Responses API")
+                stream_logger.debug("🔍 Web search detected in stream - using Responses API")
                 
                 # 웹 검색 시작 상태 표시
                 search_start_chunk = ChatStreamChunk(
@@ -3481,17 +3366,18 @@ async def stream_chat_original(request: ChatRequest):
                 
                 try:
                     # 웹 검색이 필요한 경우 스트리밍 대신 일반 응답 사용 (대화 컨텍스트 포함)
-                    context_input = build_context_input(search_content, conversation_messages)
-                    response = await client.responses.create(
-                        model=selected_model,
-                        instructions=system_prompt,
-                        input=context_input,
-                        tools=[
-                            {
-                                "type": "web_search"
-                            }
-                        ]
-                    )
+                    context_input = build_context_input(search_content, conversation_messages, model_config, system_prompt)
+                    with track_openai("responses", selected_model):
+                        response = await client.responses.create(
+                            model=selected_model,
+                            instructions=system_prompt,
+                            input=context_input,
+                            tools=[
+                                {
+                                    "type": "web_search"
+                                }
+                            ]
+                        )
 
                     # Extract message content from output
                     ai_content = ""
@@ -3520,7 +3406,7 @@ async def stream_chat_original(request: ChatRequest):
                             title = source['title'] if source['title'] else f"출처 {i}"
                             sources_text += f"{i}. **[{title}]({source['url']})**\n"
                         ai_content += sources_text
-                        print(f"📚 Found {len(sources)} web search sources in stream")
+                        stream_logger.debug("📚 Found %s web search sources in stream", len(sources))
 
                     full_content = ai_content
 
@@ -3558,12 +3444,12 @@ async def stream_chat_original(request: ChatRequest):
                         sessionId=request.sessionId
                     )
 
-                    messages_db[request.sessionId].append(ai_message.dict())
+                    repository.append_message(request.sessionId, ai_message.dict())
                     update_session_message_count(request.sessionId)
                     return
 
                 except Exception as web_error:
-                    print(f"Responses API error in stream, falling back to chat completions: {web_error}")
+                    stream_logger.warning("Responses API error in stream, falling back to chat completions: %s", web_error)
                     # 웹 검색 실패 시 일반 스트리밍으로 폴백
                     # 스트리밍 파라미터 구성
                     stream_params = {
@@ -3571,7 +3457,8 @@ async def stream_chat_original(request: ChatRequest):
                         "messages": conversation_messages,
                         "max_tokens": model_config["max_tokens"],
                         "temperature": model_config["temperature"],
-                        "stream": True
+                        "stream": True,
+                        "timeout": STREAM_TIMEOUT
                     }
 
                     # 도구가 있으면 추가
@@ -3581,12 +3468,13 @@ async def stream_chat_original(request: ChatRequest):
                         if mention_detected:
                             stream_params["tool_choice"] = {"type": "function",
                                                             "function": {"name": "get_calendar_events"}}
-                            print(f"🎯 강제 Function Calling 활성화: get_calendar_events")
+                            stream_logger.debug("🎯 강제 Function Calling 활성화: get_calendar_events")
                         else:
                             stream_params["tool_choice"] = "auto"
-                        print(f"🛠️ 스트리밍 Function Calling 활성화: {len(available_tools)}개 도구")
+                        stream_logger.debug("🛠️ 스트리밍 Function Calling 활성화: %s개 도구", len(available_tools))
 
-                    stream = await client.chat.completions.create(**stream_params)
+                    with track_openai("chat_completions", stream_params["model"]):
+                        stream = await client.chat.completions.create(**stream_params)
             else:
                 # 임시로 스트리밍 대신 일반 API 사용
                 chat_params = {
@@ -3602,20 +3490,21 @@ async def stream_chat_original(request: ChatRequest):
                     # 멘션이 감지된 경우 Function Calling 강제 활성화
                     if mention_detected:
                         chat_params["tool_choice"] = {"type": "function", "function": {"name": "get_calendar_events"}}
-                        print(f"🎯 강제 Function Calling 활성화: get_calendar_events")
+                        stream_logger.debug("🎯 강제 Function Calling 활성화: get_calendar_events")
                     else:
                         chat_params["tool_choice"] = "auto"
-                    print(f"🛠️ Function Calling 활성화: {len(available_tools)}개 도구")
+                    stream_logger.debug("🛠️ Function Calling 활성화: %s개 도구", len(available_tools))
 
-                print(f"🔍 비스트리밍 파라미터: {chat_params}")
-                response = await client.chat.completions.create(**chat_params)
+                stream_logger.debug("🔍 비스트리밍 파라미터: %s", chat_params)
+                with track_openai("chat_completions", chat_params["model"]):
+                    response = await client.chat.completions.create(**chat_params)
 
                 # 응답을 스트리밍 형태로 변환
                 ai_content = response.choices[0].message.content
 
                 # Function calls가 있는지 확인
                 if response.choices[0].message.tool_calls:
-                    print(f"🔧 Function 호출 감지: {len(response.choices[0].message.tool_calls)}개")
+                    stream_logger.debug("🔧 Function 호출 감지: %s개", len(response.choices[0].message.tool_calls))
 
                     for tool_call in response.choices[0].message.tool_calls:
                         function_name = tool_call.function.name
@@ -3639,7 +3528,8 @@ async def stream_chat_original(request: ChatRequest):
                                 await asyncio.sleep(0.1)
 
                                 # 함수 실행
-                                function_result = FUNCTION_MAP[function_name](**function_args)
+                                with track_tool(function_name):
+                                    function_result = await run_google_function(function_name, function_args)
 
                                 # 결과를 스트리밍으로 출력
                                 if isinstance(function_result, (dict, list)):
@@ -3686,15 +3576,7 @@ async def stream_chat_original(request: ChatRequest):
                     
                     for sentence in sentences:
                         if sentence.strip():
-                            stream_chunk = ChatStreamChunk(
-                                id=ai_message_id,
-                                content=sentence,
-                                role="assistant",
-                                timestamp=datetime.now(),
-                                sessionId=request.sessionId,
-                                isComplete=False
-                            )
-                            yield f"data: {stream_chunk.json()}\n\n"
+                            yield encode_chunk(sentence)
                             
                             # 문장 유형에 따른 적응적 지연
                             if sentence.endswith(('.', '!', '?')):
@@ -3728,7 +3610,7 @@ async def stream_chat_original(request: ChatRequest):
                     sessionId=request.sessionId
                 )
 
-                messages_db[request.sessionId].append(ai_message.dict())
+                repository.append_message(request.sessionId, ai_message.dict())
                 update_session_message_count(request.sessionId)
                 return
 
@@ -3760,16 +3642,7 @@ async def stream_chat_original(request: ChatRequest):
                     content = delta.content
                     full_content += content
 
-                    stream_chunk = ChatStreamChunk(
-                        id=ai_message_id,
-                        content=content,
-                        role="assistant",
-                        timestamp=datetime.now(),
-                        sessionId=request.sessionId,
-                        isComplete=False
-                    )
-
-                    yield f"data: {stream_chunk.json()}\n\n"
+                    yield encode_chunk(content)
                     await asyncio.sleep(0.01)
 
                 # 스트림 완료 체크
@@ -3778,7 +3651,7 @@ async def stream_chat_original(request: ChatRequest):
 
             # Function 호출 실행
             if tool_calls:
-                print(f"🔧 Function 호출 실행: {len(tool_calls)}개")
+                stream_logger.debug("🔧 Function 호출 실행: %s개", len(tool_calls))
 
                 for tool_call in tool_calls:
                     function_name = tool_call["function"]["name"]
@@ -3800,7 +3673,8 @@ async def stream_chat_original(request: ChatRequest):
                             yield f"data: {status_chunk.json()}\n\n"
 
                             # 함수 실행
-                            function_result = FUNCTION_MAP[function_name](**function_args)
+                            with track_tool(function_name):
+                                function_result = await run_google_function(function_name, function_args)
 
                             # 결과를 스트리밍으로 출력
                             if isinstance(function_result, (dict, list)):
@@ -3854,24 +3728,14 @@ async def stream_chat_original(request: ChatRequest):
 
         except Exception as e:
             # OpenAI API 오류 시 폴백 응답
-            print(f"🚨 스트리밍 API 예외 발생: {e}")
-            import traceback
-            traceback.print_exc()
+            stream_logger.exception("🚨 스트리밍 API 예외 발생: %s", e)
             fallback_content = f"죄송합니다. 현재 AI 서비스에 일시적인 문제가 있습니다. '{request.content}'에 대한 답변을 준비하고 있습니다. 잠시 후 다시 시도해주세요."
             full_content = fallback_content
 
             # 폴백 응답을 단어 단위로 스트리밍
             words = fallback_content.split()
             for i, word in enumerate(words):
-                stream_chunk = ChatStreamChunk(
-                    id=ai_message_id,
-                    content=word + " ",
-                    role="assistant",
-                    timestamp=datetime.now(),
-                    sessionId=request.sessionId,
-                    isComplete=i == len(words) - 1
-                )
-                yield f"data: {stream_chunk.json()}\n\n"
+                yield encode_chunk(word + " ", is_complete=i == len(words) - 1)
                 await asyncio.sleep(0.1)
 
         # AI 응답 저장
@@ -3883,11 +3747,15 @@ async def stream_chat_original(request: ChatRequest):
             sessionId=request.sessionId
         )
 
-        messages_db[request.sessionId].append(ai_message.dict())
+        repository.append_message(request.sessionId, ai_message.dict())
         update_session_message_count(request.sessionId)
 
+    # 웹 검색 요청은 Responses API 응답을 나눠 보내고 나머지는 Chat Completions
+    selected_model = request.model if request.model in AVAILABLE_MODELS else "gpt-4o"
+    web_search = getattr(request, 'webSearch', False) and AVAILABLE_MODELS[selected_model].get("supports_web_search", False)
     return StreamingResponse(
-        generate_stream(),
+        coalesce_stream(track_stream(generate_stream(), "responses" if web_search else "chat_completions",
+                                     selected_model), STREAM_COALESCE_MS, STREAM_COALESCE_BYTES),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -3899,80 +3767,72 @@ async def stream_chat_original(request: ChatRequest):
 
 @app.delete("/api/v1/chat/messages/{message_id}")
 async def delete_message(message_id: str):
-    for session_id, messages in messages_db.items():
-        for i, msg in enumerate(messages):
-            if msg["id"] == message_id:
-                del messages[i]
-                update_session_message_count(session_id)
-                return {"message": "Message deleted successfully"}
+    session_id = repository.delete_message(message_id)
+    if session_id is None:
+        raise HTTPException(status_code=404, detail="Message not found")
 
-    raise HTTPException(status_code=404, detail="Message not found")
+    update_session_message_count(session_id)
+    return {"message": "Message deleted successfully"}
 
 
 @app.post("/api/v1/chat/messages/{message_id}/regenerate", response_model=ChatResponse)
 async def regenerate_message(message_id: str):
-    for session_id, messages in messages_db.items():
-        for i, msg in enumerate(messages):
-            if msg["id"] == message_id and msg["role"] == "assistant":
-                # 이전 사용자 메시지 찾기
-                user_message = None
-                if i > 0:
-                    user_message = messages[i - 1]
-
-                if not user_message:
-                    raise HTTPException(status_code=400, detail="Cannot regenerate: no previous user message found")
+    found = repository.find_message(message_id)
+    if found is None or found[2]["role"] != "assistant":
+        raise HTTPException(status_code=404, detail="Message not found")
 
-                try:
-                    # 세션의 기존 메시지 히스토리 가져오기 (재생성할 메시지 제외)
-                    session_messages = messages_db.get(session_id, [])
+    session_id, position, _ = found
+    model = "gpt-4o"
+    model_config = AVAILABLE_MODELS[model]
 
-                    # OpenAI API에 전달할 메시지 구성
-                    conversation_messages = [
-                        {"role": "system",
-                         "content": "당신은 NSales Pro의 영업 AI 도우미입니다. 영업 데이터 분석, 프로젝트 정보 조회, 업무 관련 질문에 도움을 주세요. 한국어로 친근하고 전문적으로 답변해주세요. 이전 대화 내용을 기억하고 문맥을 유지하여 답변하세요."}
-                    ]
+    # 재생성할 메시지 직전까지의 최근 대화만 읽음 (컨텍스트 뷰와 같은 최대 메시지 수)
+    history = repository.get_messages_before(session_id, position, MAX_MESSAGES_PER_SESSION)
 
-                    # 재생성할 메시지 이전까지의 대화 내용 추가
-                    for j, msg in enumerate(session_messages):
-                        if j >= i:  # 재생성할 메시지부터는 제외
-                            break
-                        conversation_messages.append({
-                            "role": msg["role"],
-                            "content": msg["content"]
-                        })
+    # 이전 사용자 메시지 찾기
+    user_message = history[-1] if history else None
 
-                    # 사용자 메시지 추가
-                    conversation_messages.append({"role": "user", "content": user_message["content"]})
+    if not user_message:
+        raise HTTPException(status_code=400, detail="Cannot regenerate: no previous user message found")
 
-                    # OpenAI API 호출
-                    response = await client.chat.completions.create(
-                        model="gpt-4o",
-                        messages=conversation_messages,
-                        max_tokens=1000,
-                        temperature=0.8  # 더 다양한 응답을 위해 temperature 증가
-                    )
+    # 모델 입력 예산 안에서 직전 사용자 메시지(필수)와 최근 대화부터 채움
+    try:
+        conversation_messages = pack_context(
+            context_builder.system_prompt("regenerate"),
+            [{"role": m["role"], "content": m["content"]} for m in history], model_config,
+            turn_tokens=[m.get("tokens") for m in history]
+        )
+    except ContextBudgetExceeded as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-                    new_content = response.choices[0].message.content
+    try:
+        # OpenAI API 호출
+        with track_openai("chat_completions", model):
+            response = await client.chat.completions.create(
+                model=model,
+                messages=conversation_messages,
+                max_tokens=model_config["max_tokens"],
+                temperature=0.8  # 더 다양한 응답을 위해 temperature 증가
+            )
 
-                except Exception as e:
-                    # OpenAI API 오류 시 폴백 응답
-                    new_content = f"죄송합니다. 다시 생성하는 중 문제가 발생했습니다. '{user_message['content']}'에 대한 새로운 답변을 준비하고 있습니다."
+        new_content = response.choices[0].message.content
 
-                # 새로운 응답으로 교체
-                new_message = ChatMessage(
-                    id=generate_id(),
-                    content=new_content,
-                    role="assistant",
-                    timestamp=datetime.now(),
-                    sessionId=session_id
-                )
+    except Exception as e:
+        # OpenAI API 오류 시 폴백 응답
+        new_content = f"죄송합니다. 다시 생성하는 중 문제가 발생했습니다. '{user_message['content']}'에 대한 새로운 답변을 준비하고 있습니다."
 
-                messages[i] = new_message.dict()
-                update_session_message_count(session_id)
+    # 새로운 응답으로 교체
+    new_message = ChatMessage(
+        id=generate_id(),
+        content=new_content,
+        role="assistant",
+        timestamp=datetime.now(),
+        sessionId=session_id
+    )
 
-                return ChatResponse(**new_message.dict())
+    repository.replace_message(message_id, new_message.dict())
+    update_session_message_count(session_id)
 
-    raise HTTPException(status_code=404, detail="Message not found")
+    return ChatResponse(**new_message.dict())
 
 
 # ===========================
@@ -3990,7 +3850,7 @@ async def list_available_vector_stores():
             "total_count": len(stores)
         }
     except Exception as e:
-        logger.error(f"❌ Failed to list vector stores: {str(e)}")
+        logger.error("❌ Failed to list vector stores: %s", e)
         raise HTTPException(status_code=500, detail=f"벡터 스토어 목록 조회 실패: {str(e)}")
 
 
@@ -3999,7 +3859,7 @@ async def create_session_vector_store(session_id: str, name: str = None):
     """세션별 벡터 스토어 생성"""
     try:
         # 세션 존재 확인
-        if session_id not in sessions_db:
+        if not repository.has_session(session_id):
             raise HTTPException(status_code=404, detail="Session not found")
 
         vector_store_id = await create_or_get_vector_store(session_id, name)
@@ -4010,7 +3870,7 @@ async def create_session_vector_store(session_id: str, name: str = None):
             "message": "벡터 스토어가 성공적으로 생성되었습니다."
         }
     except Exception as e:
-        logger.error(f"❌ Failed to create vector store for session {session_id}: {str(e)}")
+        logger.error("❌ Failed to create vector store for session %s: %s", session_id, e)
         raise HTTPException(status_code=500, detail=f"벡터 스토어 생성 실패: {str(e)}")
 
 
@@ -4019,14 +3879,14 @@ async def search_session_vector_store(session_id: str, query: str, limit: int =
     """세션별 벡터 스토어에서 검색"""
     try:
         # 세션 존재 확인
-        if session_id not in sessions_db:
+        if not repository.has_session(session_id):
             raise HTTPException(status_code=404, detail="Session not found")
 
         # 벡터 스토어 확인
-        if session_id not in vector_stores_db:
+        vector_store_id = repository.get_value(VECTOR_STORES, session_id)
+        if not vector_store_id:
             raise HTTPException(status_code=404, detail="Vector store not found for this session")
 
-        vector_store_id = vector_stores_db[session_id]
         search_results = await search_vector_store(vector_store_id, query, limit)
 
         return {
@@ -4038,7 +3898,7 @@ async def search_session_vector_store(session_id: str, query: str, limit: int =
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Failed to search vector store for session {session_id}: {str(e)}")
+        logger.error("❌ Failed to search vector store for session %s: %s", session_id, e)
         raise HTTPException(status_code=500, detail=f"벡터 스토어 검색 실패: {str(e)}")
 
 
@@ -4058,7 +3918,7 @@ async def create_knowledge_base(documents: List[str], session_id: str = None):
             "message": "지식 베이스가 성공적으로 생성되었습니다."
         }
     except Exception as e:
-        logger.error(f"❌ Failed to create knowledge base: {str(e)}")
+        logger.error("❌ Failed to create knowledge base: %s", e)
         raise HTTPException(status_code=500, detail=f"지식 베이스 생성 실패: {str(e)}")
 
 
@@ -4075,10 +3935,12 @@ async def stream_with_direct_function_calling(
     async def generate_direct_function_stream():
         ai_message_id = generate_id()
         full_content = ""
+        encode_chunk = StreamChunkEncoder.for_model(ChatStreamChunk, ai_message_id, session_id)
 
         try:
-            print(f"🎯 Direct Function Calling - Model: {model}")
-            print(f"🔧 Available tools: {[tool['function']['name'] for tool in available_tools]}")
+            stream_logger.debug("🎯 Direct Function Calling - Model: %s", model)
+            if stream_logger.isEnabledFor(logging.DEBUG):
+                stream_logger.debug("🔧 Available tools: %s", [tool['function']['name'] for tool in available_tools])
 
             # 자동 Function Calling (OpenAI가 적절한 함수 선택)
             chat_params = {
@@ -4088,12 +3950,14 @@ async def stream_with_direct_function_calling(
                 "temperature": model_config["temperature"],
                 "tools": available_tools,
                 "tool_choice": "auto",  # Let OpenAI choose the appropriate function
-                "stream": True
+                "stream": True,
+                "timeout": STREAM_TIMEOUT
             }
 
-            print(f"🚀 Creating stream with auto Function Calling...")
-            print(f"📝 Last user message: {user_message.content}")
-            stream = await client.chat.completions.create(**chat_params)
+            stream_logger.debug("🚀 Creating stream with auto Function Calling...")
+            stream_logger.debug("📝 Last user message: %s", user_message.content)
+            with track_openai("chat_completions", chat_params["model"]):
+                stream = await client.chat.completions.create(**chat_params)
 
             tool_calls = []
             current_tool_call = None
@@ -4102,26 +3966,18 @@ async def stream_with_direct_function_calling(
                 delta = chunk.choices[0].delta
                 finish_reason = chunk.choices[0].finish_reason
 
-                print(
-                    f"🔄 Stream chunk - finish_reason: {finish_reason}, delta: content={bool(delta.content)}, tool_calls={bool(delta.tool_calls)}")
+                chunk_logger.log("🔄 Stream chunk finish_reason=%s content=%s tool_calls=%s",
+                                 finish_reason, bool(delta.content), bool(delta.tool_calls))
 
                 # 일반 텍스트 콘텐츠 처리
                 if delta.content:
-                    print(f"📝 Content chunk: {delta.content[:50]}...")
-                    content_chunk = ChatStreamChunk(
-                        id=ai_message_id,
-                        content=delta.content,
-                        role="assistant",
-                        timestamp=datetime.now(),
-                        sessionId=session_id,
-                        isComplete=False
-                    )
-                    yield f"data: {content_chunk.json()}\n\n"
+                    chunk_logger.log("📝 Content chunk: %.50s", delta.content)
+                    yield encode_chunk(delta.content)
                     full_content += delta.content
 
                 # Function Calling 처리
                 if delta.tool_calls:
-                    print(f"🔧 Tool call delta detected: {delta.tool_calls}")
+                    chunk_logger.log("🔧 Tool call delta: %s", delta.tool_calls)
                     for tool_call_delta in delta.tool_calls:
                         if tool_call_delta.index == 0:
                             if current_tool_call is None:
@@ -4132,31 +3988,30 @@ async def stream_with_direct_function_calling(
                                         "arguments": tool_call_delta.function.arguments or ""
                                     }
                                 }
-                                print(f"🆕 New tool call: {current_tool_call['function']['name']}")
+                                stream_logger.debug("🆕 New tool call: %s", current_tool_call['function']['name'])
                             else:
                                 # 함수 arguments 누적
                                 current_tool_call["function"]["arguments"] += tool_call_delta.function.arguments or ""
-                                print(
-                                    f"📝 Accumulating arguments: {current_tool_call['function']['arguments'][:100]}...")
+                                chunk_logger.log("📝 Accumulating arguments: %.100s", current_tool_call["function"]["arguments"])
 
                 # 스트림 완료 체크
                 if finish_reason == "tool_calls" and current_tool_call:
-                    print(f"✅ Tool calls completed: {current_tool_call}")
+                    stream_logger.debug("✅ Tool calls completed: %s", current_tool_call)
                     tool_calls.append(current_tool_call)
                     break
                 elif finish_reason == "stop":
-                    print("⏹️ Stream finished with stop")
+                    stream_logger.debug("⏹️ Stream finished with stop")
                     break
 
             # Function 호출 실행
             if tool_calls:
-                print(f"🔧 Executing {len(tool_calls)} function calls")
+                stream_logger.debug("🔧 Executing %s function calls", len(tool_calls))
 
                 for tool_call in tool_calls:
                     function_name = tool_call["function"]["name"]
                     function_args = json.loads(tool_call["function"]["arguments"])
 
-                    print(f"📞 Calling function: {function_name}({function_args})")
+                    stream_logger.debug("📞 Calling function: %s(%s)", function_name, function_args)
 
                     if function_name in FUNCTION_MAP:
                         try:
@@ -4174,7 +4029,8 @@ async def stream_with_direct_function_calling(
                             yield f"data: {status_chunk.json()}\n\n"
 
                             # 함수 실행
-                            function_result = FUNCTION_MAP[function_name](**function_args)
+                            with track_tool(function_name):
+                                function_result = await run_google_function(function_name, function_args)
 
                             # 구조화된 결과 생성
                             structured_result = {
@@ -4242,12 +4098,12 @@ async def stream_with_direct_function_calling(
                 timestamp=datetime.now(),
                 sessionId=session_id
             )
-            messages_db[session_id].append(ai_message.dict())
+            repository.append_message(session_id, ai_message.dict())
             update_session_message_count(session_id)
 
         except Exception as e:
             error_msg = f"## ❌ Direct Function Calling 오류\n\n{str(e)}"
-            print(error_msg)
+            stream_logger.exception("❌ Direct Function Calling 오류: %s", e)
 
             error_chunk = ChatStreamChunk(
                 id=ai_message_id,
@@ -4260,7 +4116,8 @@ async def stream_with_direct_function_calling(
             yield f"data: {error_chunk.json()}\n\n"
 
     return StreamingResponse(
-        generate_direct_function_stream(),
+        coalesce_stream(track_stream(generate_direct_function_stream(), "chat_completions", model),
+                        STREAM_COALESCE_MS, STREAM_COALESCE_BYTES),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -4332,33 +4189,28 @@ async def enhanced_chat_stream(request: EnhancedChatRequest):
 
     session_id = request.sessionId or str(uuid.uuid4())
 
-    # 현재 한국 시간 정보 생성
-    korea_tz = timezone(timedelta(hours=9))
-    current_time_kst = datetime.now(korea_tz)
-
-    # Google 서비스 사용 안내를 포함한 시스템 프롬프트 구성
-    system_prompt = f"""당신은 NSales Pro의 영업 AI 도우미입니다. 영업 데이터 분석, 프로젝트 정보 조회, 업무 관련 질문에 도움을 주세요. 한국어로 친근하고 전문적으로 답변해주세요. 이전 대화 내용을 기억하고 문맥을 유지하여 답변하세요. 최신 정보가 필요하거나 실시간 데이터, 뉴스, 시장 동향 등을 질문받으면 웹 검색을 적극 활용하여 정확하고 최신의 정보를 제공하세요.
-
-**현재 시간 정보:**
-- 현재 날짜: {current_time_kst.strftime('%Y년 %m월 %d일 (%A)')}
-- 현재 시간: {current_time_kst.strftime('%H시 %M분')}
-- 시간대: 한국 표준시 (KST, UTC+9)
-
-"오늘", "이번 주", "이번 달" 등의 시간 표현을 사용할 때는 위의 한국 시간 기준으로 해석해주세요."""
+    # 현재 KST 시간을 포함한 시스템 프롬프트 (분 단위 캐시)
+    system_prompt = context_builder.system_prompt("enhanced")
 
     # 세션 초기화
-    if session_id not in messages_db:
-        messages_db[session_id] = []
-        sessions_db[session_id] = {
+    if not repository.has_session(session_id):
+        now = datetime.now()
+        repository.create_session({
             "id": session_id,
-            "createdAt": datetime.now(),
+            "title": f"채팅 {session_id[:8]}",
+            "createdAt": now,
+            "updatedAt": now,
             "messageCount": 0,
-            "model": request.model
-        }
+            "titleGenerated": False,
+            "titleGeneratedAt": None,
+            "model": request.model,
+            "schemaVersion": SESSION_SCHEMA_VERSION
+        })
 
     async def generate_enhanced_stream():
         ai_message_id = str(uuid.uuid4())
         full_content = ""
+        encode_chunk = StreamChunkEncoder.for_model(EnhancedChatStreamChunk, ai_message_id, session_id)
 
         try:
             # 사용자 메시지 저장
@@ -4369,15 +4221,7 @@ async def enhanced_chat_stream(request: EnhancedChatRequest):
                 timestamp=datetime.now(),
                 sessionId=session_id
             )
-            messages_db[session_id].append(user_message.dict())
-
-            # 대화 히스토리 구성
-            conversation_messages = [{"role": "system", "content": system_prompt}]
-            for msg in messages_db[session_id]:
-                conversation_messages.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
+            repository.append_message(session_id, user_message.dict())
 
             # 사용할 도구들 선택
             available_tools = []
@@ -4391,17 +4235,25 @@ async def enhanced_chat_stream(request: EnhancedChatRequest):
                     # 모든 도구 사용
                     available_tools = tool_manager.registry.get_openai_schemas()
 
-            print(f"🛠️ Using {len(available_tools)} tools for enhanced chat")
+            stream_logger.debug("🛠️ Using %s tools for enhanced chat", len(available_tools))
 
-            # OpenAI Chat Completions API 호출
-            response = await client.chat.completions.create(
-                model=request.model,
-                messages=conversation_messages,
-                tools=available_tools if available_tools else None,
-                stream=True,
-                temperature=0.7
+            # 대화 히스토리 구성 (도구 스키마를 뺀 모델 토큰 예산 내 요약 + 최근 대화)
+            model_config = AVAILABLE_MODELS.get(request.model, AVAILABLE_MODELS["gpt-4o"])
+            conversation_messages = context_builder.build(
+                session_id, system_prompt, model_config, reserved_tokens=tools_tokens(available_tools)
             )
 
+            # OpenAI Chat Completions API 호출
+            with track_openai("chat_completions", request.model):
+                response = await client.chat.completions.create(
+                    model=request.model,
+                    messages=conversation_messages,
+                    tools=available_tools if available_tools else None,
+                    stream=True,
+                    timeout=STREAM_TIMEOUT,
+                    temperature=0.7
+                )
+
             # 스트리밍 응답 처리
             tool_calls = []
             current_tool_call = None
@@ -4412,15 +4264,7 @@ async def enhanced_chat_stream(request: EnhancedChatRequest):
                     full_content += content_piece
 
                     # 내용 스트리밍
-                    stream_chunk = EnhancedChatStreamChunk(
-                        id=ai_message_id,
-                        content=content_piece,
-                        role="assistant",
-                        timestamp=datetime.now(),
-                        sessionId=session_id,
-                        isComplete=False
-                    )
-                    yield f"data: {stream_chunk.json()}\n\n"
+                    yield encode_chunk(content_piece)
 
                 # Tool calls 감지
                 if chunk.choices[0].delta.tool_calls:
@@ -4445,7 +4289,7 @@ async def enhanced_chat_stream(request: EnhancedChatRequest):
 
             # Tool calls 실행
             if tool_calls:
-                print(f"🔧 Executing {len(tool_calls)} tool calls")
+                stream_logger.debug("🔧 Executing %s tool calls", len(tool_calls))
 
                 for tool_call in tool_calls:
                     function_name = tool_call["function"]["name"]
@@ -4557,12 +4401,14 @@ async def enhanced_chat_stream(request: EnhancedChatRequest):
                         })
 
                     # 최종 응답 생성
-                    final_response = await client.chat.completions.create(
-                        model=request.model,
-                        messages=messages_with_tools,
-                        stream=True,
-                        temperature=0.7
-                    )
+                    with track_openai("chat_completions", request.model):
+                        final_response = await client.chat.completions.create(
+                            model=request.model,
+                            messages=messages_with_tools,
+                            stream=True,
+                            timeout=STREAM_TIMEOUT,
+                            temperature=0.7
+                        )
 
                     summary_content = "\n\n💬 **AI 요약:**\n"
                     full_content += summary_content
@@ -4582,15 +4428,7 @@ async def enhanced_chat_stream(request: EnhancedChatRequest):
                             content_piece = chunk.choices[0].delta.content
                             full_content += content_piece
 
-                            stream_chunk = EnhancedChatStreamChunk(
-                                id=ai_message_id,
-                                content=content_piece,
-                                role="assistant",
-                                timestamp=datetime.now(),
-                                sessionId=session_id,
-                                isComplete=False
-                            )
-                            yield f"data: {stream_chunk.json()}\n\n"
+                            yield encode_chunk(content_piece)
 
             # 완료 신호
             final_chunk = EnhancedChatStreamChunk(
@@ -4611,12 +4449,12 @@ async def enhanced_chat_stream(request: EnhancedChatRequest):
                 timestamp=datetime.now(),
                 sessionId=session_id
             )
-            messages_db[session_id].append(ai_message.dict())
+            repository.append_message(session_id, ai_message.dict())
             update_session_message_count(session_id)
 
         except Exception as e:
             error_msg = f"## ❌ Enhanced Chat 오류\n\n{str(e)}"
-            print(error_msg)
+            stream_logger.exception("❌ Enhanced Chat 오류: %s", e)
 
             error_chunk = EnhancedChatStreamChunk(
                 id=ai_message_id,
@@ -4630,7 +4468,8 @@ async def enhanced_chat_stream(request: EnhancedChatRequest):
             yield f"data: {error_chunk.json()}\n\n"
 
     return StreamingResponse(
-        generate_enhanced_stream(),
+        coalesce_stream(track_stream(generate_enhanced_stream(), "chat_completions", request.model),
+                        STREAM_COALESCE_MS, STREAM_COALESCE_BYTES),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
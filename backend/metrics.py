@@ -0,0 +1,418 @@
+"""
+Prometheus 메트릭 모듈
+prometheus_client 의존성 없이 카운터/히스토그램과 텍스트 노출 형식(0.0.4)을 직접 구현
+
+- 관측은 이벤트 루프 스레드에서만 일어나므로 락 없이 dict 갱신 (관측 1회 = bisect + 정수 덧셈)
+- 누적 버킷 계산과 문자열 렌더링은 /metrics 스크랩 시점에만 수행
+- endpoint 라벨은 MetricsMiddleware가 요청 컨텍스트(ContextVar)에 넣은 ASGI scope에서 조회
+"""
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sse_encoder import DeltaFrame
+from tokenizer import count_tokens
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+# 초 단위 버킷 (OpenAI 응답은 수십 초까지 걸릴 수 있음)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0, 120.0)
+FAST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TOKENS_PER_SECOND_BUCKETS = (1, 5, 10, 20, 30, 40, 60, 80, 100, 150, 250)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class MetricsRegistry:
+    """등록된 메트릭을 Prometheus 텍스트 형식으로 렌더링"""
+
+    def __init__(self):
+        self._metrics: Dict[str, "_Metric"] = {}
+
+    def register(self, metric: "_Metric") -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional[MetricsRegistry] = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        if registry is not None:
+            registry.register(self)
+
+    def _check(self, labelvalues: Tuple[str, ...]) -> None:
+        """새 라벨 조합이 처음 관측될 때만 개수 검증 (이후에는 dict 조회만)"""
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labelvalues}")
+
+    def _labels(self, labelvalues: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(self.labelnames, labelvalues)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """단조 증가 카운터 (라벨 값은 labelnames 순서의 위치 인자)"""
+
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        value = self._values.get(labelvalues)
+        if value is None:
+            self._check(labelvalues)
+            value = 0.0
+        self._values[labelvalues] = value + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0.0)
+
+    def render(self) -> Iterator[str]:
+        for labelvalues, value in list(self._values.items()):
+            yield f"{self.name}_total{self._labels(labelvalues)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """현재 값 게이지 (set으로 지정하거나 스크랩 시 호출할 함수를 등록)"""
+
+    type = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function: Optional[Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]] = None
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        if labelvalues not in self._values:
+            self._check(labelvalues)
+        self._values[labelvalues] = value
+
+    def set_function(self, function: Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]) -> None:
+        """스크랩 시점에 (라벨 값 튜플, 값) 목록을 돌려주는 함수 등록"""
+        self._function = function
+
+    def render(self) -> Iterator[str]:
+        values = dict(self._values)
+        if self._function is not None:
+            values.update(self._function())
+        for labelvalues, value in values.items():
+            yield f"{self.name}{self._labels(labelvalues)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """고정 버킷 히스토그램
+
+    라벨 조합마다 [버킷별 개수..., +Inf 개수, 합계] 리스트 하나를 보관하고 렌더링 시 누적
+    """
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS, registry: Optional[MetricsRegistry] = REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        series = self._series.get(labelvalues)
+        if series is None:
+            self._check(labelvalues)
+            series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1  # le 경계 포함
+        series[-1] += value
+
+    @contextmanager
+    def time(self, *labelvalues: str):
+        """블록 실행 시간 관측 (예외가 나도 기록)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def count(self, *labelvalues: str) -> int:
+        series = self._series.get(labelvalues)
+        return int(sum(series[:-1])) if series else 0
+
+    def render(self) -> Iterator[str]:
+        for labelvalues, series in list(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), series):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{self._labels(labelvalues, le)} {cumulative}"
+            labels = self._labels(labelvalues)
+            yield f"{self.name}_sum{labels} {_format_value(series[-1])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+# ---- 애플리케이션 메트릭 ----
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "nsales_http_request_duration_seconds",
+    "HTTP request duration until the response (including streamed bodies) completes",
+    ("endpoint", "method", "status"), buckets=LATENCY_BUCKETS,
+)
+OPENAI_REQUEST_SECONDS = Histogram(
+    "nsales_openai_request_duration_seconds",
+    "OpenAI API call latency (streaming calls until response headers, realtime until the session is connected)",
+    ("api_path", "model", "endpoint"), buckets=LATENCY_BUCKETS,
+)
+OPENAI_REQUESTS = Counter(
+    "nsales_openai_requests",
+    "OpenAI API calls by outcome (ok or exception class)",
+    ("api_path", "model", "endpoint", "status"),
+)
+STREAM_TTFT_SECONDS = Histogram(
+    "nsales_stream_time_to_first_token_seconds",
+    "Time from request start to the first streamed content delta",
+    ("api_path", "model", "endpoint"), buckets=LATENCY_BUCKETS,
+)
+STREAM_TOKENS_PER_SECOND = Histogram(
+    "nsales_stream_tokens_per_second",
+    "Output tokens per second after the first streamed delta",
+    ("api_path", "model", "endpoint"), buckets=TOKENS_PER_SECOND_BUCKETS,
+)
+GOOGLE_API_SECONDS = Histogram(
+    "nsales_google_api_duration_seconds",
+    "Google Calendar/Gmail API call latency",
+    ("method", "status"), buckets=FAST_BUCKETS,
+)
+TOOL_EXECUTION_SECONDS = Histogram(
+    "nsales_tool_execution_duration_seconds",
+    "AI tool / function call execution time",
+    ("tool", "status"), buckets=FAST_BUCKETS,
+)
+OPENAI_POOL_MAX_CONNECTIONS = Gauge(
+    "nsales_openai_pool_max_connections",
+    "Configured OpenAI HTTP connection pool limit",
+)
+OPENAI_POOL_CONNECTIONS = Gauge(
+    "nsales_openai_pool_connections",
+    "Open OpenAI HTTP connections by state",
+    ("state",),
+)
+OPENAI_POOL_REQUESTS = Gauge(
+    "nsales_openai_pool_requests",
+    "OpenAI HTTP requests in flight (including open stream bodies) or waiting for a connection",
+    ("state",),
+)
+OPENAI_RATE_WAIT_SECONDS = Histogram(
+    "nsales_openai_rate_limit_wait_seconds",
+    "Time OpenAI requests waited in the client-side RPM/TPM queue",
+    ("model", "priority"), buckets=FAST_BUCKETS + (30.0, 60.0, 120.0),
+)
+OPENAI_RATE_SHED = Counter(
+    "nsales_openai_rate_limit_shed",
+    "OpenAI requests rejected before sending because the rate limit queue could not admit them in time",
+    ("model", "priority"),
+)
+OPENAI_RATE_AVAILABLE = Gauge(
+    "nsales_openai_rate_limit_available",
+    "Remaining client-side rate limit budget (requests / tokens bucket level)",
+    ("model", "limit"),
+)
+OPENAI_RETRIES = Counter(
+    "nsales_openai_retries",
+    "OpenAI call retries scheduled by the app-level retry loop",
+    ("api_path", "reason"),
+)
+OPENAI_CIRCUIT_STATE = Gauge(
+    "nsales_openai_circuit_state",
+    "Per API path circuit breaker state (0=closed, 1=half-open, 2=open)",
+    ("api_path",),
+)
+OPENAI_ROUTE_LATENCY = Gauge(
+    "nsales_openai_route_latency_seconds",
+    "EWMA latency of successful calls per model, feature set and API path used by the path router",
+    ("model", "features", "api_path"),
+)
+OPENAI_ROUTE_ERROR_RATE = Gauge(
+    "nsales_openai_route_error_rate",
+    "EWMA error rate per model, feature set and API path used by the path router",
+    ("model", "features", "api_path"),
+)
+RESPONSE_CACHE_LOOKUPS = Counter(
+    "nsales_response_cache_lookups",
+    "Response cache lookups by endpoint and result (hit/miss)",
+    ("endpoint", "result"),
+)
+RESPONSE_CACHE_ENTRIES = Gauge(
+    "nsales_response_cache_size",
+    "Response cache size (entries / bytes)",
+    ("unit",),
+)
+SINGLEFLIGHT_SHARED = Counter(
+    "nsales_singleflight_shared",
+    "Calls that awaited an identical in-flight operation instead of starting their own",
+    ("operation",),
+)
+
+
+# ---- 요청 컨텍스트 ----
+
+class _RequestContext:
+    __slots__ = ("scope", "start")
+
+    def __init__(self, scope: dict, start: float):
+        self.scope = scope
+        self.start = start
+
+
+_request_context: ContextVar[Optional[_RequestContext]] = ContextVar("metrics_request_context", default=None)
+
+
+def current_endpoint() -> str:
+    """현재 요청을 처리하는 라우트 함수 이름 (요청 밖의 백그라운드 작업은 "background")"""
+    context = _request_context.get()
+    if context is None:
+        return "background"
+    endpoint = context.scope.get("endpoint")
+    return getattr(endpoint, "__name__", "unmatched")
+
+
+def request_start() -> Optional[float]:
+    context = _request_context.get()
+    return context.start if context is not None else None
+
+
+class MetricsMiddleware:
+    """요청 컨텍스트 설정 + HTTP 요청 시간 관측 (순수 ASGI 미들웨어라 스트리밍 응답을 버퍼링하지 않음)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        token = _request_context.set(_RequestContext(scope, start))
+        status = "500"
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, current_endpoint(), scope["method"], status)
+            _request_context.reset(token)
+
+
+# ---- 호출 지점 계측 헬퍼 ----
+
+def observe_openai(api_path: str, model: str, seconds: float, status: str = "ok",
+                   endpoint: Optional[str] = None) -> None:
+    OPENAI_REQUEST_SECONDS.observe(seconds, api_path, model, endpoint or current_endpoint())
+    OPENAI_REQUESTS.inc(api_path, model, endpoint or current_endpoint(), status)
+
+
+@contextmanager
+def track_openai(api_path: str, model: str):
+    """OpenAI 호출 지연과 결과(ok / 예외 클래스명) 기록
+
+    api_path: responses | assistant | chat_completions | realtime
+    """
+    endpoint = current_endpoint()
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException as e:
+        status = type(e).__name__
+        raise
+    finally:
+        observe_openai(api_path, model, time.perf_counter() - start, status, endpoint)
+
+
+@contextmanager
+def _track_outcome(histogram: Histogram, *labelvalues: str):
+    """블록 실행 시간을 결과 라벨(ok / 예외 클래스명)과 함께 기록"""
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException as e:
+        status = type(e).__name__
+        raise
+    finally:
+        histogram.observe(time.perf_counter() - start, *labelvalues, status)
+
+
+def track_tool(tool: str):
+    """도구/함수 호출 실행 시간 기록 (도구가 예외 대신 실패 결과를 반환하면 ok로 집계)"""
+    return _track_outcome(TOOL_EXECUTION_SECONDS, tool)
+
+
+def track_google(method: str):
+    """Google API 요청(.execute()) 지연 기록 (예: "calendar.events.list")"""
+    return _track_outcome(GOOGLE_API_SECONDS, method)
+
+
+async def track_stream(frames: AsyncIterator[str], api_path: str, model: str) -> AsyncIterator[str]:
+    """SSE 프레임 스트림의 time-to-first-token과 초당 토큰 수 기록
+
+    TTFT는 요청 시작(미들웨어 기준, 없으면 스트림 시작)부터 첫 비어 있지 않은 델타까지,
+    초당 토큰 수는 첫 델타 이후 델타들의 토큰 수 / 첫 델타~마지막 델타 시간
+    """
+    endpoint = current_endpoint()
+    start = request_start() or time.perf_counter()
+    first: Optional[float] = None
+    last = 0.0
+    deltas: List[str] = []
+    try:
+        async for frame in frames:
+            if isinstance(frame, DeltaFrame) and frame.delta:
+                now = time.perf_counter()
+                if first is None:
+                    first = now
+                    STREAM_TTFT_SECONDS.observe(now - start, api_path, model, endpoint)
+                else:
+                    deltas.append(frame.delta)
+                last = now
+            yield frame
+    finally:
+        if deltas and last > first:
+            STREAM_TOKENS_PER_SECOND.observe(count_tokens("".join(deltas)) / (last - first), api_path, model, endpoint)
+        aclose = getattr(frames, "aclose", None)
+        if aclose is not None:
+            await aclose()
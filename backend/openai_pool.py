@@ -0,0 +1,188 @@
+"""
+OpenAI HTTP 커넥션 풀 모듈
+모든 OpenAI 호출(채팅, 제목 생성, 요약, 벡터 스토어, Assistant)이 공유하는 httpx 클라이언트 설정
+
+- 커넥션 한도/keepalive: 버스트 시 연결을 매번 새로 맺지 않도록 유휴 연결을 유지
+- HTTP/2: h2 패키지가 있으면 하나의 연결에서 요청을 다중화 (OPENAI_HTTP2=auto|true|false)
+- 타임아웃 분리: connect / read(비스트리밍 응답 대기) / stream idle(스트리밍 청크 간 대기)
+- 풀 사용량(열린 연결, 유휴/사용 중, 진행 중/대기 중 요청)은 /metrics 게이지로 노출
+"""
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from app_logging import get_logger
+from metrics import OPENAI_POOL_CONNECTIONS, OPENAI_POOL_MAX_CONNECTIONS, OPENAI_POOL_REQUESTS
+from rate_governor import RateGovernor, RateLimitShed
+
+try:
+    import h2  # noqa: F401  HTTP/2 지원 (선택)
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+logger = get_logger("openai")
+
+
+@dataclass
+class OpenAIPoolSettings:
+    """풀/타임아웃 설정 (초 단위)"""
+    max_connections: int = 100
+    max_keepalive_connections: int = 50
+    keepalive_expiry: float = 60.0
+    http2: str = "auto"
+    connect_timeout: float = 5.0
+    read_timeout: float = 120.0
+    write_timeout: float = 30.0
+    pool_timeout: float = 10.0
+    stream_idle_timeout: float = 60.0
+
+    @classmethod
+    def from_env(cls) -> "OpenAIPoolSettings":
+        defaults = cls()
+        return cls(
+            max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", defaults.max_connections)),
+            max_keepalive_connections=int(os.getenv("OPENAI_MAX_KEEPALIVE", defaults.max_keepalive_connections)),
+            keepalive_expiry=float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", defaults.keepalive_expiry)),
+            http2=os.getenv("OPENAI_HTTP2", defaults.http2).lower(),
+            connect_timeout=float(os.getenv("OPENAI_CONNECT_TIMEOUT", defaults.connect_timeout)),
+            read_timeout=float(os.getenv("OPENAI_READ_TIMEOUT", defaults.read_timeout)),
+            write_timeout=float(os.getenv("OPENAI_WRITE_TIMEOUT", defaults.write_timeout)),
+            pool_timeout=float(os.getenv("OPENAI_POOL_TIMEOUT", defaults.pool_timeout)),
+            stream_idle_timeout=float(os.getenv("OPENAI_STREAM_IDLE_TIMEOUT", defaults.stream_idle_timeout)),
+        )
+
+    def use_http2(self) -> bool:
+        if self.http2 in ("0", "false", "off", "no"):
+            return False
+        if not H2_AVAILABLE:
+            if self.http2 != "auto":
+                logger.warning("⚠️ OPENAI_HTTP2=%s 이지만 h2 패키지가 없어 HTTP/1.1 사용 (pip install h2)", self.http2)
+            return False
+        return True
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    """응답 본문을 다 읽거나 닫을 때 진행 중 요청 수를 한 번만 감소"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, transport: "PooledTransport"):
+        self._stream = stream
+        self._transport = transport
+        self._closed = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._transport.in_flight -= 1
+        await self._stream.aclose()
+
+
+class PooledTransport(httpx.AsyncHTTPTransport):
+    """진행 중 요청 수를 세는 httpx 전송 계층 (스트리밍 응답은 본문이 닫힐 때까지 진행 중)
+
+    governor가 있으면 모든 OpenAI 호출이 지나는 이 지점에서 RPM/TPM 허가를 받은 뒤 전송
+    """
+
+    def __init__(self, *args, governor: Optional[RateGovernor] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.governor = governor
+        self.in_flight = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        model_governor = None
+        if self.governor is not None and self.governor.governs(request.method, request.url.path):
+            try:
+                model_governor = await self.governor.admit(request.content)
+            except RateLimitShed as e:
+                # SDK가 RateLimitError로 변환하고 재시도하지 않도록 x-should-retry: false
+                return httpx.Response(429, headers={"x-should-retry": "false"},
+                                      json=RateGovernor.shed_response_body(e), request=request)
+
+        self.in_flight += 1
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException:
+            self.in_flight -= 1
+            raise
+        if model_governor is not None:
+            RateGovernor.observe_response(model_governor, response.status_code, response.headers)
+        response.stream = _TrackedStream(response.stream, self)
+        return response
+
+    def stats(self) -> Dict[str, int]:
+        connections = self._pool.connections
+        idle = sum(1 for connection in connections if connection.is_idle())
+        # 연결을 배정받지 못한 요청 (httpcore 내부 큐, 버전에 따라 없을 수 있음)
+        waiting = sum(1 for pending in getattr(self._pool, "_requests", ())
+                      if getattr(pending, "connection", None) is None)
+        return {
+            "open_connections": len(connections),
+            "idle_connections": idle,
+            "active_connections": len(connections) - idle,
+            "in_flight_requests": self.in_flight,
+            "waiting_requests": waiting,
+        }
+
+
+class OpenAIConnectionPool:
+    """공유 httpx 클라이언트와 풀 통계
+
+    main에서 하나만 만들어 AsyncOpenAI에 전달하고, 스트리밍 호출은 stream_timeout을 요청별로 지정
+    """
+
+    def __init__(self, settings: OpenAIPoolSettings, governor: Optional[RateGovernor] = None):
+        self.settings = settings
+        self.http2 = settings.use_http2()
+        self.limits = httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_keepalive_connections,
+            keepalive_expiry=settings.keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(
+            connect=settings.connect_timeout,
+            read=settings.read_timeout,
+            write=settings.write_timeout,
+            pool=settings.pool_timeout,
+        )
+        # httpx read 타임아웃은 청크 사이 대기 시간 기준이므로 스트리밍에서는 idle 타임아웃으로 동작
+        self.stream_timeout = httpx.Timeout(
+            connect=settings.connect_timeout,
+            read=settings.stream_idle_timeout,
+            write=settings.write_timeout,
+            pool=settings.pool_timeout,
+        )
+        self.transport = PooledTransport(limits=self.limits, http2=self.http2, governor=governor)
+        self.http_client = DefaultAsyncHttpxClient(transport=self.transport, timeout=self.timeout)
+
+        OPENAI_POOL_MAX_CONNECTIONS.set(settings.max_connections)
+        OPENAI_POOL_CONNECTIONS.set_function(self._connection_samples)
+        OPENAI_POOL_REQUESTS.set_function(self._request_samples)
+        logger.info("🔌 OpenAI connection pool", extra={
+            "max_connections": settings.max_connections, "max_keepalive": settings.max_keepalive_connections,
+            "http2": self.http2, "read_timeout": settings.read_timeout,
+            "stream_idle_timeout": settings.stream_idle_timeout
+        })
+
+    def create_client(self, api_key: str) -> AsyncOpenAI:
+        return AsyncOpenAI(api_key=api_key, http_client=self.http_client, timeout=self.timeout)
+
+    def stats(self) -> Dict[str, int]:
+        return {"max_connections": self.settings.max_connections, **self.transport.stats()}
+
+    def _connection_samples(self):
+        stats = self.transport.stats()
+        return [(("idle",), stats["idle_connections"]), (("active",), stats["active_connections"])]
+
+    def _request_samples(self):
+        stats = self.transport.stats()
+        return [(("in_flight",), stats["in_flight_requests"]), (("waiting",), stats["waiting_requests"])]
+
+    async def aclose(self) -> None:
+        await self.http_client.aclose()
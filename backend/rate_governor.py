@@ -0,0 +1,288 @@
+"""
+OpenAI 요청 속도 제어 모듈 (클라이언트 측 RPM/TPM 토큰 버킷)
+429를 맞고 재시도하는 대신 API에 보내기 전에 모델별 분당 요청/토큰 한도 안으로 대기열에서 조절
+
+- 모델마다 요청 버킷(RPM)과 토큰 버킷(TPM)을 두고 둘 다 여유가 있을 때만 전송
+- 토큰 추정은 OpenAI 한도 계산과 같은 방식: 요청 본문 문자 수 / 4 + 출력 토큰 한도(max_tokens)
+- 대기열은 우선순위(대화형 > 백그라운드) 후 도착 순서, 백그라운드는 버킷 일부(reserve)를 남겨 둠
+- 예상 대기 시간이 한도를 넘거나 대기열이 가득 차면 즉시 거절(shed)
+- 응답의 x-ratelimit-remaining-* 헤더가 로컬 버킷보다 적으면 버킷을 서버 값에 맞춤
+"""
+import asyncio
+import heapq
+import itertools
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from app_logging import get_logger
+from metrics import OPENAI_RATE_AVAILABLE, OPENAI_RATE_SHED, OPENAI_RATE_WAIT_SECONDS
+
+logger = get_logger("openai")
+
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# 속도 제어 대상 (모델 추론 엔드포인트)
+GOVERNED_PATHS = ("/chat/completions", "/responses", "/embeddings")
+CHARS_PER_TOKEN = 4
+
+# 거절된 요청의 오류 코드 (openai.RateLimitError.code로 전달되어 재시도하지 않음)
+RATE_LIMIT_SHED_CODE = "client_rate_limited"
+
+_priority: ContextVar[int] = ContextVar("openai_request_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def background_priority():
+    """블록 안의 OpenAI 호출을 백그라운드 우선순위로 (제목 생성, 요약 등)"""
+    token = _priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class RateLimitShed(Exception):
+    """한도 안에서 제때 처리할 수 없어 전송 전에 거절된 요청"""
+
+    def __init__(self, model: str, priority: int, estimated_wait: float):
+        self.model = model
+        self.priority = priority
+        self.estimated_wait = estimated_wait
+        super().__init__(
+            f"Rate limit queue for {model} is full "
+            f"({PRIORITY_NAMES[priority]}, estimated wait {estimated_wait:.1f}s)"
+        )
+
+
+class TokenBucket:
+    """분당 한도를 초당 보충 속도로 바꾼 토큰 버킷 (잔량은 음수가 될 수 있음 = 한도보다 큰 단일 요청)"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, per_minute: float, burst_seconds: float, now: float):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def shortfall(self, amount: float, reserve: float = 0.0) -> float:
+        """amount를 꺼내고도 reserve가 남으려면 부족한 양 (버킷보다 큰 요청은 가득 찼을 때 허용)"""
+        return max(0.0, reserve + min(amount, self.capacity - reserve) - self.tokens)
+
+    def wait_time(self, amount: float, reserve: float = 0.0) -> float:
+        return self.shortfall(amount, reserve) / self.rate
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "tokens", "future")
+
+    def __init__(self, priority: int, seq: int, tokens: int, future: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.future = future
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class ModelRateGovernor:
+    """한 모델의 RPM/TPM 버킷과 우선순위 대기열
+
+    대기 중인 요청은 타이머 하나(loop.call_later)로 다음 전송 가능 시점에 깨우므로 별도 태스크가 없음
+    """
+
+    def __init__(self, model: str, rpm: int, tpm: int, burst_seconds: float = 10.0,
+                 background_reserve: float = 0.2, max_queue: int = 256,
+                 clock: Callable[[], float] = time.monotonic):
+        now = clock()
+        self.model = model
+        self.requests = TokenBucket(rpm, burst_seconds, now)
+        self.tokens = TokenBucket(tpm, burst_seconds, now)
+        self.background_reserve = background_reserve
+        self.max_queue = max_queue
+        self.clock = clock
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def _reserves(self, priority: int) -> Tuple[float, float]:
+        if priority == INTERACTIVE:
+            return 0.0, 0.0
+        return self.requests.capacity * self.background_reserve, self.tokens.capacity * self.background_reserve
+
+    def _wait_time(self, tokens: int, priority: int) -> float:
+        request_reserve, token_reserve = self._reserves(priority)
+        return max(self.requests.wait_time(1, request_reserve), self.tokens.wait_time(tokens, token_reserve))
+
+    def _take(self, tokens: int) -> None:
+        self.requests.tokens -= 1
+        self.tokens.tokens -= tokens
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.requests.refill(now)
+        self.tokens.refill(now)
+
+    def estimate_wait(self, tokens: int, priority: int) -> float:
+        """앞선 대기 요청(같거나 높은 우선순위)을 모두 보낸 뒤 이 요청을 보낼 수 있을 때까지의 예상 시간"""
+        ahead = [w for w in self._waiters if w.priority <= priority and not w.future.done()]
+        request_reserve, token_reserve = self._reserves(priority)
+        request_wait = max(0.0, request_reserve + len(ahead) + 1 - self.requests.tokens) / self.requests.rate
+        token_demand = sum(w.tokens for w in ahead) + tokens
+        token_wait = max(0.0, token_reserve + token_demand - self.tokens.tokens) / self.tokens.rate
+        return max(request_wait, token_wait)
+
+    async def acquire(self, tokens: int, priority: int = INTERACTIVE, max_wait: float = 10.0) -> float:
+        """전송 허가를 받을 때까지 대기 (대기한 시간 반환, 제때 불가능하면 RateLimitShed)"""
+        self._refill()
+        if not self._waiters and self._wait_time(tokens, priority) == 0.0:
+            self._take(tokens)
+            return 0.0
+
+        estimated = self.estimate_wait(tokens, priority)
+        if estimated > max_wait or len(self._waiters) >= self.max_queue:
+            raise RateLimitShed(self.model, priority, estimated)
+
+        start = self.clock()
+        waiter = _Waiter(priority, next(self._seq), tokens, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiters, waiter)
+        self._dispatch()
+        try:
+            await asyncio.wait_for(waiter.future, max_wait)
+        except asyncio.TimeoutError:
+            raise RateLimitShed(self.model, priority, self.clock() - start) from None
+        finally:
+            if not waiter.future.done():
+                waiter.future.cancel()  # 취소/타임아웃된 대기자는 _dispatch에서 건너뜀
+        return self.clock() - start
+
+    def _dispatch(self) -> None:
+        """대기열 앞에서부터 보낼 수 있는 만큼 허가하고 다음 시점에 타이머 예약"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._refill()
+        while self._waiters:
+            head = self._waiters[0]
+            if head.future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self._wait_time(head.tokens, head.priority) > 0.0:
+                break
+            heapq.heappop(self._waiters)
+            self._take(head.tokens)
+            head.future.set_result(None)
+        if self._waiters:
+            delay = self._wait_time(self._waiters[0].tokens, self._waiters[0].priority)
+            self._timer = asyncio.get_running_loop().call_later(max(delay, 0.001), self._dispatch)
+
+    def sync_remaining(self, remaining_requests: Optional[float], remaining_tokens: Optional[float]) -> None:
+        """서버가 알려준 남은 한도가 로컬 버킷보다 적으면 버킷을 낮춤 (다른 프로세스/키 공유분 반영)"""
+        self._refill()
+        if remaining_requests is not None and remaining_requests < self.requests.tokens:
+            self.requests.tokens = remaining_requests
+        if remaining_tokens is not None and remaining_tokens < self.tokens.tokens:
+            self.tokens.tokens = remaining_tokens
+
+    def drain(self) -> None:
+        """서버 429 수신 시 버킷을 비워 다음 요청들이 보충 속도에 맞춰 나가도록 함"""
+        self._refill()
+        self.requests.tokens = min(self.requests.tokens, 0.0)
+        self.tokens.tokens = min(self.tokens.tokens, 0.0)
+
+
+def _header_number(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class RateGovernor:
+    """모델별 ModelRateGovernor 모음 (AVAILABLE_MODELS의 rpm/tpm 기준, 한도가 없는 모델은 제어하지 않음)"""
+
+    def __init__(self, models: Mapping[str, Mapping], headroom: float = 1.0, burst_seconds: float = 10.0,
+                 background_reserve: float = 0.2, interactive_max_wait: float = 10.0,
+                 background_max_wait: float = 120.0, max_queue: int = 256):
+        self.max_wait = {INTERACTIVE: interactive_max_wait, BACKGROUND: background_max_wait}
+        self.default_output_tokens: Dict[str, int] = {}
+        self.models: Dict[str, ModelRateGovernor] = {}
+        for model, config in models.items():
+            if not config.get("rpm") or not config.get("tpm"):
+                continue
+            self.models[model] = ModelRateGovernor(
+                model, config["rpm"] * headroom, config["tpm"] * headroom,
+                burst_seconds=burst_seconds, background_reserve=background_reserve, max_queue=max_queue,
+            )
+            self.default_output_tokens[model] = config.get("max_tokens", 0)
+        OPENAI_RATE_AVAILABLE.set_function(self._available_samples)
+
+    def estimate_tokens(self, model: str, body: Dict, body_size: int) -> int:
+        output_tokens = (body.get("max_tokens") or body.get("max_completion_tokens")
+                         or body.get("max_output_tokens") or self.default_output_tokens.get(model, 0))
+        return body_size // CHARS_PER_TOKEN + output_tokens
+
+    @staticmethod
+    def governs(method: str, path: str) -> bool:
+        """속도 제어 대상 요청인지 (본문을 읽기 전에 경로로 먼저 거름)"""
+        return method == "POST" and path.endswith(GOVERNED_PATHS)
+
+    async def admit(self, content: bytes) -> Optional[ModelRateGovernor]:
+        """OpenAI 요청 전송 전 허가 (한도가 없는 모델이면 None, 거절 시 RateLimitShed)"""
+        if not content:
+            return None
+        try:
+            body = json.loads(content)
+        except ValueError:
+            return None
+        governor = self.models.get(body.get("model")) if isinstance(body, dict) else None
+        if governor is None:
+            return None
+
+        priority = _priority.get()
+        tokens = self.estimate_tokens(governor.model, body, len(content))
+        labels = (governor.model, PRIORITY_NAMES[priority])
+        try:
+            waited = await governor.acquire(tokens, priority, self.max_wait[priority])
+        except RateLimitShed as e:
+            OPENAI_RATE_SHED.inc(*labels)
+            logger.warning("🚦 OpenAI request shed: %s", e)
+            raise
+        OPENAI_RATE_WAIT_SECONDS.observe(waited, *labels)
+        if waited > 0:
+            logger.debug("🚦 Waited %.2fs for %s rate limit", waited, governor.model,
+                         extra={"tokens": tokens, "priority": labels[1]})
+        return governor
+
+    @staticmethod
+    def observe_response(governor: ModelRateGovernor, status_code: int, headers: Mapping[str, str]) -> None:
+        if status_code == 429:
+            governor.drain()
+            return
+        governor.sync_remaining(_header_number(headers, "x-ratelimit-remaining-requests"),
+                                _header_number(headers, "x-ratelimit-remaining-tokens"))
+
+    @staticmethod
+    def shed_response_body(error: RateLimitShed) -> Dict:
+        """거절된 요청에 돌려줄 OpenAI 형식 오류 본문"""
+        return {"error": {"message": str(error), "type": "requests", "code": RATE_LIMIT_SHED_CODE}}
+
+    def _available_samples(self):
+        samples = []
+        for model, governor in self.models.items():
+            governor._refill()
+            samples.append(((model, "requests"), governor.requests.tokens))
+            samples.append(((model, "tokens"), governor.tokens.tokens))
+        return samples
@@ -0,0 +1,177 @@
+"""
+OpenAI 호출 복원력 모듈
+- full-jitter 지수 백오프: 동시에 실패한 요청들이 같은 시점에 몰려서 재시도하지 않도록 [0, base * 2^n] 균등 분포
+- 서버 재시도 힌트: retry-after-ms / retry-after / x-ratelimit-reset-* 헤더를 우선 사용
+- API 경로별 서킷 브레이커: 연속 실패가 쌓이면 cooldown 동안 해당 경로를 건너뛰고 폴백으로 바로 이동
+"""
+import random
+import re
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterable, Optional
+
+import openai
+
+from app_logging import get_logger
+from metrics import OPENAI_CIRCUIT_STATE
+
+logger = get_logger("openai")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# 경로 장애로 보는 오류 (429/4xx는 경로가 응답한 것이므로 제외)
+PATH_FAILURES = (openai.APIConnectionError, openai.InternalServerError)
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def full_jitter_delay(attempt: int, base_delay: float, max_delay: float,
+                      rng: Callable[[float, float], float] = random.uniform) -> float:
+    """attempt번째 재시도 대기 시간 (0 ~ min(max_delay, base * 2^attempt) 균등 분포)"""
+    return rng(0.0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """OpenAI reset 헤더 형식 ("20ms", "1s", "6m0s") -> 초"""
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """오류 응답의 서버 재시도 힌트 (없으면 None)"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    if isinstance(error, openai.RateLimitError):
+        # 요청/토큰 중 소진된 쪽이 풀려야 하므로 더 긴 쪽
+        resets = [_parse_duration(headers.get(name, ""))
+                  for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")]
+        resets = [reset for reset in resets if reset is not None]
+        if resets:
+            return max(resets)
+    return None
+
+
+def retry_delay(error: Exception, attempt: int, base_delay: float, max_delay: float,
+                rng: Callable[[float, float], float] = random.uniform) -> Optional[float]:
+    """다음 재시도까지 대기 시간 (서버 힌트가 max_delay보다 길면 None = 재시도하지 않음)
+
+    서버 힌트가 있으면 힌트만큼 기다린 뒤 [0, base_delay] 지터를 더해 동시에 깨어나지 않도록 분산
+    """
+    hint = retry_after_seconds(error)
+    if hint is None:
+        return full_jitter_delay(attempt, base_delay, max_delay, rng)
+    if hint > max_delay:
+        return None
+    return hint + rng(0.0, base_delay)
+
+
+class CircuitBreaker:
+    """연속 실패 기반 서킷 브레이커
+
+    closed --(연속 failure_threshold회 실패)--> open --(cooldown 경과)--> half_open
+    half_open에서는 탐색 요청 하나만 통과시키고 성공하면 closed, 실패하면 다시 open
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, cooldown: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def _cooled_down(self) -> bool:
+        return self.clock() - self.opened_at >= self.cooldown
+
+    def available(self) -> bool:
+        """호출해 볼 만한 상태인지 (상태를 바꾸지 않는 확인, 경로 선택용)"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            return self._cooled_down()
+        return not self._probing
+
+    def allow(self) -> bool:
+        """이번 호출을 보내도 되는지 (half_open이면 탐색 요청 하나만 허용)"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if not self._cooled_down():
+                return False
+            self.state = HALF_OPEN
+            logger.info("🔌 Circuit %s half-open, probing", self.name)
+        if self._probing:
+            return False
+        self._probing = True
+        return True
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == OPEN
+
+    def record_success(self) -> None:
+        if self.state != CLOSED:
+            logger.info("✅ Circuit %s closed", self.name)
+        self.state = CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning("⛔ Circuit %s open for %.0fs after %s failures", self.name, self.cooldown, self.failures)
+            self.state = OPEN
+            self.opened_at = self.clock()
+            self._probing = False
+
+    def release(self) -> None:
+        """경로 상태와 무관한 결과(4xx, 429 등)로 끝난 탐색 요청 반환"""
+        self._probing = False
+
+
+class CircuitBreakers:
+    """API 경로별 서킷 브레이커 (responses / assistant / chat_completions)"""
+
+    def __init__(self, api_paths: Iterable[str], failure_threshold: int = 5, cooldown: float = 30.0):
+        self._breakers: Dict[str, CircuitBreaker] = {
+            path: CircuitBreaker(path, failure_threshold, cooldown) for path in api_paths
+        }
+        OPENAI_CIRCUIT_STATE.set_function(
+            lambda: [((path, ), STATE_VALUES[breaker.state]) for path, breaker in self._breakers.items()]
+        )
+
+    def get(self, api_path: Optional[str]) -> Optional[CircuitBreaker]:
+        return self._breakers.get(api_path) if api_path else None
+
+    def __getitem__(self, api_path: str) -> CircuitBreaker:
+        return self._breakers[api_path]
@@ -0,0 +1,110 @@
+"""
+응답 캐시 모듈 (opt-in, RESPONSE_CACHE_ENABLED)
+같은 모델/시스템 프롬프트/최근 대화/질문에 대한 AI 응답을 재사용
+
+- 키: (모델, 시간 섹션을 뺀 시스템 프롬프트, 정규화한 최근 대화, 사용자 질문)의 SHA-256
+- 정규화: 유니코드 NFC + 연속 공백 축소 + 앞뒤 공백 제거
+- 축출: LRU + 항목별 TTL + 전체 항목 수/바이트 상한
+- 도구 실행이 있었던 응답이나 실패 응답은 mark_uncacheable()로 표시해 저장하지 않음 (요청 컨텍스트 단위)
+"""
+import hashlib
+import json
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from context_builder import strip_time_prompt
+from metrics import RESPONSE_CACHE_ENTRIES, RESPONSE_CACHE_LOOKUPS
+
+_WHITESPACE = re.compile(r"\s+")
+
+# 현재 요청에서 캐시하면 안 되는 일이 있었는지 (도구 실행, 오류 응답)
+_uncacheable: ContextVar[bool] = ContextVar("response_uncacheable", default=False)
+
+
+def mark_uncacheable() -> None:
+    """현재 요청의 응답을 캐시에 저장하지 않도록 표시"""
+    _uncacheable.set(True)
+
+
+def is_uncacheable() -> bool:
+    return _uncacheable.get()
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text or "")).strip()
+
+
+def response_cache_key(model: str, system_prompt: str, messages: Sequence[Dict[str, Any]]) -> str:
+    """messages는 모델에 보낼 대화 (첫 시스템 프롬프트 포함 가능, 마지막은 현재 사용자 메시지)"""
+    turns = list(messages)
+    if turns and turns[0].get("role") == "system" and turns[0].get("content") == system_prompt:
+        turns = turns[1:]
+    payload = {
+        "model": model,
+        "system": normalize_text(strip_time_prompt(system_prompt or "")),
+        "turns": [(turn.get("role"), normalize_text(turn.get("content") or "")) for turn in turns],
+    }
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """LRU + TTL + 크기 상한 응답 캐시 (이벤트 루프 스레드 전용)"""
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 8 * 1024 * 1024, ttl: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, str, int]]" = OrderedDict()  # key -> (만료 시각, 응답, 바이트)
+        self.bytes = 0
+        RESPONSE_CACHE_ENTRIES.set_function(lambda: [(("entries",), len(self._entries)), (("bytes",), self.bytes)])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _pop(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
+
+    def get(self, key: str, endpoint: str = "") -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= self.clock():
+            self._pop(key)
+            entry = None
+        RESPONSE_CACHE_LOOKUPS.inc(endpoint, "hit" if entry is not None else "miss")
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: str, content: str) -> bool:
+        """저장 (현재 요청이 캐시 불가로 표시됐거나 한 항목이 바이트 상한을 넘으면 저장하지 않음)"""
+        if not content or is_uncacheable():
+            return False
+        size = len(content.encode("utf-8"))
+        if size > self.max_bytes:
+            return False
+        if key in self._entries:
+            self._pop(key)
+        self._entries[key] = (self.clock() + self.ttl, content, size)
+        self.bytes += size
+
+        now = self.clock()
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            self._pop(next(iter(self._entries)))
+        # 만료된 항목도 LRU 앞쪽부터 정리
+        while self._entries:
+            oldest_key, (expires, _, _) = next(iter(self._entries.items()))
+            if expires > now:
+                break
+            self._pop(oldest_key)
+        return True
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
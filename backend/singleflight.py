@@ -0,0 +1,41 @@
+"""
+Singleflight 모듈
+같은 키의 작업이 동시에 여러 번 요청되면 하나만 실행하고 나머지 호출자는 그 결과(또는 예외)를 함께 받음
+
+- 진행 중인 작업만 공유하며 끝난 결과는 보관하지 않음 (캐시 아님)
+- 작업은 별도 Task로 실행하므로 먼저 들어온 호출자가 취소되어도 기다리는 다른 호출자에게 영향 없음
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+from metrics import SINGLEFLIGHT_SHARED
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """키별 진행 중 작업 공유 (이벤트 루프 스레드 전용)"""
+
+    def __init__(self, name: str):
+        self.name = name  # 메트릭 라벨
+        self._calls: Dict[Hashable, "asyncio.Future"] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def _done(self, key: Hashable, future: "asyncio.Future") -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if not future.cancelled():
+            future.exception()  # 모든 호출자가 취소된 뒤의 예외도 회수된 것으로 처리
+
+    async def do(self, key: Hashable, function: Callable[[], Awaitable[T]]) -> T:
+        """key로 진행 중인 작업이 있으면 그 결과를 기다리고, 없으면 function()을 실행"""
+        future = self._calls.get(key)
+        if future is not None:
+            SINGLEFLIGHT_SHARED.inc(self.name)
+        else:
+            future = asyncio.ensure_future(function())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._done(key, done))
+        return await asyncio.shield(future)
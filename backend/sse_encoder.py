@@ -0,0 +1,70 @@
+"""
+스트리밍 청크 SSE 인코더
+메시지마다 고정인 봉투(id, role, sessionId, 나머지 null 필드)는 한 번만 렌더링하고
+델타마다 이스케이프한 content와 timestamp만 끼워 넣음
+"""
+from datetime import datetime
+from json.encoder import encode_basestring, encode_basestring_ascii
+from typing import Optional, Sequence, Type
+
+from pydantic import BaseModel
+
+# 모든 스트리밍 청크 모델이 공유하는 앞쪽 필드 (순서 포함)
+BASE_CHUNK_FIELDS = ("id", "content", "role", "timestamp", "sessionId", "isComplete")
+
+
+class DeltaFrame(str):
+    """미완료 델타 프레임 (코얼레서가 같은 메시지의 델타를 이어 붙일 수 있도록 인코더와 원본 델타 보관)"""
+
+    def __new__(cls, frame: str, encoder: "StreamChunkEncoder", delta: str):
+        obj = str.__new__(cls, frame)
+        obj.encoder = encoder
+        obj.delta = delta
+        return obj
+
+
+class StreamChunkEncoder:
+    """델타 텍스트를 SSE "data: {...}\\n\\n" 프레임으로 인코딩
+
+    - compact=True: pydantic 청크 모델의 .json()과 동일 (구분자 공백 없음, 한글 등 비ASCII 원문 유지,
+      기본 필드 뒤의 나머지 필드는 null)
+    - compact=False: json.dumps(dict)와 동일 (", " / ": " 구분자, ensure_ascii)
+    """
+
+    __slots__ = ("_encode", "_head", "_middle", "_tail_open", "_tail_closed")
+
+    def __init__(self, message_id: str, session_id: str, role: str = "assistant",
+                 null_fields: Sequence[str] = (), compact: bool = True):
+        if compact:
+            encode, item, key = encode_basestring, ",", ":"
+        else:
+            encode, item, key = encode_basestring_ascii, ", ", ": "
+
+        nulls = "".join(f'{item}"{name}"{key}null' for name in null_fields)
+        self._encode = encode
+        self._head = f'data: {{"id"{key}{encode(message_id)}{item}"content"{key}'
+        self._middle = f'{item}"role"{key}{encode(role)}{item}"timestamp"{key}"'
+        tail = f'"{item}"sessionId"{key}{encode(session_id)}{item}"isComplete"{key}'
+        self._tail_open = f"{tail}false{nulls}}}\n\n"
+        self._tail_closed = f"{tail}true{nulls}}}\n\n"
+
+    @classmethod
+    def for_model(cls, model: Type[BaseModel], message_id: str, session_id: str,
+                  role: str = "assistant") -> "StreamChunkEncoder":
+        """청크 모델(ChatStreamChunk 등)의 .json()과 같은 프레임을 만드는 인코더"""
+        fields = tuple(model.model_fields)
+        if fields[:len(BASE_CHUNK_FIELDS)] != BASE_CHUNK_FIELDS:
+            raise ValueError(f"{model.__name__} does not start with {BASE_CHUNK_FIELDS}")
+        return cls(message_id, session_id, role, null_fields=fields[len(BASE_CHUNK_FIELDS):])
+
+    def encode(self, content: str, is_complete: bool = False, timestamp: Optional[datetime] = None) -> str:
+        frame = "".join((
+            self._head,
+            self._encode(content),
+            self._middle,
+            (timestamp or datetime.now()).isoformat(),
+            self._tail_closed if is_complete else self._tail_open,
+        ))
+        return frame if is_complete else DeltaFrame(frame, self, content)
+
+    __call__ = encode
@@ -0,0 +1,50 @@
+"""
+Chat Storage Layer for NSales Pro
+채팅 세션/메시지 저장소 (메모리, SQLite)
+"""
+
+import os
+
+from .base import (
+    ChatRepository,
+    TOKEN_USAGE,
+    CONVERSATION_SUMMARIES,
+    ASSISTANTS,
+    ASSISTANT_POOL,
+    THREADS,
+    THREAD_SYNC,
+    VECTOR_STORES,
+    SETTINGS,
+    SESSION_NAMESPACES,
+)
+from .fulltext import MessageHit, MessageSearchIndex, make_snippet
+from .memory import InMemoryChatRepository
+from .records import MessageRecord
+from .migrations import SESSION_SCHEMA_VERSION, migrate_session, run_session_migrations, session_migration
+from .session_index import SessionIndex, SessionPage
+from .sqlite import DEFAULT_DB_PATH, SQLiteChatRepository
+
+
+def create_repository(backend: str = None, path: str = None, token_counter=None) -> ChatRepository:
+    """환경 설정에 맞는 저장소 생성 (token_counter: 메시지 저장 시 토큰 수 캐시용)
+
+    - CHAT_STORAGE_BACKEND: "sqlite" (기본값) 또는 "memory"
+    - CHAT_DB_PATH: SQLite 파일 경로 (기본값: backend/chat.db, 실행 디렉터리와 무관)
+    """
+    backend = (backend or os.getenv("CHAT_STORAGE_BACKEND", "sqlite")).lower()
+
+    if backend == "memory":
+        return InMemoryChatRepository(token_counter)
+    if backend == "sqlite":
+        return SQLiteChatRepository(path or os.getenv("CHAT_DB_PATH", DEFAULT_DB_PATH), token_counter)
+
+    raise ValueError(f"Unknown chat storage backend: {backend}")
+
+
+__all__ = [
+    'ChatRepository', 'InMemoryChatRepository', 'SQLiteChatRepository', 'create_repository',
+    'SessionIndex', 'SessionPage', 'MessageHit', 'MessageSearchIndex', 'make_snippet',
+    'MessageRecord', 'SESSION_SCHEMA_VERSION', 'migrate_session', 'run_session_migrations', 'session_migration',
+    'TOKEN_USAGE', 'CONVERSATION_SUMMARIES', 'ASSISTANTS', 'ASSISTANT_POOL', 'THREADS', 'THREAD_SYNC', 'VECTOR_STORES', 'SETTINGS',
+    'SESSION_NAMESPACES',
+]
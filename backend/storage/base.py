@@ -0,0 +1,190 @@
+"""
+Chat Repository Interface
+채팅 세션/메시지 저장소의 공통 인터페이스 정의
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .fulltext import MessageHit
+from .records import MessageRecord
+from .session_index import SessionPage
+
+
+# 키-값 네임스페이스 (세션 단위 부가 정보)
+TOKEN_USAGE = "token_usage"            # session_id -> token usage stats
+CONVERSATION_SUMMARIES = "summaries"   # session_id -> summary
+ASSISTANTS = "assistants"              # session_id -> assistant_id
+ASSISTANT_POOL = "assistant_pool"      # assistant config key -> assistant_id (같은 설정의 세션이 공유)
+THREADS = "threads"                    # session_id -> thread_id
+THREAD_SYNC = "thread_sync"            # session_id -> Thread 동기화 커서 (thread_id, last_message_id)
+VECTOR_STORES = "vector_stores"        # session_id -> vector_store_id
+SETTINGS = "settings"                  # 전역 설정 (knowledge_base_id 등)
+
+# session_id를 키로 쓰는 네임스페이스 (세션 삭제 시 함께 삭제)
+SESSION_NAMESPACES = (TOKEN_USAGE, CONVERSATION_SUMMARIES, ASSISTANTS, THREADS, THREAD_SYNC, VECTOR_STORES)
+
+
+class ChatRepository(ABC):
+    """채팅 세션, 메시지, 세션 부가 정보를 저장하는 저장소
+
+    세션은 dict로 주고받고, 메시지는 dict로 저장한 뒤 읽기 전용 MessageRecord(Mapping)로 반환합니다.
+    세션 목록은 항상 updatedAt 내림차순으로 반환합니다.
+    token_counter가 있으면 메시지 저장 시 본문 토큰 수를 계산해 레코드에 캐시합니다.
+    """
+
+    def __init__(self, token_counter: Optional[Callable[[str], int]] = None):
+        self.token_counter = token_counter
+
+    def _to_record(self, message: Dict[str, Any], session_id: str) -> MessageRecord:
+        return MessageRecord.from_message(message, session_id, self.token_counter)
+
+    # ---------- 세션 ----------
+
+    @abstractmethod
+    def create_session(self, session: Dict[str, Any]) -> None:
+        """세션 생성 (빈 메시지 목록 포함)"""
+
+    @abstractmethod
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """세션 조회"""
+
+    @abstractmethod
+    def has_session(self, session_id: str) -> bool:
+        """세션 존재 여부"""
+
+    @abstractmethod
+    def update_session(self, session_id: str, **fields) -> bool:
+        """세션 필드 갱신 (세션이 없으면 False)"""
+
+    @abstractmethod
+    def delete_session(self, session_id: str) -> bool:
+        """세션과 해당 세션의 메시지, 세션 단위 부가 정보(SESSION_NAMESPACES) 삭제"""
+
+    @abstractmethod
+    def iter_sessions(self) -> Iterator[Dict[str, Any]]:
+        """모든 세션 순회 (순서 보장 없음)"""
+
+    @abstractmethod
+    def list_sessions(self, offset: int = 0, limit: int = 50, query: Optional[str] = None,
+                      cursor: Optional[str] = None) -> SessionPage:
+        """updatedAt 내림차순 세션 페이지 조회
+
+        query는 제목 부분 문자열 검색, cursor는 이전 페이지의 next_cursor (잘못된 커서는 ValueError)
+        """
+
+    @abstractmethod
+    def count_sessions(self) -> int:
+        """전체 세션 수"""
+
+    # ---------- 메시지 ----------
+
+    @abstractmethod
+    def get_messages(self, session_id: str) -> List[MessageRecord]:
+        """세션의 전체 메시지 (시간순)"""
+
+    @abstractmethod
+    def get_recent_messages(self, session_id: str, limit: int) -> List[MessageRecord]:
+        """세션의 최근 limit개 메시지 (시간순, 전체 히스토리를 읽지 않음)"""
+
+    @abstractmethod
+    def count_messages(self, session_id: str) -> int:
+        """세션의 메시지 수"""
+
+    @abstractmethod
+    def append_message(self, session_id: str, message: Dict[str, Any]) -> None:
+        """세션 끝에 메시지 추가"""
+
+    @abstractmethod
+    def get_messages_after(self, session_id: str, position: int) -> List[MessageRecord]:
+        """find_message가 돌려준 위치 이후의 메시지 (시간순)"""
+
+    @abstractmethod
+    def get_messages_before(self, session_id: str, position: int, limit: int) -> List[MessageRecord]:
+        """find_message가 돌려준 위치 직전의 최근 limit개 메시지 (시간순)"""
+
+    @abstractmethod
+    def find_message(self, message_id: str) -> Optional[Tuple[str, int, MessageRecord]]:
+        """메시지 ID로 (session_id, 세션 내 정렬 위치, 메시지) 조회
+
+        위치는 삭제된 메시지 자리가 비어 있을 수 있는 정렬 키로, 몇 번째 메시지인지가 아님
+        (get_messages_after/get_messages_before에 그대로 넘겨 사용)
+        """
+
+    @abstractmethod
+    def delete_message(self, message_id: str) -> Optional[str]:
+        """메시지 삭제 후 소속 session_id 반환 (없으면 None)"""
+
+    @abstractmethod
+    def replace_message(self, message_id: str, message: Dict[str, Any]) -> bool:
+        """같은 위치의 메시지를 새 메시지로 교체"""
+
+    @abstractmethod
+    def replace_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        """세션의 메시지 목록 전체 교체"""
+
+    @abstractmethod
+    def search_messages(self, query: str, limit: int = 20,
+                        session_id: Optional[str] = None) -> Tuple[List[MessageHit], int]:
+        """메시지 본문 전문 검색 (점수순 상위 결과, 전체 매칭 수)"""
+
+    # ---------- 세션 부가 정보 (키-값) ----------
+
+    @abstractmethod
+    def get_value(self, namespace: str, key: str, default: Any = None) -> Any:
+        """네임스페이스별 값 조회"""
+
+    @abstractmethod
+    def set_value(self, namespace: str, key: str, value: Any) -> None:
+        """네임스페이스별 값 저장"""
+
+    @abstractmethod
+    def delete_value(self, namespace: str, key: str) -> None:
+        """네임스페이스별 값 삭제"""
+
+    # ---------- 세션별 토큰 누적치 ----------
+
+    @staticmethod
+    def message_tokens(message) -> int:
+        """저장 시 캐시된 메시지 토큰 수 (캐시가 없으면 0)"""
+        tokens = message.get("tokens")
+        return max(1, tokens) if tokens is not None else 0
+
+    def get_token_usage(self, session_id: str) -> Dict[str, Any]:
+        """TOKEN_USAGE에 유지되는 세션 토큰 누적치 (메시지를 다시 읽지 않음)"""
+        return self.get_value(TOKEN_USAGE, session_id) or {
+            "total_tokens": 0,
+            "messages_count": 0,
+            "optimizations": 0,
+            "tokens_saved": 0,
+            "last_updated": datetime.now().isoformat()
+        }
+
+    def rebuild_token_usage(self, session_id: str) -> Dict[str, Any]:
+        """메시지 전체를 한 번 읽어 토큰 누적치 재계산 (마이그레이션/전체 교체 시)"""
+        return self._reset_tokens(session_id, self.get_messages(session_id))
+
+    def _reset_tokens(self, session_id: str, messages: List[MessageRecord]) -> Dict[str, Any]:
+        usage = dict(self.get_token_usage(session_id))
+        usage["total_tokens"] = sum(self.message_tokens(message) for message in messages)
+        usage["messages_count"] = len(messages)
+        usage["last_updated"] = datetime.now().isoformat()
+        self.set_value(TOKEN_USAGE, session_id, usage)
+        return usage
+
+    def _track_tokens(self, session_id: str, tokens_delta: int, messages_delta: int) -> None:
+        """메시지 추가/삭제/교체 시 토큰 누적치 증분 갱신"""
+        usage = dict(self.get_token_usage(session_id))
+        usage["total_tokens"] = max(0, usage["total_tokens"] + tokens_delta)
+        usage["messages_count"] = max(0, usage["messages_count"] + messages_delta)
+        usage["last_updated"] = datetime.now().isoformat()
+        self.set_value(TOKEN_USAGE, session_id, usage)
+
+    def has_value(self, namespace: str, key: str) -> bool:
+        """네임스페이스별 값 존재 여부"""
+        return self.get_value(namespace, key) is not None
+
+    def close(self) -> None:
+        """저장소 리소스 정리"""
+        pass
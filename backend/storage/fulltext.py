@@ -0,0 +1,129 @@
+"""
+Message Full-Text Index
+문자 bigram/trigram 역색인 기반 메시지 본문 검색 (BM25 랭킹)
+"""
+
+import math
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from .ngram import char_ngrams, normalize_text
+
+
+NGRAM_SIZES = (2, 3)
+
+# BM25 파라미터
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+class MessageHit(NamedTuple):
+    """검색 결과 한 건"""
+    message_id: str
+    session_id: str
+    score: float
+
+
+def text_terms(text: str) -> Counter:
+    """정규화된 텍스트의 bigram/trigram 빈도"""
+    terms = Counter()
+    for n in NGRAM_SIZES:
+        terms.update(char_ngrams(text, n))
+    return terms
+
+
+def make_snippet(content: str, query: str, width: int = 80) -> str:
+    """query가 처음 등장하는 위치 주변을 잘라낸 미리보기"""
+    content = " ".join((content or "").split())
+    if len(content) <= width:
+        return content
+
+    folded = content.casefold()
+    position = folded.find(normalize_text(query))
+    if position < 0:
+        # 전체 구문이 없으면 가장 먼저 등장하는 단어 기준
+        positions = [folded.find(word) for word in normalize_text(query).split()]
+        positions = [p for p in positions if p >= 0]
+        position = min(positions) if positions else 0
+
+    start = max(0, min(position - width // 4, len(content) - width))
+    end = start + width
+    return ("…" if start > 0 else "") + content[start:end] + ("…" if end < len(content) else "")
+
+
+class MessageSearchIndex:
+    """메시지 ID -> 본문에 대한 증분 역색인
+
+    - 메시지 추가/삭제/교체 시 해당 메시지의 n-gram 포스팅만 갱신
+    - 검색 시 쿼리 n-gram의 포스팅만 읽어 BM25 점수 계산 (전체 코퍼스 재스캔 없음)
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, int]] = {}  # term -> {message_id: tf}
+        self._doc_terms: Dict[str, Tuple[str, ...]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._doc_sessions: Dict[str, str] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def add(self, session_id: str, message: Dict) -> None:
+        message_id = message.get("id")
+        if message_id is None:
+            return
+        self.remove(message_id)
+
+        terms = text_terms(normalize_text(message.get("content") or ""))
+        if not terms:
+            return
+
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[message_id] = frequency
+        length = sum(terms.values())
+        self._doc_terms[message_id] = tuple(terms)
+        self._doc_lengths[message_id] = length
+        self._doc_sessions[message_id] = session_id
+        self._total_length += length
+
+    def remove(self, message_id: Optional[str]) -> None:
+        terms = self._doc_terms.pop(message_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(message_id, None)
+                if not posting:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(message_id)
+        del self._doc_sessions[message_id]
+
+    def search(self, query: str, limit: int = 20, session_id: Optional[str] = None) -> Tuple[List[MessageHit], int]:
+        """(점수순 상위 결과, 전체 매칭 수) 반환"""
+        query_terms = text_terms(normalize_text(query))
+        if not query_terms or not self._doc_lengths:
+            return [], 0
+
+        doc_count = len(self._doc_lengths)
+        average_length = self._total_length / doc_count
+        scores: Dict[str, float] = {}
+        matched_terms: Dict[str, int] = {}
+
+        for term in query_terms:
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+            for message_id, frequency in posting.items():
+                if session_id is not None and self._doc_sessions[message_id] != session_id:
+                    continue
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_lengths[message_id] / average_length)
+                scores[message_id] = scores.get(message_id, 0.0) + idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+                matched_terms[message_id] = matched_terms.get(message_id, 0) + 1
+
+        # 쿼리 n-gram의 절반 이상을 포함한 메시지만 결과로 인정
+        required = max(1, math.ceil(len(query_terms) / 2))
+        matches: Set[str] = {message_id for message_id, count in matched_terms.items() if count >= required}
+        ranked = sorted(matches, key=lambda message_id: (-scores[message_id], message_id))[:limit]
+        return [MessageHit(message_id, self._doc_sessions[message_id], scores[message_id]) for message_id in ranked], len(matches)
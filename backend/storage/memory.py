@@ -0,0 +1,195 @@
+"""
+In-Memory Chat Repository
+프로세스 메모리에 채팅 데이터를 보관하는 저장소 (개발/테스트용)
+"""
+
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .base import ChatRepository, SESSION_NAMESPACES
+from .fulltext import MessageHit, MessageSearchIndex
+from .records import MessageRecord
+from .session_index import SessionIndex, SessionPage
+
+
+class InMemoryChatRepository(ChatRepository):
+    """dict 기반 메모리 저장소
+
+    - 세션 메시지는 슬롯 리스트에 보관하고 삭제는 슬롯을 비워 두기만 함 (뒤쪽 메시지 위치 갱신 없음)
+    - 빈 슬롯이 절반을 넘으면 세션 리스트를 한 번 압축 (삭제 비용은 분할 상환 O(1))
+    """
+
+    COMPACT_MIN_SLOTS = 64
+
+    def __init__(self, token_counter: Optional[Callable[[str], int]] = None):
+        super().__init__(token_counter)
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._messages: Dict[str, List[Optional[MessageRecord]]] = {}  # 삭제된 슬롯은 None
+        self._deleted: Dict[str, int] = {}  # session_id -> 빈 슬롯 수
+        self._message_index: Dict[str, Tuple[str, int]] = {}  # message_id -> (session_id, 슬롯 위치)
+        self._values: Dict[str, Dict[str, Any]] = {}
+        self._session_index = SessionIndex()
+        self._search_index = MessageSearchIndex()
+
+    # ---------- 세션 ----------
+
+    def create_session(self, session: Dict[str, Any]) -> None:
+        session_id = session["id"]
+        self._sessions[session_id] = session
+        self._messages.setdefault(session_id, [])
+        self._session_index.upsert(session)
+
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return self._sessions.get(session_id)
+
+    def has_session(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def update_session(self, session_id: str, **fields) -> bool:
+        session = self._sessions.get(session_id)
+        if session is None:
+            return False
+        session.update(fields)
+        self._session_index.upsert(session)
+        return True
+
+    def delete_session(self, session_id: str) -> bool:
+        if session_id not in self._sessions:
+            return False
+        del self._sessions[session_id]
+        self._session_index.remove(session_id)
+        self._unindex(self._messages.pop(session_id, []))
+        self._deleted.pop(session_id, None)
+        for namespace in SESSION_NAMESPACES:
+            self.delete_value(namespace, session_id)
+        return True
+
+    def iter_sessions(self) -> Iterator[Dict[str, Any]]:
+        return iter(list(self._sessions.values()))
+
+    def list_sessions(self, offset: int = 0, limit: int = 50, query: Optional[str] = None,
+                      cursor: Optional[str] = None) -> SessionPage:
+        session_ids, total, next_cursor = self._session_index.page(offset, limit, query, cursor)
+        return SessionPage([self._sessions[session_id] for session_id in session_ids], total, next_cursor)
+
+    def count_sessions(self) -> int:
+        return len(self._sessions)
+
+    # ---------- 메시지 ----------
+
+    def get_messages(self, session_id: str) -> List[MessageRecord]:
+        return [message for message in self._messages.get(session_id, ()) if message is not None]
+
+    def get_recent_messages(self, session_id: str, limit: int) -> List[MessageRecord]:
+        messages = self._messages.get(session_id, [])
+        return self._collect_before(messages, len(messages), limit)
+
+    def get_messages_after(self, session_id: str, position: int) -> List[MessageRecord]:
+        return [message for message in self._messages.get(session_id, [])[position + 1:] if message is not None]
+
+    def get_messages_before(self, session_id: str, position: int, limit: int) -> List[MessageRecord]:
+        return self._collect_before(self._messages.get(session_id, []), position, limit)
+
+    def count_messages(self, session_id: str) -> int:
+        return len(self._messages.get(session_id, ())) - self._deleted.get(session_id, 0)
+
+    @staticmethod
+    def _collect_before(messages: List[Optional[MessageRecord]], end: int, limit: int) -> List[MessageRecord]:
+        """end 슬롯 이전의 최근 limit개 메시지 (시간순, 빈 슬롯은 건너뜀)"""
+        collected = []
+        position = end - 1
+        while position >= 0 and len(collected) < limit:
+            if messages[position] is not None:
+                collected.append(messages[position])
+            position -= 1
+        collected.reverse()
+        return collected
+
+    def append_message(self, session_id: str, message: Dict[str, Any]) -> None:
+        messages = self._messages.setdefault(session_id, [])
+        message = self._to_record(message, session_id)
+        if "id" in message:
+            self._message_index[message["id"]] = (session_id, len(messages))
+        messages.append(message)
+        self._search_index.add(session_id, message)
+        self._track_tokens(session_id, self.message_tokens(message), 1)
+
+    def find_message(self, message_id: str) -> Optional[Tuple[str, int, MessageRecord]]:
+        location = self._message_index.get(message_id)
+        if location is None:
+            return None
+        session_id, position = location
+        return session_id, position, self._messages[session_id][position]
+
+    def delete_message(self, message_id: str) -> Optional[str]:
+        location = self._message_index.pop(message_id, None)
+        if location is None:
+            return None
+        session_id, position = location
+        messages = self._messages[session_id]
+        removed = messages[position]
+        messages[position] = None
+        deleted = self._deleted.get(session_id, 0) + 1
+        self._deleted[session_id] = deleted
+        self._search_index.remove(message_id)
+        self._track_tokens(session_id, -self.message_tokens(removed), -1)
+        if len(messages) >= self.COMPACT_MIN_SLOTS and deleted * 2 > len(messages):
+            self._compact(session_id)
+        return session_id
+
+    def replace_message(self, message_id: str, message: Dict[str, Any]) -> bool:
+        location = self._message_index.pop(message_id, None)
+        if location is None:
+            return False
+        session_id, position = location
+        message = self._to_record(message, session_id)
+        previous = self._messages[session_id][position]
+        self._messages[session_id][position] = message
+        self._track_tokens(session_id, self.message_tokens(message) - self.message_tokens(previous), 0)
+        if "id" in message:
+            self._message_index[message["id"]] = location
+        self._search_index.remove(message_id)
+        self._search_index.add(session_id, message)
+        return True
+
+    def replace_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        self._unindex(self._messages.get(session_id, ()))
+        self._messages[session_id] = [self._to_record(message, session_id) for message in messages]
+        self._deleted.pop(session_id, None)
+        self._reindex(session_id, self._messages[session_id])
+        for message in self._messages[session_id]:
+            self._search_index.add(session_id, message)
+        self._reset_tokens(session_id, self._messages[session_id])
+
+    def _compact(self, session_id: str) -> None:
+        """빈 슬롯을 제거하고 메시지 위치 인덱스 재구성"""
+        self._messages[session_id] = [message for message in self._messages[session_id] if message is not None]
+        self._deleted.pop(session_id, None)
+        self._reindex(session_id, self._messages[session_id])
+
+    def _reindex(self, session_id: str, messages: List[MessageRecord]) -> None:
+        for position, message in enumerate(messages):
+            message_id = message.get("id")
+            if message_id is not None:
+                self._message_index[message_id] = (session_id, position)
+
+    def _unindex(self, messages) -> None:
+        for message in messages:
+            if message is None:
+                continue
+            self._message_index.pop(message.get("id"), None)
+            self._search_index.remove(message.get("id"))
+
+    def search_messages(self, query: str, limit: int = 20,
+                        session_id: Optional[str] = None) -> Tuple[List[MessageHit], int]:
+        return self._search_index.search(query, limit, session_id)
+
+    # ---------- 세션 부가 정보 ----------
+
+    def get_value(self, namespace: str, key: str, default: Any = None) -> Any:
+        return self._values.get(namespace, {}).get(key, default)
+
+    def set_value(self, namespace: str, key: str, value: Any) -> None:
+        self._values.setdefault(namespace, {})[key] = value
+
+    def delete_value(self, namespace: str, key: str) -> None:
+        self._values.get(namespace, {}).pop(key, None)
@@ -0,0 +1,75 @@
+"""
+Session Schema Migrations
+세션 레코드 스키마 버전 관리 및 시작 시 1회 마이그레이션
+"""
+
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+from .base import ChatRepository
+
+
+SCHEMA_VERSION_FIELD = "schemaVersion"
+SESSION_SCHEMA_VERSION = 2
+
+SessionMigration = Callable[[Dict[str, Any], ChatRepository], None]
+
+# 원본 버전 -> (원본 버전 + 1)로 올리는 마이그레이션
+_MIGRATIONS: Dict[int, SessionMigration] = {}
+
+
+def session_migration(from_version: int):
+    """from_version 레코드를 다음 버전으로 올리는 마이그레이션 등록"""
+    def decorator(func: SessionMigration) -> SessionMigration:
+        if from_version in _MIGRATIONS:
+            raise ValueError(f"Session migration from v{from_version} already registered")
+        _MIGRATIONS[from_version] = func
+        return func
+    return decorator
+
+
+@session_migration(from_version=0)
+def _fill_required_fields(session: Dict[str, Any], repository: ChatRepository) -> None:
+    """버전 필드가 없던 레거시 세션의 필수 필드 채우기"""
+    session_id = session["id"]
+    session.setdefault("title", f"채팅 {session_id[:8]}")
+    if "createdAt" not in session:
+        session["createdAt"] = session.get("updatedAt") or datetime.now()
+    session.setdefault("updatedAt", session["createdAt"])
+    if "messageCount" not in session:
+        session["messageCount"] = repository.count_messages(session_id)
+    session.setdefault("titleGenerated", False)
+    session.setdefault("titleGeneratedAt", None)
+
+
+@session_migration(from_version=1)
+def _build_token_usage(session: Dict[str, Any], repository: ChatRepository) -> None:
+    """증분 관리되는 세션 토큰 누적치(TOKEN_USAGE) 초기 구성"""
+    repository.rebuild_token_usage(session["id"])
+
+
+def migrate_session(session: Dict[str, Any], repository: ChatRepository) -> bool:
+    """세션 레코드를 현재 스키마 버전으로 올림 (변경 여부 반환)"""
+    version = session.get(SCHEMA_VERSION_FIELD, 0)
+    if version >= SESSION_SCHEMA_VERSION:
+        return False
+
+    while version < SESSION_SCHEMA_VERSION:
+        migration = _MIGRATIONS.get(version)
+        if migration is None:
+            raise RuntimeError(f"No session migration registered from v{version}")
+        migration(session, repository)
+        version += 1
+
+    session[SCHEMA_VERSION_FIELD] = version
+    return True
+
+
+def run_session_migrations(repository: ChatRepository) -> int:
+    """저장소의 모든 구버전 세션을 마이그레이션하고 저장 (마이그레이션된 세션 수 반환)"""
+    migrated_count = 0
+    for session in repository.iter_sessions():
+        if migrate_session(session, repository):
+            repository.update_session(session["id"], **session)
+            migrated_count += 1
+    return migrated_count
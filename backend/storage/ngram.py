@@ -0,0 +1,78 @@
+"""
+N-gram Text Index
+형태소 분석기 없이 한국어(한글) 검색을 지원하는 문자 n-gram 인덱스
+"""
+
+import unicodedata
+from typing import Dict, Hashable, List, Optional, Set
+
+
+def normalize_text(text: str) -> str:
+    """검색용 정규화 (NFC + 대소문자 무시 + 공백 정리)"""
+    return " ".join(unicodedata.normalize("NFC", text or "").casefold().split())
+
+
+def char_ngrams(text: str, n: int) -> List[str]:
+    """정규화된 문자열의 문자 n-gram 목록 (공백을 넘는 n-gram 제외)"""
+    grams = []
+    for word in text.split():
+        if len(word) < n:
+            continue
+        grams.extend(word[i:i + n] for i in range(len(word) - n + 1))
+    return grams
+
+
+class NgramIndex:
+    """문서 ID -> 텍스트에 대한 문자 unigram/bigram 역색인
+
+    부분 문자열 검색 시 쿼리의 bigram 포스팅을 교집합한 뒤 원문으로 최종 확인합니다.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[Hashable]] = {}
+        self._texts: Dict[Hashable, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    @staticmethod
+    def _terms(text: str) -> Set[str]:
+        return set(char_ngrams(text, 1)) | set(char_ngrams(text, 2))
+
+    def add(self, doc_id: Hashable, text: str) -> None:
+        normalized = normalize_text(text)
+        if self._texts.get(doc_id) == normalized:
+            return
+        self.remove(doc_id)
+        self._texts[doc_id] = normalized
+        for term in self._terms(normalized):
+            self._postings.setdefault(term, set()).add(doc_id)
+
+    def remove(self, doc_id: Hashable) -> None:
+        normalized = self._texts.pop(doc_id, None)
+        if normalized is None:
+            return
+        for term in self._terms(normalized):
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.discard(doc_id)
+                if not posting:
+                    del self._postings[term]
+
+    def search(self, query: str) -> Set[Hashable]:
+        """query를 부분 문자열로 포함하는 문서 ID 집합"""
+        normalized = normalize_text(query)
+        if not normalized:
+            return set(self._texts)
+
+        terms = [term for word in normalized.split() for term in (char_ngrams(word, 2) or [word])]
+        candidates: Optional[Set[Hashable]] = None
+        for term in sorted(set(terms), key=lambda t: len(self._postings.get(t, ()))):
+            posting = self._postings.get(term)
+            if not posting:
+                return set()
+            candidates = set(posting) if candidates is None else candidates & posting
+            if not candidates:
+                return set()
+
+        return {doc_id for doc_id in candidates or () if normalized in self._texts[doc_id]}
@@ -0,0 +1,112 @@
+"""
+Compact Message Records
+저장소 내부용 __slots__ 메시지 레코드 (API 모델 변환은 응답 시점에만 수행)
+"""
+
+import sys
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+class MessageRecord(Mapping):
+    """읽기 전용 메시지 레코드
+
+    ChatMessage(...).dict() 대비 절약 요소:
+    - 키 문자열 dict 대신 __slots__ 고정 필드
+    - datetime 객체 대신 epoch float
+    - role 문자열 intern, sessionId는 세션 키 문자열 참조 공유
+
+    tokens에는 저장 시점에 한 번 계산한 본문 토큰 수를 캐시합니다.
+
+    Mapping 인터페이스(msg["content"], msg.get(...), ChatMessage(**msg))를 그대로 지원합니다.
+    """
+
+    __slots__ = ("id", "role", "content", "timestamp", "session_id", "tokens", "extra")
+
+    _CORE_KEYS = ("id", "content", "role", "timestamp", "sessionId", "tokens")
+
+    def __init__(self, id: Optional[str], role: str, content: str, timestamp: Optional[float] = None,
+                 session_id: Optional[str] = None, tokens: Optional[int] = None,
+                 extra: Optional[Dict[str, Any]] = None):
+        self.id = id
+        self.role = sys.intern(role) if role else role
+        self.content = content
+        self.timestamp = timestamp
+        self.session_id = session_id
+        self.tokens = tokens
+        self.extra = extra or None
+
+    @classmethod
+    def from_message(cls, message: Mapping, session_id: Optional[str] = None,
+                     token_counter: Optional[Callable[[str], int]] = None) -> "MessageRecord":
+        """dict 또는 레코드에서 생성 (session_id는 저장소의 세션 키 문자열을 공유)
+
+        token_counter가 주어지고 토큰 수가 캐시되어 있지 않으면 이 시점에 한 번 계산합니다.
+        """
+        if isinstance(message, MessageRecord):
+            if message.tokens is None and token_counter is not None:
+                message.tokens = token_counter(message.content or "")
+            return message
+
+        timestamp = message.get("timestamp")
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+        elif isinstance(timestamp, str):
+            try:
+                timestamp = datetime.fromisoformat(timestamp).timestamp()
+            except ValueError:
+                timestamp = None
+
+        message_session_id = message.get("sessionId")
+        if message_session_id is not None and message_session_id == session_id:
+            message_session_id = session_id
+
+        content = message.get("content", "")
+        tokens = message.get("tokens")
+        if tokens is None and token_counter is not None:
+            tokens = token_counter(content or "")
+
+        extra = {key: value for key, value in message.items() if key not in cls._CORE_KEYS}
+        return cls(message.get("id"), message.get("role", ""), content,
+                   timestamp, message_session_id, tokens, extra)
+
+    def _get(self, key: str) -> Any:
+        if key == "id":
+            return self.id
+        if key == "content":
+            return self.content
+        if key == "role":
+            return self.role
+        if key == "timestamp":
+            return datetime.fromtimestamp(self.timestamp) if self.timestamp is not None else None
+        if key == "sessionId":
+            return self.session_id
+        if key == "tokens":
+            return self.tokens
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._get(key)
+        if value is None and key in self._CORE_KEYS:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        values = (self.id, self.content, self.role, self.timestamp, self.session_id, self.tokens)
+        for key, value in zip(self._CORE_KEYS, values):
+            if value is not None:
+                yield key
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"MessageRecord({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
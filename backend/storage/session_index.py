@@ -0,0 +1,118 @@
+"""
+Session Listing Index
+updatedAt 정렬 인덱스 + 제목 n-gram 인덱스 + 커서 페이지네이션
+"""
+
+import base64
+import json
+from bisect import bisect_right, insort
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from .ngram import NgramIndex
+
+
+SortKey = Tuple[float, str]  # (-updatedAt timestamp, session_id): 오름차순 = 최신순
+
+
+class SessionPage(NamedTuple):
+    """세션 목록 한 페이지"""
+    sessions: List[Dict[str, Any]]
+    total: int
+    next_cursor: Optional[str]
+
+
+def sort_timestamp(value: Any) -> float:
+    """updatedAt 값을 정렬용 숫자로 변환"""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            return 0.0
+    return 0.0
+
+
+def session_sort_key(session: Dict[str, Any]) -> SortKey:
+    updated_at = session.get("updatedAt", session.get("createdAt"))
+    return -sort_timestamp(updated_at), session["id"]
+
+
+def session_title(session: Dict[str, Any]) -> str:
+    return session.get("title") or f"채팅 {session['id'][:8]}"
+
+
+def encode_cursor(key: SortKey) -> str:
+    raw = json.dumps([key[0], key[1]], ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> SortKey:
+    """커서 문자열 해석 (형식이 잘못되면 ValueError)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, session_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return float(timestamp), str(session_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class SessionIndex:
+    """세션 목록 조회용 메모리 인덱스
+
+    - 정렬 키 리스트를 항상 정렬 상태로 유지하여 페이지 조회 시 전체 정렬 없음
+    - 제목 검색은 n-gram 역색인으로 후보만 추려 매칭 결과 수에 비례하는 비용
+    """
+
+    def __init__(self):
+        self._keys: List[SortKey] = []
+        self._key_by_id: Dict[str, SortKey] = {}
+        self._titles = NgramIndex()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def upsert(self, session: Dict[str, Any]) -> None:
+        session_id = session["id"]
+        key = session_sort_key(session)
+        old_key = self._key_by_id.get(session_id)
+        if old_key != key:
+            if old_key is not None:
+                self._remove_key(old_key)
+            insort(self._keys, key)
+            self._key_by_id[session_id] = key
+        self._titles.add(session_id, session_title(session))
+
+    def remove(self, session_id: str) -> None:
+        key = self._key_by_id.pop(session_id, None)
+        if key is not None:
+            self._remove_key(key)
+        self._titles.remove(session_id)
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self._key_by_id.clear()
+        self._titles = NgramIndex()
+
+    def _remove_key(self, key: SortKey) -> None:
+        position = bisect_right(self._keys, key) - 1
+        if position >= 0 and self._keys[position] == key:
+            del self._keys[position]
+
+    def page(self, offset: int = 0, limit: int = 50, query: Optional[str] = None,
+             cursor: Optional[str] = None) -> Tuple[List[str], int, Optional[str]]:
+        """(세션 ID 페이지, 전체 매칭 수, 다음 커서) 반환
+
+        cursor가 있으면 offset 대신 해당 위치 다음부터 조회합니다.
+        """
+        if query:
+            keys = sorted(self._key_by_id[session_id] for session_id in self._titles.search(query))
+        else:
+            keys = self._keys
+
+        start = bisect_right(keys, decode_cursor(cursor)) if cursor else max(offset, 0)
+        end = start + limit
+        page_keys = keys[start:end]
+        next_cursor = encode_cursor(page_keys[-1]) if page_keys and end < len(keys) else None
+        return [key[1] for key in page_keys], len(keys), next_cursor
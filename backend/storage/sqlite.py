@@ -0,0 +1,336 @@
+"""
+SQLite Chat Repository
+SQLite(WAL 모드)에 채팅 데이터를 영구 저장하는 저장소
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .base import ChatRepository, SESSION_NAMESPACES
+from .fulltext import MessageHit, MessageSearchIndex
+from .records import MessageRecord
+from .session_index import SessionIndex, SessionPage, sort_timestamp
+
+
+SESSION_DATETIME_FIELDS = ("createdAt", "updatedAt", "titleGeneratedAt")
+
+# 기본 DB 파일은 실행 디렉터리와 무관하게 backend/chat.db
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "chat.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id          TEXT PRIMARY KEY,
+    updated_at  REAL NOT NULL,
+    data        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions (updated_at DESC);
+
+CREATE TABLE IF NOT EXISTS messages (
+    seq         INTEGER PRIMARY KEY AUTOINCREMENT,
+    id          TEXT UNIQUE,
+    session_id  TEXT NOT NULL,
+    data        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_session ON messages (session_id, seq);
+
+CREATE TABLE IF NOT EXISTS kv (
+    namespace   TEXT NOT NULL,
+    key         TEXT NOT NULL,
+    value       TEXT NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+"""
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, MessageRecord):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, default=_json_default)
+
+
+def _loads_record(data: str, datetime_fields: Tuple[str, ...]) -> Dict[str, Any]:
+    record = json.loads(data)
+    for field in datetime_fields:
+        value = record.get(field)
+        if isinstance(value, str):
+            try:
+                record[field] = datetime.fromisoformat(value)
+            except ValueError:
+                pass
+    return record
+
+
+class SQLiteChatRepository(ChatRepository):
+    """SQLite 기반 영구 저장소
+
+    - WAL 저널 + synchronous=NORMAL 로 쓰기 지연 최소화
+    - 세션 ID / 메시지 ID / updatedAt 인덱스로 조회
+    - 세션 내 메시지 위치는 seq(삽입 순서, 삭제 자리는 비워 둠)로 표현 (find_message/삭제 모두 인덱스 조회 한 번)
+    - 세션 목록/제목 검색은 시작 시 구성하는 메모리 인덱스 사용 (세션 수에 비례)
+    - 메시지 전문 검색 인덱스는 첫 검색 때 전체 메시지를 한 번 읽어 메모리에 구성하고 이후 증분 갱신
+      (시작 비용 없음, 첫 검색은 메시지 수에 비례, 검색을 쓰지 않는 프로세스는 인덱스 메모리를 쓰지 않음)
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, token_counter: Optional[Callable[[str], int]] = None):
+        super().__init__(token_counter)
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute("PRAGMA foreign_keys=OFF")
+        self._conn.executescript(SCHEMA)
+        # 연속 위치 컬럼을 쓰던 DB의 인덱스 정리 (컬럼은 기본값으로 남겨 둠)
+        self._conn.execute("DROP INDEX IF EXISTS idx_messages_position")
+        self._session_index = SessionIndex()
+        for row in self._conn.execute("SELECT data FROM sessions"):
+            self._session_index.upsert(_loads_record(row[0], SESSION_DATETIME_FIELDS))
+        self._search_index: Optional[MessageSearchIndex] = None  # 첫 검색 때 구성
+
+    def _message_index(self) -> MessageSearchIndex:
+        """전문 검색 인덱스 (처음 호출될 때 저장된 메시지 전체로 구성)"""
+        if self._search_index is None:
+            index = MessageSearchIndex()
+            for session_id, data in self._conn.execute("SELECT session_id, data FROM messages ORDER BY seq"):
+                index.add(session_id, json.loads(data))
+            self._search_index = index
+        return self._search_index
+
+    def _index_message(self, session_id: str, message: Dict[str, Any]) -> None:
+        if self._search_index is not None:
+            self._search_index.add(session_id, message)
+
+    def _unindex_message(self, message_id: Optional[str]) -> None:
+        if self._search_index is not None:
+            self._search_index.remove(message_id)
+
+    def _indexed_ids(self, session_id: str) -> List[str]:
+        """검색 인덱스에서 지워야 할 세션 메시지 ID (인덱스를 아직 만들지 않았으면 조회하지 않음)"""
+        if self._search_index is None:
+            return []
+        return [row[0] for row in self._fetchall("SELECT id FROM messages WHERE session_id = ?", (session_id,))]
+
+    # 연결을 여러 스레드가 공유하므로 커서 결과 읽기까지 락 안에서 끝내고 행만 반환
+    def _execute(self, sql: str, params: tuple = ()) -> int:
+        """변경 문 실행 (변경된 행 수)"""
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount
+
+    def _fetchone(self, sql: str, params: tuple = ()) -> Optional[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def _fetchall(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # ---------- 세션 ----------
+
+    def create_session(self, session: Dict[str, Any]) -> None:
+        with self._lock:
+            self._execute(
+                "INSERT OR REPLACE INTO sessions (id, updated_at, data) VALUES (?, ?, ?)",
+                (session["id"], sort_timestamp(session.get("updatedAt")), _dumps(session))
+            )
+            self._session_index.upsert(session)
+
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        row = self._fetchone("SELECT data FROM sessions WHERE id = ?", (session_id,))
+        return _loads_record(row[0], SESSION_DATETIME_FIELDS) if row else None
+
+    def has_session(self, session_id: str) -> bool:
+        return self._fetchone("SELECT 1 FROM sessions WHERE id = ?", (session_id,)) is not None
+
+    def update_session(self, session_id: str, **fields) -> bool:
+        with self._lock:
+            session = self.get_session(session_id)
+            if session is None:
+                return False
+            session.update(fields)
+            self._execute(
+                "UPDATE sessions SET updated_at = ?, data = ? WHERE id = ?",
+                (sort_timestamp(session.get("updatedAt")), _dumps(session), session_id)
+            )
+            self._session_index.upsert(session)
+            return True
+
+    def delete_session(self, session_id: str) -> bool:
+        with self._lock:
+            message_ids = self._indexed_ids(session_id)
+            self._execute("BEGIN")
+            try:
+                deleted = self._execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+                self._execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+                self._execute(
+                    f"DELETE FROM kv WHERE key = ? AND namespace IN ({','.join('?' * len(SESSION_NAMESPACES))})",
+                    (session_id, *SESSION_NAMESPACES)
+                )
+                self._execute("COMMIT")
+            except Exception:
+                self._execute("ROLLBACK")
+                raise
+            self._session_index.remove(session_id)
+            for message_id in message_ids:
+                self._unindex_message(message_id)
+            return deleted > 0
+
+    def iter_sessions(self) -> Iterator[Dict[str, Any]]:
+        rows = self._fetchall("SELECT data FROM sessions")
+        return (_loads_record(row[0], SESSION_DATETIME_FIELDS) for row in rows)
+
+    def list_sessions(self, offset: int = 0, limit: int = 50, query: Optional[str] = None,
+                      cursor: Optional[str] = None) -> SessionPage:
+        with self._lock:
+            session_ids, total, next_cursor = self._session_index.page(offset, limit, query, cursor)
+            if not session_ids:
+                return SessionPage([], total, next_cursor)
+            placeholders = ",".join("?" * len(session_ids))
+            rows = self._fetchall(
+                f"SELECT id, data FROM sessions WHERE id IN ({placeholders})", tuple(session_ids)
+            )
+        by_id = {session_id: data for session_id, data in rows}
+        sessions = [_loads_record(by_id[session_id], SESSION_DATETIME_FIELDS)
+                    for session_id in session_ids if session_id in by_id]
+        return SessionPage(sessions, total, next_cursor)
+
+    def count_sessions(self) -> int:
+        return self._fetchone("SELECT COUNT(*) FROM sessions")[0]
+
+    # ---------- 메시지 ----------
+
+    def get_messages(self, session_id: str) -> List[MessageRecord]:
+        rows = self._fetchall(
+            "SELECT data FROM messages WHERE session_id = ? ORDER BY seq", (session_id,)
+        )
+        return [self._to_record(json.loads(row[0]), session_id) for row in rows]
+
+    def get_recent_messages(self, session_id: str, limit: int) -> List[MessageRecord]:
+        if limit <= 0:
+            return []
+        rows = self._fetchall(
+            "SELECT data FROM messages WHERE session_id = ? ORDER BY seq DESC LIMIT ?", (session_id, limit)
+        )
+        return [self._to_record(json.loads(row[0]), session_id) for row in reversed(rows)]
+
+    def get_messages_after(self, session_id: str, position: int) -> List[MessageRecord]:
+        rows = self._fetchall(
+            "SELECT data FROM messages WHERE session_id = ? AND seq > ? ORDER BY seq", (session_id, position)
+        )
+        return [self._to_record(json.loads(row[0]), session_id) for row in rows]
+
+    def get_messages_before(self, session_id: str, position: int, limit: int) -> List[MessageRecord]:
+        if limit <= 0:
+            return []
+        rows = self._fetchall(
+            "SELECT data FROM messages WHERE session_id = ? AND seq < ? ORDER BY seq DESC LIMIT ?",
+            (session_id, position, limit)
+        )
+        return [self._to_record(json.loads(row[0]), session_id) for row in reversed(rows)]
+
+    def count_messages(self, session_id: str) -> int:
+        return self._fetchone("SELECT COUNT(*) FROM messages WHERE session_id = ?", (session_id,))[0]
+
+    def append_message(self, session_id: str, message: Dict[str, Any]) -> None:
+        message = self._to_record(message, session_id)
+        with self._lock:
+            self._execute(
+                "INSERT INTO messages (id, session_id, data) VALUES (?, ?, ?)",
+                (message.get("id"), session_id, _dumps(message))
+            )
+            self._index_message(session_id, message)
+            self._track_tokens(session_id, self.message_tokens(message), 1)
+
+    def find_message(self, message_id: str) -> Optional[Tuple[str, int, MessageRecord]]:
+        with self._lock:
+            row = self._fetchone(
+                "SELECT session_id, seq, data FROM messages WHERE id = ?", (message_id,)
+            )
+            if row is None:
+                return None
+            session_id, position, data = row
+            return session_id, position, self._to_record(json.loads(data), session_id)
+
+    def delete_message(self, message_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._fetchone(
+                "SELECT session_id, data FROM messages WHERE id = ?", (message_id,)
+            )
+            if row is None:
+                return None
+            session_id, data = row
+            self._execute("DELETE FROM messages WHERE id = ?", (message_id,))
+            self._unindex_message(message_id)
+            self._track_tokens(session_id, -self.message_tokens(self._to_record(json.loads(data), session_id)), -1)
+            return session_id
+
+    def replace_message(self, message_id: str, message: Dict[str, Any]) -> bool:
+        with self._lock:
+            row = self._fetchone("SELECT session_id, data FROM messages WHERE id = ?", (message_id,))
+            if row is None:
+                return False
+            message = self._to_record(message, row[0])
+            previous = self._to_record(json.loads(row[1]), row[0])
+            self._execute(
+                "UPDATE messages SET id = ?, data = ? WHERE id = ?",
+                (message.get("id"), _dumps(message), message_id)
+            )
+            self._unindex_message(message_id)
+            self._index_message(row[0], message)
+            self._track_tokens(row[0], self.message_tokens(message) - self.message_tokens(previous), 0)
+            return True
+
+    def replace_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        messages = [self._to_record(message, session_id) for message in messages]
+        with self._lock:
+            old_ids = self._indexed_ids(session_id)
+            self._execute("BEGIN")
+            try:
+                self._execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+                self._conn.executemany(
+                    "INSERT INTO messages (id, session_id, data) VALUES (?, ?, ?)",
+                    [(message.get("id"), session_id, _dumps(message)) for message in messages]
+                )
+                self._execute("COMMIT")
+            except Exception:
+                self._execute("ROLLBACK")
+                raise
+            for message_id in old_ids:
+                self._unindex_message(message_id)
+            for message in messages:
+                self._index_message(session_id, message)
+            self._reset_tokens(session_id, messages)
+
+    def search_messages(self, query: str, limit: int = 20,
+                        session_id: Optional[str] = None) -> Tuple[List[MessageHit], int]:
+        with self._lock:
+            return self._message_index().search(query, limit, session_id)
+
+    # ---------- 세션 부가 정보 ----------
+
+    def get_value(self, namespace: str, key: str, default: Any = None) -> Any:
+        row = self._fetchone("SELECT value FROM kv WHERE namespace = ? AND key = ?", (namespace, key))
+        return json.loads(row[0]) if row else default
+
+    def set_value(self, namespace: str, key: str, value: Any) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO kv (namespace, key, value) VALUES (?, ?, ?)",
+            (namespace, key, _dumps(value))
+        )
+
+    def delete_value(self, namespace: str, key: str) -> None:
+        self._execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
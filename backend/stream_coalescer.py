@@ -0,0 +1,149 @@
+"""
+SSE 델타 코얼레싱 모듈
+모델 토큰마다 SSE 이벤트/소켓 쓰기가 생기지 않도록 연속된 델타 프레임을
+N ms 또는 M 바이트 중 먼저 도달하는 조건에서 한 프레임으로 합쳐 전송
+"""
+import asyncio
+import time
+from typing import AsyncIterator, Callable, List, Optional
+
+from sse_encoder import DeltaFrame, StreamChunkEncoder
+
+
+class DeltaCoalescer:
+    """push 기반 델타 버퍼
+
+    - 첫 델타는 즉시 전송 (time-to-first-token 유지)
+    - 이후 델타는 버퍼에 모았다가 interval 경과 또는 max_bytes 도달 시 하나의 프레임으로 재인코딩
+    - 반환 문자열은 SSE 프레임 하나 이상을 이어 붙인 것 (프레임마다 "\\n\\n"으로 구분되므로 한 번에 써도 됨)
+    """
+
+    def __init__(self, interval: float, max_bytes: int, clock: Callable[[], float] = time.monotonic):
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._started = False
+        self._encoder: Optional[StreamChunkEncoder] = None
+        self._deltas: List[str] = []
+        self._bytes = 0
+        self._deadline: Optional[float] = None
+
+    def remaining(self) -> Optional[float]:
+        """버퍼를 비워야 할 때까지 남은 시간 (버퍼가 비어 있으면 None)"""
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - self.clock())
+
+    def push(self, frame: DeltaFrame) -> Optional[str]:
+        """델타 프레임 추가 (지금 보낼 프레임이 있으면 반환)"""
+        if not self._started:
+            self._started = True
+            return frame
+
+        flushed = None
+        if self._encoder is not None and frame.encoder is not self._encoder:
+            flushed = self.flush()  # 다른 메시지의 델타는 합치지 않음
+
+        if self._encoder is None:
+            self._encoder = frame.encoder
+            self._deadline = self.clock() + self.interval
+        self._deltas.append(frame.delta)
+        self._bytes += len(frame.delta.encode("utf-8"))
+
+        if self._bytes >= self.max_bytes or self.clock() >= self._deadline:
+            current = self.flush()
+            return flushed + current if flushed else current
+        return flushed
+
+    def flush(self) -> Optional[str]:
+        """버퍼의 델타를 하나의 프레임으로 (비어 있으면 None)"""
+        if self._encoder is None:
+            return None
+        frame = self._encoder.encode(self._deltas[0] if len(self._deltas) == 1 else "".join(self._deltas))
+        self._encoder = None
+        self._deltas = []
+        self._bytes = 0
+        self._deadline = None
+        return frame
+
+
+class _SourceError:
+    __slots__ = ("error",)
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+_END = object()
+
+
+async def _produce(frames: AsyncIterator[str], queue: "asyncio.Queue") -> None:
+    """원본 스트림은 한 태스크에서만 구동 (OpenAI 스트림/연결 컨텍스트가 태스크를 넘나들지 않도록)"""
+    try:
+        async for frame in frames:
+            await queue.put(frame)
+    except Exception as e:
+        await queue.put(_SourceError(e))
+        return
+    await queue.put(_END)
+
+
+async def coalesce_stream(frames: AsyncIterator[str], interval_ms: int, max_bytes: int,
+                          queue_size: int = 256) -> AsyncIterator[str]:
+    """SSE 프레임 스트림의 연속된 델타 프레임을 합쳐 전달
+
+    DeltaFrame이 아닌 프레임(완료/도구 상태/에러 등)은 버퍼를 먼저 비운 뒤 그대로 전달하므로 순서 유지.
+    원본은 별도 태스크가 큐로 넘겨주고, 다음 프레임을 기다리는 동안 interval이 지나면 버퍼만 먼저 전송
+    """
+    if interval_ms <= 0 and max_bytes <= 0:
+        async for frame in frames:
+            yield frame
+        return
+
+    coalescer = DeltaCoalescer(interval_ms / 1000 if interval_ms > 0 else float("inf"),
+                               max_bytes if max_bytes > 0 else float("inf"))
+    queue: "asyncio.Queue" = asyncio.Queue(maxsize=queue_size)
+    producer = asyncio.create_task(_produce(frames, queue))
+    try:
+        while True:
+            timeout = coalescer.remaining()
+            if not queue.empty():
+                item = queue.get_nowait()
+            elif timeout is None:
+                item = await queue.get()
+            else:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout)  # 취소된 get은 항목을 잃지 않음
+                except asyncio.TimeoutError:
+                    out = coalescer.flush()
+                    if out:
+                        yield out
+                    continue
+
+            if item is _END:
+                break
+            if isinstance(item, _SourceError):
+                out = coalescer.flush()
+                if out:
+                    yield out
+                raise item.error
+
+            if isinstance(item, DeltaFrame):
+                out = coalescer.push(item)
+                if out:
+                    yield out
+            else:
+                out = coalescer.flush()
+                yield out + item if out else item
+
+        out = coalescer.flush()
+        if out:
+            yield out
+    finally:
+        # 클라이언트 연결 종료 등으로 중단되면 원본 스트림 구동 태스크도 정리
+        if not producer.done():
+            producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
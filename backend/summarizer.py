@@ -0,0 +1,172 @@
+"""
+백그라운드 대화 요약 모듈
+세션 토큰이 임계값을 넘으면 asyncio 워커가 새 메시지를 이전 요약에 누적(fold)하여 요약을 갱신
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from openai import AsyncOpenAI
+
+from metrics import track_openai
+from rate_governor import background_priority
+from singleflight import SingleFlight
+from storage import ChatRepository, CONVERSATION_SUMMARIES
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_SYSTEM_PROMPT = """당신은 대화 요약 전문가입니다. 이전 요약과 그 이후의 새 대화를 합쳐 하나의 갱신된 요약을 작성해주세요.
+
+요약 형식:
+- 주요 주제와 논의 내용
+- 핵심 결론이나 결정사항
+- 중요한 데이터나 정보
+- 사용자 관심사나 요구사항
+
+이전 요약의 중요한 내용은 유지하고, 한국어로 3-5문장으로 요약해주세요."""
+
+
+class ConversationSummarizer:
+    """세션별 누적 요약을 백그라운드에서 갱신하는 워커
+
+    - 요청 경로에서는 schedule/maybe_schedule로 작업만 등록하고 get_summary로 준비된 요약만 읽음
+    - 요약 상태(CONVERSATION_SUMMARIES): summary, last_message_id(요약에 반영된 마지막 메시지),
+      folded_tokens(요약 시점의 세션 토큰 누적치), updated_at
+    """
+
+    def __init__(self, client: AsyncOpenAI, repository: ChatRepository, trigger_tokens: int,
+                 model: str = "gpt-3.5-turbo", keep_recent: int = 10, fold_tokens: Optional[int] = None):
+        self.client = client
+        self.repository = repository
+        self.trigger_tokens = trigger_tokens
+        self.model = model  # 요약은 저렴한 모델 사용
+        self.keep_recent = keep_recent  # 최근 메시지는 원문으로 유지하므로 요약에서 제외
+        self.fold_tokens = fold_tokens or max(1, trigger_tokens // 3)  # 재요약 간격 (새로 쌓인 토큰 수)
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._pending: Set[str] = set()
+        self._worker: Optional[asyncio.Task] = None
+        self._flights = SingleFlight("summarize")
+
+    # ---------- 요약 상태 ----------
+
+    def get_state(self, session_id: str) -> Optional[Dict[str, Any]]:
+        state = self.repository.get_value(CONVERSATION_SUMMARIES, session_id)
+        if isinstance(state, str):  # 이전 버전의 문자열 요약
+            return {"summary": state, "last_message_id": None, "folded_tokens": 0}
+        return state
+
+    def get_summary(self, session_id: str) -> str:
+        """준비된 요약 (없으면 빈 문자열, 요청 경로에서 API 호출 없음)"""
+        state = self.get_state(session_id)
+        return state.get("summary", "") if state else ""
+
+    # ---------- 스케줄링 ----------
+
+    def schedule(self, session_id: str) -> None:
+        if session_id in self._pending:
+            return
+        self._pending.add(session_id)
+        self._queue.put_nowait(session_id)
+
+    def maybe_schedule(self, session_id: str) -> bool:
+        """세션 토큰이 임계값을 넘고 마지막 요약 이후 충분히 쌓였으면 요약 작업 등록"""
+        total_tokens = self.repository.get_token_usage(session_id)["total_tokens"]
+        if total_tokens < self.trigger_tokens:
+            return False
+        state = self.get_state(session_id)
+        if state and total_tokens - state.get("folded_tokens", 0) < self.fold_tokens:
+            return False
+        self.schedule(session_id)
+        return True
+
+    # ---------- 워커 ----------
+
+    def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self) -> None:
+        while True:
+            session_id = await self._queue.get()
+            try:
+                await self.summarize(session_id)
+            except Exception as e:
+                logger.error("🚨 Failed to summarize session %s: %s", session_id, e)
+            finally:
+                self._pending.discard(session_id)
+                self._queue.task_done()
+
+    # ---------- 요약 ----------
+
+    def _unfolded_messages(self, session_id: str,
+                           state: Optional[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], bool]:
+        """(이전 요약 이후 ~ 최근 keep_recent개 이전의 대화 메시지, 처음부터 다시 요약해야 하는지)
+
+        요약에 반영된 마지막 메시지(커서) 이후만 읽음. 커서 메시지를 찾을 수 없으면(삭제 등)
+        이전 요약에 어디까지 반영됐는지 알 수 없으므로 전체 대화로 다시 요약
+        """
+        messages = None
+        last_message_id = state.get("last_message_id") if state else None
+        if last_message_id:
+            found = self.repository.find_message(last_message_id)
+            if found is not None and found[0] == session_id:
+                messages = self.repository.get_messages_after(session_id, found[1])
+
+        rebuild = messages is None
+        if rebuild:
+            messages = self.repository.get_messages(session_id)
+        messages = [m for m in messages if m.get("role") in ("user", "assistant")]
+        return messages[:max(0, len(messages) - self.keep_recent)], rebuild
+
+    async def summarize(self, session_id: str) -> Optional[str]:
+        """새 메시지를 이전 요약에 누적하여 요약 갱신 (같은 세션의 동시 호출은 한 번만 실행)"""
+        return await self._flights.do(session_id, lambda: self._summarize(session_id))
+
+    async def _summarize(self, session_id: str) -> Optional[str]:
+        if not self.repository.has_session(session_id):
+            return None
+
+        state = self.get_state(session_id)
+        new_messages, rebuild = self._unfolded_messages(session_id, state)
+        if not new_messages:
+            return state.get("summary") if state else None
+
+        conversation_text = "".join(f"{m.get('role', '')}: {m.get('content', '')}\n" for m in new_messages)
+        previous_summary = "" if rebuild else state.get("summary", "")
+        if rebuild and state and state.get("summary"):
+            logger.info("🔁 Summary cursor lost for session %s, rebuilding from full history", session_id)
+        logger.info("📝 Folding %s messages into summary for session: %s", len(new_messages), session_id)
+
+        with track_openai("chat_completions", self.model), background_priority():
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                    {
+                        "role": "user",
+                        "content": f"이전 요약:\n{previous_summary or '(없음)'}\n\n새 대화:\n{conversation_text}"
+                    }
+                ],
+                max_tokens=300,
+                temperature=0.3
+            )
+        summary = response.choices[0].message.content
+
+        self.repository.set_value(CONVERSATION_SUMMARIES, session_id, {
+            "summary": summary,
+            "last_message_id": new_messages[-1].get("id"),
+            "folded_tokens": self.repository.get_token_usage(session_id)["total_tokens"],
+            "updated_at": datetime.now().isoformat()
+        })
+        logger.info("✅ Summary updated for session %s", session_id)
+        return summary
@@ -0,0 +1,8 @@
+"""
+백엔드 테스트 공용 설정
+모듈들이 backend/ 기준으로 import하므로 어느 디렉터리에서 실행해도 backend/를 경로에 추가
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,87 @@
+"""
+API 경로 라우터 기능 메모 테스트
+기능 미지원 오류만 메모하고, 삭제된 리소스/요청별 오류는 오류율에만 반영하는지 확인
+"""
+import httpx
+import openai
+import pytest
+
+from api_router import APIRouter, RouteFeatures, is_capability_error
+
+FEATURES = RouteFeatures(web_search=False, tools=False, files=True)
+
+
+def api_error(error_class, status: int, message: str, code=None, param=None):
+    request = httpx.Request("POST", "https://api.openai.com/v1/threads/runs")
+    body = {"message": message, "type": "invalid_request_error", "code": code, "param": param}
+    return error_class(message, response=httpx.Response(status, request=request), body=body)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.parametrize("error", [
+    api_error(openai.BadRequestError, 400, "Unsupported parameter: 'max_tokens'", code="unsupported_parameter"),
+    api_error(openai.BadRequestError, 400, "Hosted tool 'web_search_preview' is not supported with gpt-4o-mini."),
+    api_error(openai.BadRequestError, 400, "The requested model 'gpt-3.5-turbo-0301' cannot be used with the "
+                                           "Assistants API."),
+    api_error(openai.BadRequestError, 400, "Invalid value: 'web_search'.", code="invalid_value",
+              param="tools[0].type"),
+])
+def test_unsupported_feature_errors_are_capability_errors(error):
+    assert is_capability_error(error)
+
+
+@pytest.mark.parametrize("error", [
+    api_error(openai.NotFoundError, 404, "No thread found with id 'thread_abc'."),
+    api_error(openai.NotFoundError, 404, "No assistant found with id 'asst_abc'."),
+    api_error(openai.BadRequestError, 400, "Thread thread_abc already has an active run run_xyz."),
+    api_error(openai.BadRequestError, 400, "This model's maximum context length is 128000 tokens.",
+              code="context_length_exceeded"),
+    api_error(openai.BadRequestError, 400, "Invalid image format. Unsupported image type.", param="messages"),
+    None,
+])
+def test_request_specific_errors_are_not_capability_errors(error):
+    assert not is_capability_error(error)
+
+
+def test_stale_thread_does_not_ban_assistant_path():
+    router = APIRouter(min_samples=3, clock=FakeClock())
+    stale = api_error(openai.NotFoundError, 404, "No thread found with id 'thread_abc'.")
+
+    router.record("gpt-4o", FEATURES, "assistant", 0.1, stale, failed=True)
+
+    assert router.supports("gpt-4o", FEATURES, "assistant")
+    assert router.plan("gpt-4o", FEATURES, ["assistant"]) == ["assistant"]
+    assert router._stats[("gpt-4o", FEATURES, "assistant")].error_rate > 0
+
+
+def test_capability_error_is_memoized_until_ttl():
+    clock = FakeClock()
+    router = APIRouter(capability_ttl=60.0, clock=clock)
+    unsupported = api_error(openai.BadRequestError, 400, "Unsupported value", code="unsupported_value")
+
+    router.record("gpt-4o", FEATURES, "responses", 0.1, unsupported, failed=True)
+
+    assert not router.supports("gpt-4o", FEATURES, "responses")
+    assert router.plan("gpt-4o", FEATURES, ["responses", "chat"]) == ["chat"]
+    assert router.supports("gpt-4o", FEATURES._replace(files=False), "responses")
+    clock.now = 61.0
+    assert router.supports("gpt-4o", FEATURES, "responses")
+
+
+def test_repeated_request_errors_only_mark_path_unhealthy():
+    router = APIRouter(min_samples=3, unhealthy_error_rate=0.5, alpha=0.5, probe_rate=0.0, clock=FakeClock())
+    busy = api_error(openai.BadRequestError, 400, "Thread thread_abc already has an active run run_xyz.")
+    for _ in range(3):
+        router.record("gpt-4o", FEATURES, "assistant", 0.1, busy, failed=True)
+    router.record("gpt-4o", FEATURES, "chat", 0.2)
+
+    # 금지되지 않고 정상 경로 뒤로만 밀림
+    assert router.supports("gpt-4o", FEATURES, "assistant")
+    assert router.plan("gpt-4o", FEATURES, ["assistant", "chat"]) == ["chat", "assistant"]
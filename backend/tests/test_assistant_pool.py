@@ -0,0 +1,70 @@
+"""
+Assistant 풀 재사용 테스트
+분 단위로 바뀌는 시간 섹션이 들어간 instructions로도 같은 Assistant를 재사용하는지 확인
+"""
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+from assistant_pool import AssistantPool, assistant_config_key
+from context_builder import KST, ContextBuilder
+from storage import InMemoryChatRepository
+
+
+class FakeAssistants:
+    def __init__(self):
+        self.created = []
+        self.retrieved = []
+
+    async def create(self, **params):
+        self.created.append(params)
+        return SimpleNamespace(id=f"asst_{len(self.created)}")
+
+    async def retrieve(self, assistant_id):
+        self.retrieved.append(assistant_id)
+        return SimpleNamespace(id=assistant_id)
+
+
+def make_pool():
+    assistants = FakeAssistants()
+    client = SimpleNamespace(beta=SimpleNamespace(assistants=assistants))
+    return AssistantPool(client, InMemoryChatRepository()), assistants
+
+
+def stream_prompt(hour: int, minute: int) -> str:
+    # 시스템 프롬프트 구성에는 컨텍스트 뷰가 필요 없음
+    return ContextBuilder(None).system_prompt("stream", now=datetime(2025, 3, 10, hour, minute, tzinfo=KST))
+
+
+def test_prompts_a_minute_apart_share_key():
+    at_10_00, at_10_01 = stream_prompt(10, 0), stream_prompt(10, 1)
+    assert at_10_00 != at_10_01
+    assert assistant_config_key("gpt-4o", at_10_00, [], ["vs_1"]) == \
+        assistant_config_key("gpt-4o", at_10_01, [], ["vs_1"])
+
+
+def test_requests_a_minute_apart_reuse_assistant():
+    pool, assistants = make_pool()
+
+    async def run():
+        first = await pool.acquire("gpt-4o", stream_prompt(10, 0), [{"type": "file_search"}], ["vs_1"])
+        second = await pool.acquire("gpt-4o", stream_prompt(10, 1), [{"type": "file_search"}], ["vs_1"])
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second == "asst_1"
+    assert len(assistants.created) == 1
+    assert assistants.retrieved == []
+    # Assistant에는 시간 섹션 없는 instructions만 고정
+    assert "현재 시간" not in assistants.created[0]["instructions"]
+
+
+def test_different_configuration_gets_own_assistant():
+    pool, assistants = make_pool()
+
+    async def run():
+        return [await pool.acquire("gpt-4o", stream_prompt(10, 0), [], ["vs_1"]),
+                await pool.acquire("gpt-4o", stream_prompt(10, 0), [], ["vs_2"]),
+                await pool.acquire("gpt-4o-mini", stream_prompt(10, 0), [], ["vs_1"])]
+
+    assert asyncio.run(run()) == ["asst_1", "asst_2", "asst_3"]
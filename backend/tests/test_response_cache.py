@@ -0,0 +1,79 @@
+"""
+응답 캐시 키/저장 테스트
+"""
+from datetime import datetime
+
+import pytest
+
+from context_builder import KST, ContextBuilder
+from response_cache import ResponseCache, _uncacheable, mark_uncacheable, response_cache_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def stream_prompt(hour: int, minute: int) -> str:
+    return ContextBuilder(None).system_prompt("stream", now=datetime(2025, 3, 10, hour, minute, tzinfo=KST))
+
+
+@pytest.fixture(autouse=True)
+def cacheable_request():
+    # mark_uncacheable은 요청 컨텍스트 값이므로 테스트마다 초기화
+    token = _uncacheable.set(False)
+    yield
+    _uncacheable.reset(token)
+
+
+def test_key_ignores_minute_and_whitespace():
+    turns = [{"role": "user", "content": "이번 분기  매출은?"}]
+    same = [{"role": "user", "content": " 이번 분기 매출은? "}]
+    assert response_cache_key("gpt-4o", stream_prompt(10, 0), turns) == \
+        response_cache_key("gpt-4o", stream_prompt(10, 1), same)
+
+
+def test_key_ignores_leading_system_message():
+    prompt = stream_prompt(10, 0)
+    turns = [{"role": "user", "content": "안녕"}]
+    assert response_cache_key("gpt-4o", prompt, [{"role": "system", "content": prompt}] + turns) == \
+        response_cache_key("gpt-4o", prompt, turns)
+
+
+@pytest.mark.parametrize("model, prompt, turns", [
+    ("gpt-4o-mini", stream_prompt(10, 0), [{"role": "user", "content": "안녕"}]),
+    ("gpt-4o", stream_prompt(10, 0), [{"role": "user", "content": "안녕하세요"}]),
+    ("gpt-4o", stream_prompt(10, 0), [{"role": "assistant", "content": "안녕"}]),
+    ("gpt-4o", stream_prompt(10, 0).replace("2025년 03월 10일", "2025년 03월 11일"),
+     [{"role": "user", "content": "안녕"}]),
+    ("gpt-4o", stream_prompt(10, 0), [{"role": "user", "content": "이전"}, {"role": "user", "content": "안녕"}]),
+])
+def test_key_changes_with_model_date_and_turns(model, prompt, turns):
+    assert response_cache_key(model, prompt, turns) != \
+        response_cache_key("gpt-4o", stream_prompt(10, 0), [{"role": "user", "content": "안녕"}])
+
+
+def test_entries_expire_and_evict_least_recent():
+    clock = FakeClock()
+    cache = ResponseCache(max_entries=2, ttl=10.0, clock=clock)
+    cache.put("a", "응답 A")
+    cache.put("b", "응답 B")
+    assert cache.get("a") == "응답 A"
+    cache.put("c", "응답 C")  # 가장 오래 쓰이지 않은 b 축출
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "응답 A"
+    clock.now = 11.0
+    assert cache.get("a") is None
+    assert len(cache) == 1 and cache.bytes == len("응답 C".encode("utf-8"))
+
+
+def test_uncacheable_or_oversized_responses_are_not_stored():
+    cache = ResponseCache(max_bytes=8)
+    assert not cache.put("big", "아주 긴 응답입니다")
+    mark_uncacheable()
+    assert not cache.put("tool", "ok")
+    assert len(cache) == 0
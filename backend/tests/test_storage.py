@@ -0,0 +1,105 @@
+"""
+저장소 메시지 위치/삭제 테스트 (메모리, SQLite 공통)
+"""
+from datetime import datetime
+
+import pytest
+
+from storage import InMemoryChatRepository, SQLiteChatRepository
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def repository(request, tmp_path):
+    if request.param == "memory":
+        yield InMemoryChatRepository()
+        return
+    repository = SQLiteChatRepository(str(tmp_path / "chat.db"))
+    yield repository
+    repository.close()
+
+
+def make_session(repository, session_id="s1", count=5):
+    now = datetime.now()
+    repository.create_session({"id": session_id, "title": "테스트", "createdAt": now, "updatedAt": now})
+    for i in range(count):
+        repository.append_message(session_id, {
+            "id": f"{session_id}-m{i}", "content": f"메시지 {i}", "role": "user" if i % 2 == 0 else "assistant",
+            "timestamp": now, "sessionId": session_id,
+        })
+    return [f"{session_id}-m{i}" for i in range(count)]
+
+
+def ids(messages):
+    return [message["id"] for message in messages]
+
+
+def test_delete_keeps_order_and_lookups(repository):
+    message_ids = make_session(repository)
+
+    assert repository.delete_message(message_ids[1]) == "s1"
+    assert repository.delete_message(message_ids[1]) is None
+    assert repository.find_message(message_ids[1]) is None
+
+    remaining = [message_ids[0]] + message_ids[2:]
+    assert ids(repository.get_messages("s1")) == remaining
+    assert repository.count_messages("s1") == 4
+    assert ids(repository.get_recent_messages("s1", 2)) == message_ids[3:]
+    for message_id in remaining:
+        session_id, _, message = repository.find_message(message_id)
+        assert session_id == "s1" and message["id"] == message_id
+
+
+def test_messages_around_position_skip_deleted(repository):
+    message_ids = make_session(repository, count=6)
+    repository.delete_message(message_ids[2])
+    repository.delete_message(message_ids[4])
+
+    _, position, _ = repository.find_message(message_ids[3])
+    assert ids(repository.get_messages_after("s1", position)) == [message_ids[5]]
+    assert ids(repository.get_messages_before("s1", position, 10)) == message_ids[:2]
+    assert ids(repository.get_messages_before("s1", position, 1)) == [message_ids[1]]
+    assert repository.get_messages_before("s1", position, 0) == []
+
+    _, last, _ = repository.find_message(message_ids[5])
+    assert repository.get_messages_after("s1", last) == []
+
+
+def test_append_after_delete_goes_to_end(repository):
+    message_ids = make_session(repository, count=3)
+    repository.delete_message(message_ids[2])
+    repository.append_message("s1", {"id": "new", "content": "새 메시지", "role": "user",
+                                     "timestamp": datetime.now(), "sessionId": "s1"})
+
+    assert ids(repository.get_messages("s1")) == message_ids[:2] + ["new"]
+    _, position, _ = repository.find_message(message_ids[0])
+    assert ids(repository.get_messages_after("s1", position)) == [message_ids[1], "new"]
+
+
+def test_replace_messages_resets_positions(repository):
+    make_session(repository, count=4)
+    repository.delete_message("s1-m0")
+    repository.replace_messages("s1", [{"id": "r0", "content": "a", "role": "user"},
+                                       {"id": "r1", "content": "b", "role": "assistant"}])
+
+    assert ids(repository.get_messages("s1")) == ["r0", "r1"]
+    assert repository.find_message("s1-m1") is None
+    _, position, _ = repository.find_message("r1")
+    assert ids(repository.get_messages_before("s1", position, 5)) == ["r0"]
+
+
+def test_memory_compaction_keeps_index():
+    repository = InMemoryChatRepository()
+    count = InMemoryChatRepository.COMPACT_MIN_SLOTS * 2
+    message_ids = make_session(repository, count=count)
+
+    # 절반을 넘게 지우면 압축이 일어나도 남은 메시지 조회는 그대로
+    for message_id in message_ids[:count // 2 + 1]:
+        repository.delete_message(message_id)
+    remaining = message_ids[count // 2 + 1:]
+
+    assert ids(repository.get_messages("s1")) == remaining
+    assert repository.count_messages("s1") == len(remaining)
+    for message_id in remaining:
+        assert repository.find_message(message_id)[2]["id"] == message_id
+    _, position, _ = repository.find_message(remaining[0])
+    assert ids(repository.get_messages_after("s1", position)) == remaining[1:]
@@ -0,0 +1,154 @@
+"""
+Assistant Thread 증분 동기화 모듈
+로컬 세션 메시지를 OpenAI Thread에 미러링할 때 마지막으로 보낸 메시지 ID(커서) 이후의 델타만 전송
+
+- 상태: 저장소 THREAD_SYNC 네임스페이스에 session_id -> {thread_id, last_message_id, reply_in_thread}
+- 새 Thread: 모델 입력 예산만큼의 최근 대화와 현재 사용자 메시지를 threads.create 한 번으로 생성
+- 기존 Thread: 커서 이후 메시지만 추가 (다른 경로로 주고받은 메시지 포함), 추가가 성공하면 Thread 존재도 확인된 것으로 간주
+- threads.retrieve는 보낼 델타가 없고 검증 기간(verify_ttl)이 지난 경우에만 호출
+- Assistant Run이 만든 응답은 이미 Thread에 있으므로 로컬에 저장된 같은 응답은 다음 동기화에서 건너뜀
+"""
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import openai
+
+from app_logging import get_logger
+from context_builder import ContextBuilder
+from storage import THREAD_SYNC, THREADS, ChatRepository
+from tokenizer import count_tokens
+
+logger = get_logger("openai")
+
+THREAD_ROLES = ("user", "assistant")  # Thread는 system 메시지를 지원하지 않음
+
+
+class ThreadSynchronizer:
+    """세션별 Thread 커서 관리와 델타 전송"""
+
+    def __init__(self, client: openai.AsyncOpenAI, repository: ChatRepository, context_builder: ContextBuilder,
+                 verify_ttl: float = 600.0, max_delta: int = 20, clock: Callable[[], float] = time.monotonic):
+        self.client = client
+        self.repository = repository
+        self.context_builder = context_builder
+        self.verify_ttl = verify_ttl
+        self.max_delta = max_delta  # 델타가 이보다 길면 메시지별 추가 대신 새 Thread 생성
+        self.clock = clock
+        self._verified_until: Dict[str, float] = {}  # thread_id -> 검증 만료 시각
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _state(self, session_id: str) -> Optional[Dict[str, Any]]:
+        state = self.repository.get_value(THREAD_SYNC, session_id)
+        if state:
+            return dict(state)
+        thread_id = self.repository.get_value(THREADS, session_id)
+        if not thread_id:
+            return None
+        # 커서 도입 전 Thread: 현재 사용자 메시지 직전까지 동기화된 것으로 간주
+        recent = self.repository.get_recent_messages(session_id, 2)
+        return {"thread_id": thread_id, "last_message_id": recent[0].id if len(recent) == 2 else None,
+                "reply_in_thread": False}
+
+    def _save(self, session_id: str, state: Dict[str, Any]) -> None:
+        self.repository.set_value(THREAD_SYNC, session_id, state)
+        self.repository.set_value(THREADS, session_id, state["thread_id"])
+
+    def _forget(self, session_id: str, thread_id: Optional[str]) -> None:
+        self.repository.delete_value(THREAD_SYNC, session_id)
+        self.repository.delete_value(THREADS, session_id)
+        if thread_id:
+            self._verified_until.pop(thread_id, None)
+
+    def _delta(self, session_id: str, last_message_id: Optional[str]) -> Optional[List]:
+        """커서 이후 로컬 메시지 (커서 메시지가 삭제되어 이어 붙일 수 없으면 None)"""
+        if last_message_id is None:
+            return None
+        found = self.repository.find_message(last_message_id)
+        if found is None or found[0] != session_id:
+            return None
+        return self.repository.get_messages_after(session_id, found[1])
+
+    def mark_reply(self, session_id: str) -> None:
+        """Run 응답이 Thread에 추가됨 (로컬에 곧 저장될 같은 응답은 다음 동기화에서 건너뜀)"""
+        state = self.repository.get_value(THREAD_SYNC, session_id)
+        if state:
+            self.repository.set_value(THREAD_SYNC, session_id, {**state, "reply_in_thread": True})
+
+    def invalidate(self, session_id: str) -> None:
+        """Run에서 Thread를 찾지 못했을 때 호출 (다음 동기화에서 존재 확인)"""
+        state = self.repository.get_value(THREAD_SYNC, session_id)
+        if state:
+            self._verified_until.pop(state["thread_id"], None)
+
+    async def sync(self, session_id: str, model_config: Dict, instructions: Optional[str] = None,
+                   user_input: Optional[str] = None) -> str:
+        """현재 사용자 메시지까지 Thread에 반영하고 thread_id 반환"""
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        async with lock:
+            state = self._state(session_id)
+            if state is not None:
+                thread_id = await self._push_delta(session_id, state)
+                if thread_id is not None:
+                    return thread_id
+            return await self._create(session_id, model_config, instructions, user_input)
+
+    async def _push_delta(self, session_id: str, state: Dict[str, Any]) -> Optional[str]:
+        """기존 Thread에 델타 전송 (Thread가 없거나 델타를 이어 붙일 수 없으면 None)"""
+        thread_id = state["thread_id"]
+        delta = self._delta(session_id, state.get("last_message_id"))
+        if delta is None or len(delta) > self.max_delta:
+            logger.debug("🧵 Thread %s cannot be synced incrementally, recreating", thread_id)
+            self._forget(session_id, thread_id)
+            return None
+
+        try:
+            if not delta and self._verified_until.get(thread_id, 0.0) <= self.clock():
+                await self.client.beta.threads.retrieve(thread_id)
+
+            reply_in_thread = state.get("reply_in_thread", False)
+            for index, message in enumerate(delta):
+                state["reply_in_thread"] = False
+                if index == 0 and reply_in_thread and message.role == "assistant":
+                    pass  # Run이 이미 Thread에 추가한 응답
+                elif message.role in THREAD_ROLES and message.content:
+                    await self.client.beta.threads.messages.create(
+                        thread_id=thread_id, role=message.role, content=message.content
+                    )
+                state["last_message_id"] = message.id
+                self.repository.set_value(THREAD_SYNC, session_id, state)  # 중간 실패 시 보낸 데까지 유지
+        except openai.NotFoundError:
+            logger.warning("⚠️ Existing thread not found: %s", thread_id)
+            self._forget(session_id, thread_id)
+            return None
+
+        self._save(session_id, state)
+        self._verified_until[thread_id] = self.clock() + self.verify_ttl
+        logger.debug("🧵 Synced %s messages to thread %s", len(delta), thread_id)
+        return thread_id
+
+    async def _create(self, session_id: str, model_config: Dict, instructions: Optional[str],
+                      user_input: Optional[str]) -> str:
+        """instructions를 뺀 모델 입력 예산만큼의 최근 대화(현재 사용자 메시지 포함)로 새 Thread 생성"""
+        logger.info("🆕 Creating new thread for session: %s", session_id)
+        reserved_tokens = count_tokens(instructions) if instructions else 0
+        recent_messages = self.context_builder.recent_turns(session_id, model_config, reserved_tokens)
+
+        initial_messages = [
+            {"role": msg["role"], "content": msg["content"]}
+            for msg in recent_messages if msg.get("role") in THREAD_ROLES and msg.get("content")
+        ]
+        if user_input is not None and not (initial_messages and initial_messages[-1]["role"] == "user"
+                                           and initial_messages[-1]["content"] == user_input):
+            initial_messages.append({"role": "user", "content": user_input})
+
+        thread = await self.client.beta.threads.create(messages=initial_messages)
+        latest = self.repository.get_recent_messages(session_id, 1)
+        self._save(session_id, {
+            "thread_id": thread.id,
+            "last_message_id": latest[0].id if latest else None,
+            "reply_in_thread": False,
+        })
+        self._verified_until[thread.id] = self.clock() + self.verify_ttl
+        logger.info("✅ Created thread: %s with %s messages", thread.id, len(initial_messages))
+        return thread.id
@@ -6,6 +6,9 @@ from typing import List, Dict, Any, Optional
 import logging
 from datetime import datetime
 
+from metrics import track_openai
+from rate_governor import background_priority
+
 logger = logging.getLogger(__name__)
 
 class TitleGenerator:
@@ -71,29 +74,30 @@ class TitleGenerator:
 
 제목:"""
 
-            response = await self.client.chat.completions.acreate(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "당신은 채팅 제목을 생성하는 AI입니다. 간결하고 정확한 제목을 만들어주세요."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=50,
-                temperature=0.7,
-                timeout=10.0
-            )
+            with track_openai("chat_completions", self.model), background_priority():
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": "당신은 채팅 제목을 생성하는 AI입니다. 간결하고 정확한 제목을 만들어주세요."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=50,
+                    temperature=0.7,
+                    timeout=10.0
+                )
             
             generated_title = response.choices[0].message.content.strip()
             
             # 제목 유효성 검사
             if not generated_title or len(generated_title) > 15:
-                logger.warning(f"Generated title validation failed: {generated_title}")
+                logger.warning("Generated title validation failed: %s", generated_title)
                 return None
                 
-            logger.info(f"Generated title: {generated_title}")
+            logger.info("Generated title: %s", generated_title)
             return generated_title
             
         except Exception as e:
-            logger.error(f"Title generation failed: {str(e)}")
+            logger.error("Title generation failed: %s", e)
             return None
     
     def get_fallback_title(self, messages: List[Dict[str, Any]]) -> str:
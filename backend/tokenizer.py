@@ -0,0 +1,155 @@
+"""
+토큰 수 계산 모듈
+네트워크 없이 디스크의 BPE 어휘 파일(tiktoken 형식)을 읽어 토큰 수를 계산
+"""
+import base64
+import logging
+import os
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+try:
+    import regex  # \p{L} 등 유니코드 속성을 지원하는 정규식 (requirements.txt에 포함, 없으면 re 근사 패턴 사용)
+    REGEX_AVAILABLE = True
+except ImportError:
+    regex = None
+    REGEX_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# cl100k/o200k 계열 사전 분할 패턴
+UNICODE_SPLIT_PATTERN = (
+    r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?\p{L}+|\p{N}{1,3}| ?[^\s\p{L}\p{N}]+[\r\n]*|\s*[\r\n]|\s+(?!\S)|\s+"""
+)
+# regex 모듈이 없을 때 표준 re로 근사한 패턴 (\p{L} -> [^\W\d_])
+FALLBACK_SPLIT_PATTERN = (
+    r"""'(?i:[sdmt]|ll|ve|re)|(?:[^\r\n\w]|_)?[^\W\d_]+|\d{1,3}| ?(?:[^\s\w]|_)+[\r\n]*|\s*[\r\n]|\s+(?!\S)|\s+"""
+)
+
+
+class Tokenizer(ABC):
+    """토큰 수 계산기 인터페이스"""
+
+    name = "base"
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        """텍스트의 토큰 수"""
+
+
+class HeuristicTokenizer(Tokenizer):
+    """어휘 파일이 없을 때 사용하는 근사 계산기
+
+    ASCII는 약 4자당 1토큰, 한글 등 비ASCII 문자는 문자당 약 1토큰으로 계산합니다.
+    """
+
+    name = "heuristic"
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+        return max(1, (ascii_chars + 3) // 4 + (len(text) - ascii_chars))
+
+
+class BPETokenizer(Tokenizer):
+    """바이트 단위 BPE 토크나이저
+
+    tiktoken 형식 어휘 파일(줄마다 "base64(토큰 바이트) 순위")을 읽어 병합 순위로 인코딩합니다.
+    """
+
+    name = "bpe"
+
+    def __init__(self, mergeable_ranks: Dict[bytes, int], pattern: Optional[str] = None, cache_size: int = 65536):
+        self.mergeable_ranks = mergeable_ranks
+        if REGEX_AVAILABLE:
+            self._splitter = regex.compile(pattern or UNICODE_SPLIT_PATTERN)
+        else:
+            self._splitter = re.compile(pattern or FALLBACK_SPLIT_PATTERN)
+        self._encode_piece = lru_cache(maxsize=cache_size)(self._bpe)
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "BPETokenizer":
+        ranks: Dict[bytes, int] = {}
+        with open(path, "rb") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                token, rank = line.split()
+                ranks[base64.b64decode(token)] = int(rank)
+        return cls(ranks, **kwargs)
+
+    def _bpe(self, piece: bytes) -> tuple:
+        """한 조각을 병합 순위가 낮은 쌍부터 합쳐 토큰 순위 목록으로 변환"""
+        ranks = self.mergeable_ranks
+        if piece in ranks:
+            return (ranks[piece],)
+
+        parts = [piece[i:i + 1] for i in range(len(piece))]
+        while len(parts) > 1:
+            best_rank = None
+            best_index = -1
+            for i in range(len(parts) - 1):
+                rank = ranks.get(parts[i] + parts[i + 1])
+                if rank is not None and (best_rank is None or rank < best_rank):
+                    best_rank, best_index = rank, i
+            if best_rank is None:
+                break
+            parts[best_index:best_index + 2] = [parts[best_index] + parts[best_index + 1]]
+
+        # 어휘에 없는 단일 바이트는 토큰 1개로 계산
+        return tuple(ranks.get(part, -1) for part in parts)
+
+    def encode(self, text: str) -> List[int]:
+        tokens: List[int] = []
+        for piece in self._splitter.findall(text):
+            tokens.extend(self._encode_piece(piece.encode("utf-8")))
+        return tokens
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return sum(len(self._encode_piece(piece.encode("utf-8"))) for piece in self._splitter.findall(text))
+
+
+_tokenizer: Optional[Tokenizer] = None
+
+
+def load_tokenizer(vocab_path: Optional[str] = None) -> Tokenizer:
+    """어휘 파일이 있으면 BPE, 없으면 근사 계산기 생성
+
+    - TOKENIZER_VOCAB_PATH: tiktoken 형식 어휘 파일 경로 (예: o200k_base.tiktoken)
+    """
+    vocab_path = vocab_path or os.getenv("TOKENIZER_VOCAB_PATH")
+    if vocab_path:
+        try:
+            tokenizer = BPETokenizer.from_file(vocab_path)
+            logger.info("✅ BPE tokenizer loaded: %s (%s tokens)", vocab_path, len(tokenizer.mergeable_ranks))
+            if not REGEX_AVAILABLE:
+                logger.warning("⚠️ regex module not installed, BPE pre-split uses an approximate re pattern "
+                               "(token counts may differ from tiktoken)")
+            return tokenizer
+        except (OSError, ValueError) as e:
+            logger.warning("⚠️ Failed to load BPE vocabulary %s: %s", vocab_path, e)
+    return HeuristicTokenizer()
+
+
+def get_tokenizer() -> Tokenizer:
+    """프로세스 공용 토크나이저 (최초 호출 시 로드)"""
+    global _tokenizer
+    if _tokenizer is None:
+        _tokenizer = load_tokenizer()
+    return _tokenizer
+
+
+def set_tokenizer(tokenizer: Tokenizer) -> None:
+    """공용 토크나이저 교체 (다른 모델 계열 어휘 사용 시)"""
+    global _tokenizer
+    _tokenizer = tokenizer
+
+
+def count_tokens(text: str) -> int:
+    return get_tokenizer().count(text or "")
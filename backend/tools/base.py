@@ -7,7 +7,11 @@ from abc import ABC, abstractmethod
 from typing import Any, Dict, Optional
 from dataclasses import dataclass
 import json
-import traceback
+
+from app_logging import get_logger
+from metrics import track_tool
+
+logger = get_logger("tools")
 
 
 @dataclass
@@ -59,7 +63,8 @@ class BaseTool(ABC):
     async def safe_execute(self, **kwargs) -> str:
         """안전한 도구 실행 (예외 처리 포함)"""
         try:
-            result = await self.execute(**kwargs)
+            with track_tool(self.name):
+                result = await self.execute(**kwargs)
             return result.to_json()
         except ToolError as e:
             return ToolResult(
@@ -69,8 +74,7 @@ class BaseTool(ABC):
         except Exception as e:
             # 디버깅을 위한 상세 에러 로깅
             error_details = f"{self.name} 예상치 못한 오류: {str(e)}"
-            print(f"Tool Error: {error_details}")
-            print(f"Traceback: {traceback.format_exc()}")
+            logger.exception("Tool Error: %s", error_details)
             
             return ToolResult(
                 success=False,
@@ -7,15 +7,18 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import json
 
+from app_logging import get_logger
 from .base import BaseTool, ToolResult, ToolError
 
+logger = get_logger("tools")
+
 # 기존 Google 서비스 import
 try:
     from google_services import auth_service, calendar_service, gmail_service, CalendarEvent, EmailMessage
     GOOGLE_AVAILABLE = True
 except ImportError:
     GOOGLE_AVAILABLE = False
-    print("⚠️ Google 서비스를 사용할 수 없습니다.")
+    logger.warning("⚠️ Google 서비스를 사용할 수 없습니다.")
 
 
 class GoogleCalendarViewTool(BaseTool):
@@ -97,7 +100,7 @@ class GoogleCalendarViewTool(BaseTool):
                     end_date = today.strftime('%Y-%m-%d')
             
             # 일정 조회
-            events = calendar_service.get_events(start_date, end_date, max_results)
+            events = await calendar_service.fetch_events(start_date, end_date, max_results)
             
             if not events:
                 return ToolResult(
@@ -286,7 +289,7 @@ class GoogleCalendarFindFreeTool(BaseTool):
         
         try:
             # 기간 내 모든 일정 조회
-            events = calendar_service.get_events(start_date, end_date)
+            events = await calendar_service.fetch_events(start_date, end_date)
             
             # 빈 시간 계산
             free_slots = []
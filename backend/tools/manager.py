@@ -3,6 +3,7 @@ Tool Manager
 AI 도구들을 초기화하고 관리하는 매니저 클래스
 """
 
+from app_logging import get_logger
 from .registry import ToolRegistry
 from .google_tools import (
     GoogleCalendarViewTool, 
@@ -12,6 +13,8 @@ from .google_tools import (
     GmailViewTool
 )
 
+logger = get_logger("tools")
+
 
 class ToolManager:
     """AI 도구 매니저"""
@@ -28,17 +31,17 @@ class ToolManager:
             self.registry.register(GoogleCalendarViewTool(), "calendar")
             self.registry.register(GoogleCalendarCreateTool(), "calendar") 
             self.registry.register(GoogleCalendarFindFreeTool(), "calendar")
-            print("✅ Google Calendar 도구들이 등록되었습니다.")
+            logger.info("✅ Google Calendar 도구들이 등록되었습니다.")
         except Exception as e:
-            print(f"⚠️ Google Calendar 도구 등록 실패: {e}")
+            logger.warning("⚠️ Google Calendar 도구 등록 실패: %s", e)
         
         # Gmail Tools
         try:
             self.registry.register(GmailSendTool(), "email")
             self.registry.register(GmailViewTool(), "email")
-            print("✅ Gmail 도구들이 등록되었습니다.")
+            logger.info("✅ Gmail 도구들이 등록되었습니다.")
         except Exception as e:
-            print(f"⚠️ Gmail 도구 등록 실패: {e}")
+            logger.warning("⚠️ Gmail 도구 등록 실패: %s", e)
     
     def get_registry(self) -> ToolRegistry:
         """레지스트리 반환"""
@@ -5,8 +5,11 @@ AI 에이전트가 사용할 수 있는 모든 도구들을 등록하고 관리
 
 from typing import Dict, List, Any, Optional
 import json
+from app_logging import get_logger
 from .base import BaseTool, ToolResult, ToolError
 
+logger = get_logger("tools")
+
 
 class ToolRegistry:
     """AI 도구 레지스트리"""
@@ -32,7 +35,7 @@ class ToolRegistry:
             self._categories[category] = []
         self._categories[category].append(tool.name)
         
-        print(f"✅ Tool registered: {tool.name} ({category})")
+        logger.debug("✅ Tool registered: %s (%s)", tool.name, category)
     
     def get_tool(self, name: str) -> Optional[BaseTool]:
         """도구 조회"""
@@ -86,7 +89,7 @@ class ToolRegistry:
             function_name = tool_call.function.name
             function_args = json.loads(tool_call.function.arguments)
             
-            print(f"🔧 Tool Call: {function_name}({function_args})")
+            logger.debug("🔧 Tool Call: %s(%s)", function_name, function_args)
             
             return await self.execute_tool(function_name, **function_args)
             